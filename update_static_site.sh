@@ -9,10 +9,14 @@ echo "Starting static site update process"
 REPO_DIR=$(pwd)
 echo "Repository directory: $REPO_DIR"
 
+# Continue from the published index, so only new blocks are exported
+echo "Restoring the published index..."
+cd "$REPO_DIR/vibe-dependency-app/backend"
+python publish.py --restore
+
 # Run the static file generator
 echo "Running static file generator..."
-cd "$REPO_DIR/vibe-dependency-app/backend"
-python static_generator.py
+python static_generator.py --full-history
 
 # Prepare the static content for GitHub Pages
 echo "Preparing static content for GitHub Pages..."
@@ -33,23 +37,9 @@ else
   cp -r build/* "$REPO_DIR/static/"
 fi
 
-# Push to GitHub Pages repository
-echo "Pushing to GitHub Pages repository..."
-cd "$REPO_DIR/static"
-
-# Initialize git repository if not already initialized
-if [ ! -d ".git" ]; then
-  git init
-  git remote add origin git@github.com:nerolation/dependency.pics-static.git
-fi
-
-# Add all files
-git add -A
-
-# Commit changes with timestamp
-git commit -m "Update static site: $(date)"
-
-# Push to the main branch
-git push -u origin main -f
+# Push only the files in the changeset to the GitHub Pages repository
+echo "Publishing changes to GitHub Pages repository..."
+cd "$REPO_DIR/vibe-dependency-app/backend"
+python publish.py
 
 echo "Static site update completed" 
\ No newline at end of file
@@ -0,0 +1,89 @@
+import time
+import threading
+from contextlib import contextmanager
+
+class StorageOverloaded(Exception):
+    """Raised when a storage call cannot be admitted in time."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionGate:
+    """Bounded-concurrency gate in front of object store calls.
+
+    At most ``max_concurrency`` calls run at once. Up to ``max_queue`` more
+    callers may wait for a slot, each for at most ``wait_timeout`` seconds.
+    Anything beyond that fails fast with StorageOverloaded instead of piling
+    up inside the storage client, which keeps latency flat for the requests
+    that are admitted.
+    """
+
+    def __init__(self, max_concurrency, max_queue, wait_timeout, retry_after):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._stats = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected': 0,
+            'timed_out': 0
+        }
+
+    def acquire(self, wait=True):
+        """Take a slot, waiting in the queue if allowed.
+
+        With ``wait=False`` (used for background work) a busy gate is
+        reported immediately instead of taking a queue position away from
+        foreground requests.
+        """
+        with self._condition:
+            # Queued callers go first, so a free slot is only taken directly when nobody waits
+            if self._active < self.max_concurrency and self._waiting == 0:
+                self._active += 1
+                self._stats['admitted'] += 1
+                return
+
+            if not wait or self._waiting >= self.max_queue:
+                self._stats['rejected'] += 1
+                raise StorageOverloaded("Storage backlog is too deep", self.retry_after)
+
+            self._waiting += 1
+            self._stats['queued'] += 1
+            deadline = time.monotonic() + self.wait_timeout
+            try:
+                while self._active >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timed_out'] += 1
+                        raise StorageOverloaded("Timed out waiting for storage", self.retry_after)
+                    self._condition.wait(remaining)
+                self._active += 1
+                self._stats['admitted'] += 1
+            finally:
+                self._waiting -= 1
+
+    def release(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, wait=True):
+        """Context manager holding a slot for the duration of one storage call."""
+        self.acquire(wait)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            stats['active'] = self._active
+            stats['waiting'] = self._waiting
+        return stats
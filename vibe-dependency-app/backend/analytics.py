@@ -0,0 +1,162 @@
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from graph_arrays import graph_to_arrays, compute_schedule
+
+logger = logging.getLogger('dependency-analytics')
+
+# Parallelism analytics of dependency graphs
+#
+# Computed on the array form of graph_arrays.py, counting one slot per
+# transaction:
+#   critical_path  transactions on the longest dependency chain
+#   level_widths   transactions per topological level, where level i holds the
+#                  transactions whose longest chain of dependencies has i edges
+#   max_width      transactions in the widest level
+#   components     weakly connected components, which never conflict with each other
+#   isolated       transactions without any dependency
+#   speedup_bound  transactions / critical path, the bound on the speedup over
+#                  sequential execution with unlimited cores
+#
+# batch_analytics() treats many blocks as one disjoint graph, so the number of
+# vectorized steps follows the longest critical path in the batch, not the
+# number of blocks.
+
+ANALYTICS_FIELDS = ('critical_path', 'level_widths', 'max_width', 'components', 'isolated', 'speedup_bound')
+
+def component_roots(node_count, sources, targets):
+    """Label every node with the smallest node id of its weakly connected component."""
+    parent = np.arange(node_count, dtype=np.int64)
+    while True:
+        source_roots, target_roots = parent[sources], parent[targets]
+        differ = source_roots != target_roots
+        if not differ.any():
+            return parent
+        # Hook the larger root of every edge that spans two trees under the smaller one
+        np.minimum.at(parent, np.maximum(source_roots, target_roots)[differ],
+                      np.minimum(source_roots, target_roots)[differ])
+        # Then point every node directly at its root
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+def batch_analytics(graphs):
+    """Compute the analytics of many graphs given as ``(node_count, sources, targets)``.
+
+    Edges must be sorted by source, as graph_to_arrays() and
+    decode_edge_list() return them. Returns one dict per graph, in order.
+    """
+    graphs = list(graphs)
+    if not graphs:
+        return []
+    node_counts = np.array([node_count for node_count, _, _ in graphs], dtype=np.int64)
+    offsets = np.cumsum(node_counts) - node_counts
+    total = int(node_counts.sum())
+
+    # Shifting each graph by its offset keeps the combined edges sorted by source
+    sources = np.concatenate([np.asarray(s, dtype=np.int64) + offset for (_, s, _), offset in zip(graphs, offsets)])
+    targets = np.concatenate([np.asarray(t, dtype=np.int64) + offset for (_, _, t), offset in zip(graphs, offsets)])
+    graph_of_node = np.repeat(np.arange(len(graphs)), node_counts)
+
+    start, end = compute_schedule(total, sources, targets)
+    critical_path = np.zeros(len(graphs), dtype=np.int64)
+    np.maximum.at(critical_path, graph_of_node, end)
+
+    # Levels have no gaps (a transaction on level i depends on one on level i - 1),
+    # so the sorted (graph, level) counts are the level widths of each graph in turn
+    depth = int(critical_path.max()) + 1
+    keys, widths = np.unique(graph_of_node * depth + start, return_counts=True)
+    bounds = np.searchsorted(keys // depth, np.arange(len(graphs) + 1))
+
+    roots = component_roots(total, sources, targets)
+    components = np.bincount(graph_of_node[roots == np.arange(total)], minlength=len(graphs))
+    degree = np.bincount(sources, minlength=total) + np.bincount(targets, minlength=total)
+    isolated = np.bincount(graph_of_node[degree == 0], minlength=len(graphs))
+
+    results = []
+    for i, node_count in enumerate(node_counts.tolist()):
+        level_widths = widths[bounds[i]:bounds[i + 1]].tolist()
+        results.append({
+            'critical_path': int(critical_path[i]),
+            'level_widths': level_widths,
+            'max_width': max(level_widths, default=0),
+            'components': int(components[i]),
+            'isolated': int(isolated[i]),
+            'speedup_bound': round(node_count / int(critical_path[i]), 3) if critical_path[i] else 0.0
+        })
+    return results
+
+def block_analytics(node_count, sources, targets):
+    """Compute the analytics of one graph in array form."""
+    return batch_analytics([(node_count, sources, targets)])[0]
+
+def graph_analytics(graph):
+    """Compute the analytics of a networkx dependency graph."""
+    labels, sources, targets = graph_to_arrays(graph)
+    return block_analytics(len(labels), sources, targets)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from backfill import BUCKET_NAME, STATS_FOLDER, open_bucket
+    from segments import SEGMENTS_DIR, iter_graph_arrays
+
+    parser = argparse.ArgumentParser(description='Compute parallelism analytics from graph segments and store them in the stats records.')
+    parser.add_argument('--segments', default=SEGMENTS_DIR, help=f'Segment directory written by segments.py (default: {SEGMENTS_DIR})')
+    parser.add_argument('--output', required=True, help='gs://<bucket> or a local directory holding the bucket tree')
+    parser.add_argument('--bucket', default=BUCKET_NAME, help=f'Bucket name for local output (default: {BUCKET_NAME})')
+    parser.add_argument('--start', type=int, default=None, help='First block number (inclusive)')
+    parser.add_argument('--end', type=int, default=None, help='Last block number (exclusive)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Blocks analyzed together (default: 1000)')
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent stats uploads (default: 16)')
+    args = parser.parse_args()
+
+    bucket = open_bucket(args.output, args.bucket)
+
+    def upload(record):
+        bucket.blob(f"{STATS_FOLDER}/{record['block_number']}.json").upload_from_string(
+            json.dumps(record), content_type='application/json'
+        )
+
+    start_time = time.time()
+    analysis_time, written = 0.0, 0
+    batch = []
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        def flush():
+            nonlocal analysis_time, written
+            batch_start = time.time()
+            results = batch_analytics((len(labels), sources, targets) for _, labels, sources, targets in batch)
+            analysis_time += time.time() - batch_start
+            records = [{
+                'block_number': str(block_number),
+                'node_count': len(labels),
+                'edge_count': len(sources),
+                **analytics
+            } for (block_number, labels, sources, _), analytics in zip(batch, results)]
+            list(executor.map(upload, records))
+            written += len(records)
+            batch.clear()
+            logger.info(f"Stored analytics of {written} blocks, up to block {records[-1]['block_number']}")
+
+        for item in iter_graph_arrays(args.segments, args.start, args.end):
+            batch.append(item)
+            if len(batch) >= args.batch_size:
+                flush()
+        if batch:
+            flush()
+
+    logger.info(f"Analyzed {written} blocks in {analysis_time:.1f}s "
+                f"({written / analysis_time if analysis_time > 0 else 0.0:.0f} blocks/s), "
+                f"{time.time() - start_time:.1f}s in total")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,12 +1,23 @@
 import os
+import re
 import base64
 import pickle
+import gzip
+import hashlib
 import time
 import json
 import tempfile
 import sys
 import traceback
 import logging
+import threading
+import queue
+try:
+    import fcntl
+except ImportError:  # Windows: every process polls storage itself
+    fcntl = None
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -56,7 +67,7 @@ if 'cgi' not in sys.modules:
     logger.info("Added stub 'cgi' module for Google Cloud Storage compatibility")
 
 try:
-    from flask import Flask, request, jsonify, send_from_directory
+    from flask import Flask, Response, request, jsonify, send_from_directory
     from flask_cors import CORS
     logger.info("Successfully imported Flask dependencies")
 except ImportError as e:
@@ -72,35 +83,131 @@ except ImportError as e:
     logger.error("Please run: pip install google-cloud-storage")
     sys.exit(1)
 
+import networkx as nx
+from graph_arrays import graph_to_arrays, encode_edge_list, compute_schedule, schedule_to_json
+from analytics import ANALYTICS_FIELDS, block_analytics, graph_analytics
+from admission import AdmissionGate, StorageOverloaded
+from resilience import CircuitBreaker, HedgedReader
+from availability import BlockAvailability
+import storage_access
+import profiling
+import timing
+import tiles
+
 app = Flask(__name__)
 # Configure CORS to allow requests from localhost for development
 CORS(app, resources={r"/api/*": {"origins": ["http://localhost:3000", "https://dependency.pics", "*"]}})
 logger.info("Configured CORS for API routes")
 
+# Opt-in per-request cProfile capture; registers nothing unless PROFILE_REQUESTS is set
+profiling.install(app)
+
+# Server-Timing header with the phase breakdown of every API response
+timing.install(app)
+
 # Cache settings
 CACHE_TIMEOUT = 1800  # Cache timeout in seconds (30 minutes)
-graph_cache = {}  # Cache for graph data
+graph_cache = {}  # Cache for graph images (raw PNG bytes)
 stats_cache = {}  # Cache for graph stats
-gantt_cache = {}  # Cache for gantt chart data
+STATS_CACHE_MAX_ENTRIES = 1000  # Blocks kept in stats_cache
+gantt_cache = {}  # Cache for gantt chart images (raw PNG bytes)
+BASE64_CACHE_MIN_HITS = 2  # Keep the base64 encoding of an image, and responses embedding it, once requested this often
+edges_cache = {}  # Cache for binary edge lists
+schedule_cache = {}  # Cache for serialized gantt schedules
+tiles_cache = {}  # Cache for deep-zoom descriptors (None for blocks without a tile pyramid)
+response_cache = {}  # Cache for finished JSON response bodies (plain and gzip) with their ETags
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # Total size of the cached bodies
+response_builds = OrderedDict()  # Times each uncached body was built, for bodies only cached once they are hot
+RESPONSE_BUILDS_TRACKED = 10000  # Keys remembered in response_builds
 recent_blocks_cache = {
     'data': None,
     'timestamp': 0
 }  # Cache for recent blocks
-min_block_cache = {
+availability_cache = {
     'data': None,
     'timestamp': 0
-}  # Cache for min block number
+}  # BlockAvailability of the blocks that have a graph image
+
+# Batch endpoint settings
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 50))  # Maximum number of blocks per batch request
+BATCH_FETCH_WORKERS = int(os.environ.get('BATCH_FETCH_WORKERS', 8))  # Concurrent storage fetches per batch
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS, thread_name_prefix='batch-fetch')
+
+# Adjacent-block prefetch settings
+PREFETCH_ENABLED = os.environ.get('PREFETCH_ENABLED', 'true').lower() == 'true'
+PREFETCH_DISTANCE = int(os.environ.get('PREFETCH_DISTANCE', 1))  # Prefetch blocks N-d .. N+d
+PREFETCH_QUEUE_SIZE = int(os.environ.get('PREFETCH_QUEUE_SIZE', 32))  # Pending prefetches beyond this are dropped
+prefetch_queue = queue.Queue(maxsize=PREFETCH_QUEUE_SIZE)
+prefetched_blocks = OrderedDict()  # Blocks warmed by prefetch that have not been requested yet
+prefetch_stats = {
+    'scheduled': 0,
+    'dropped': 0,
+    'completed': 0,
+    'shed': 0,
+    'hits': 0
+}
+prefetch_lock = threading.Lock()
+prefetch_thread = None
+active_requests = 0  # Foreground API requests currently in flight
+
+# New block stream settings
+STREAM_POLL_INTERVAL = float(os.environ.get('STREAM_POLL_INTERVAL', 5))  # Seconds between storage checks for new blocks
+STREAM_HEARTBEAT_INTERVAL = 15  # Seconds between keep-alive comments on idle streams
+STREAM_CLIENT_QUEUE_SIZE = 100  # Clients that fall this far behind are disconnected
+STREAM_ROLLOVER_WINDOW = 10000  # Blocks before a new digit from which longer block numbers are listed too
+STREAM_MAX_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', 8))  # Open streams per process, each holds a server thread
+STREAM_RETRY_AFTER = 30  # Retry-After seconds for clients turned away by STREAM_MAX_CLIENTS
+# Only one process polls storage for new blocks and passes them to the others
+# through this file. With preload_app the app is imported in the gunicorn
+# master, so the default path (named after that process) is shared by all of
+# its workers; without preloading every worker polls storage itself.
+STREAM_STATE_FILE = os.environ.get('STREAM_STATE_FILE', os.path.join(tempfile.gettempdir(), f"dependency-stream-{os.getpid()}.json"))
+stream_subscribers = set()  # One event queue per connected client
+stream_lock = threading.Lock()
+stream_detector_thread = None
+stream_leader_file = None  # Open lock file while this process is the one polling storage
+latest_streamed_block = None  # Newest block announced to stream clients
+
+# Admission control for object store calls
+STORAGE_MAX_CONCURRENCY = int(os.environ.get('STORAGE_MAX_CONCURRENCY', 16))  # Storage calls in flight per process
+STORAGE_MAX_QUEUE = int(os.environ.get('STORAGE_MAX_QUEUE', 64))  # Callers allowed to wait for a slot
+STORAGE_QUEUE_TIMEOUT = float(os.environ.get('STORAGE_QUEUE_TIMEOUT', 2.0))  # Seconds a caller may wait for a slot
+STORAGE_RETRY_AFTER = int(os.environ.get('STORAGE_RETRY_AFTER', 5))  # Retry-After seconds sent with 503 responses
+storage_gate = AdmissionGate(STORAGE_MAX_CONCURRENCY, STORAGE_MAX_QUEUE, STORAGE_QUEUE_TIMEOUT, STORAGE_RETRY_AFTER)
+background_work = threading.local()  # background_work.active is set on prefetch/detector threads
+placeholder_stats = threading.local()  # placeholder_stats.served counts the placeholder stats handed out on a thread
+
+# Tail latency and failure handling for object store reads
+STORAGE_HEDGED_READS = os.environ.get('STORAGE_HEDGED_READS', 'false').lower() == 'true'  # Duplicate reads slower than the p95
+STORAGE_HEDGE_PERCENTILE = float(os.environ.get('STORAGE_HEDGE_PERCENTILE', 95))  # Latency percentile after which a read is hedged
+STORAGE_HEDGE_MIN_DELAY = float(os.environ.get('STORAGE_HEDGE_MIN_DELAY', 0.02))  # Never hedge sooner than this many seconds
+STORAGE_CIRCUIT_FAILURES = int(os.environ.get('STORAGE_CIRCUIT_FAILURES', 5))  # Consecutive failures that open the circuit
+STORAGE_CIRCUIT_RESET = float(os.environ.get('STORAGE_CIRCUIT_RESET', 30))  # Seconds before a trial call is let through
+storage_breaker = CircuitBreaker(STORAGE_CIRCUIT_FAILURES, STORAGE_CIRCUIT_RESET)
+hedged_reader = HedgedReader(
+    ThreadPoolExecutor(max_workers=STORAGE_MAX_CONCURRENCY * 2, thread_name_prefix='storage-read'),
+    STORAGE_HEDGE_PERCENTILE, STORAGE_HEDGE_MIN_DELAY
+) if STORAGE_HEDGED_READS else None
+
+# Blocks whose images and stats are loaded before gunicorn forks the workers
+WARM_START_BLOCKS = int(os.environ.get('WARM_START_BLOCKS', 9))
+
+def reset_executors_after_fork():
+    """Give a forked worker fresh thread pools; the parent's threads do not exist in the child."""
+    global batch_executor
+    batch_executor = ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS, thread_name_prefix='batch-fetch')
+    if hedged_reader is not None:
+        hedged_reader.executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_CONCURRENCY * 2, thread_name_prefix='storage-read')
 
-# Global storage client
-storage_client = None
+os.register_at_fork(after_in_child=reset_executors_after_fork)
+
+
+# Size the storage connection pool for every call the admission gate lets through, plus hedges
+storage_access.configure(STORAGE_MAX_CONCURRENCY * (2 if STORAGE_HEDGED_READS else 1))
 
 def get_storage_client():
-    """Get or create a Google Cloud Storage client instance."""
-    global storage_client
-    if storage_client is None:
-        logger.info("Initializing Google Cloud Storage client")
-        storage_client = storage.Client()
-    return storage_client
+    """Get the storage client of this process (thread-safe, recreated after a fork)."""
+    return storage_access.get_client()
 
 # Log environment variables (without sensitive data)
 logger.info(f"Number of environment variables: {len(os.environ)}")
@@ -114,8 +221,12 @@ if 'GOOGLE_APPLICATION_CREDENTIALS' in os.environ:
 else:
     logger.warning("GOOGLE_APPLICATION_CREDENTIALS environment variable is not set")
 
+# A local object store tree needs no credentials
+if storage_access.uses_local_storage():
+    print(f"Using local object store from LOCAL_STORAGE_DIR: {storage_access.LOCAL_STORAGE_DIR}")
+    DEMO_MODE = False
 # Check for alternate Google Cloud credentials format (separate env vars)
-if ('GOOGLE_CREDENTIALS_TYPE' in os.environ and 
+elif ('GOOGLE_CREDENTIALS_TYPE' in os.environ and 
     'GOOGLE_CREDENTIALS_PROJECT_ID' in os.environ and
     'GOOGLE_CREDENTIALS_CLIENT_EMAIL' in os.environ):
     print("Using credentials from separate environment variables")
@@ -167,8 +278,13 @@ if ('GOOGLE_CREDENTIALS_TYPE' in os.environ and
         DEMO_MODE = False
         
         # Cleanup function
+        # Forked gunicorn workers inherit this hook and share the file, so only
+        # the process that created it may delete it
         import atexit
+        creator_pid = os.getpid()
         def cleanup_temp_file():
+            if os.getpid() != creator_pid:
+                return
             try:
                 if os.path.exists(temp_filename):
                     os.unlink(temp_filename)
@@ -241,8 +357,13 @@ elif 'GOOGLE_APPLICATION_CREDENTIALS_JSON' in os.environ:
         
         # We'll clean up the temporary file when the app exits
         # Don't delete immediately as the client might still need it
+        # Forked gunicorn workers inherit this hook and share the file, so only
+        # the process that created it may delete it
         import atexit
+        creator_pid = os.getpid()
         def cleanup_temp_file():
+            if os.getpid() != creator_pid:
+                return
             try:
                 if os.path.exists(temp_filename):
                     os.unlink(temp_filename)
@@ -264,10 +385,19 @@ else:
     print("\nRunning in demo mode with mock data...")
     DEMO_MODE = True
 
+# Demo mode can serve a synthetic corpus (see synthetic_corpus.py) instead of mock data
+DEMO_CORPUS_DIR = os.environ.get('DEMO_CORPUS_DIR')
+if DEMO_MODE and DEMO_CORPUS_DIR:
+    print(f"Serving the synthetic corpus from DEMO_CORPUS_DIR: {DEMO_CORPUS_DIR}")
+    storage_access.use_local_storage(DEMO_CORPUS_DIR)
+USE_MOCK_DATA = DEMO_MODE and not DEMO_CORPUS_DIR
+
 # GCS bucket and folder configuration
 BUCKET_NAME = "ethereum-graphs"
 IMAGES_FOLDER = "images"
 CHARTS_FOLDER = "chart_data"  # Folder for Gantt charts
+TILES_FOLDER = "tiles"  # Deep-zoom tile pyramids of large graph images (renderer.py)
+STATS_FOLDER = "stats"  # Precomputed counts and parallelism analytics (backfill.py, analytics.py)
 
 # Mock data for demo mode
 MOCK_BLOCKS = ["22216953", "22216952", "22216951", "22216950", "22216949", 
@@ -278,41 +408,105 @@ MOCK_EDGE_COUNTS = {block: 80 + int(block[-1]) * 8 for block in MOCK_BLOCKS}
 # Demo mock image - a simple 1x1 pixel transparent PNG
 # In a real implementation, you would include actual sample images
 MOCK_IMAGE = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+MOCK_IMAGE_BYTES = base64.b64decode(MOCK_IMAGE)
 
-def get_image_from_gcs(block_number):
-    """Get a pre-rendered image from Google Cloud Storage."""
-    if DEMO_MODE:
+def storage_slot():
+    """Admission slot for one storage call.
+
+    Foreground requests wait in the queue; background threads never queue and
+    simply skip their work when storage is busy. Cache hits never get here.
+    """
+    return storage_gate.slot(wait=not getattr(background_work, 'active', False))
+
+def storage_read(kind, fn, *args):
+    """Run one storage read through the admission gate and circuit breaker, hedged if enabled."""
+    with storage_slot():
+        if hedged_reader is not None:
+            return storage_breaker.call(hedged_reader.call, kind, fn, *args)
+        return storage_breaker.call(fn, *args)
+
+def storage_exists(blob):
+    """Check whether a blob exists."""
+    with timing.phase('exists'):
+        return storage_read('exists', blob.exists)
+
+def storage_download(blob):
+    """Download a blob's content."""
+    with timing.phase('download'):
+        return storage_read('download', blob.download_as_bytes)
+
+def storage_list(bucket, **kwargs):
+    """List blobs."""
+    with timing.phase('list'):
+        return storage_read('list', lambda: list(bucket.list_blobs(**kwargs)))
+
+def is_fresh(entry):
+    """Check a cache entry's age; while the storage circuit is open every cached entry is served."""
+    return time.time() - entry['timestamp'] < CACHE_TIMEOUT or storage_breaker.is_open()
+
+def cache_lookup(name, cache, key):
+    """Return a fresh cache entry or None, recording the outcome for Server-Timing."""
+    with timing.phase('cache'):
+        entry = cache.get(key)
+        hit = entry is not None and is_fresh(entry)
+    timing.cache_result(name, hit)
+    return entry if hit else None
+
+def encode_image_base64(cache, block_number):
+    """Base64-encode a cached image for legacy JSON responses.
+
+    The encoding is only kept on the cache entry once the image is requested
+    repeatedly, so cold images cost no more memory than their PNG bytes.
+    """
+    entry = cache[block_number]
+    if entry['base64'] is not None:
+        return entry['base64']
+
+    with timing.phase('encode'):
+        img_str = base64.b64encode(entry['data']).decode('utf-8')
+    entry['hits'] += 1
+    if entry['hits'] >= BASE64_CACHE_MIN_HITS:
+        entry['base64'] = img_str
+    return img_str
+
+def cache_image(cache, block_number, image_data):
+    """Store raw image bytes in an image cache."""
+    cache[block_number] = {
+        'data': bytes(image_data),
+        'base64': None,  # Filled in lazily once the image is hot
+        'hits': 0,
+        'timestamp': time.time()
+    }
+
+def get_image_bytes(block_number):
+    """Get a pre-rendered graph image from Google Cloud Storage as a read-only memoryview."""
+    if USE_MOCK_DATA:
         # Return a mock image in demo mode
-        return MOCK_IMAGE
+        return memoryview(MOCK_IMAGE_BYTES)
     
     # Check cache first
-    if block_number in graph_cache and time.time() - graph_cache[block_number]['timestamp'] < CACHE_TIMEOUT:
+    entry = cache_lookup('image', graph_cache, block_number)
+    if entry is not None:
         logger.info(f"Serving graph {block_number} from cache")
-        return graph_cache[block_number]['image']
+        return memoryview(entry['data'])
         
     logger.info(f"Fetching graph {block_number} from Google Cloud Storage")
     bucket = get_storage_client().bucket(BUCKET_NAME)
     blob = bucket.blob(f"{IMAGES_FOLDER}/{block_number}.png")
     
-    if not blob.exists():
-        logger.warning(f"Graph {block_number} not found in GCS")
-        return None
-    
     try:
+        if not is_block_available(block_number, blob):
+            logger.warning(f"Graph {block_number} not found in GCS")
+            return None
+        
         # Download as bytes
         start_time = time.time()
-        image_data = blob.download_as_bytes()
+        image_data = storage_download(blob)
         download_time = time.time() - start_time
         logger.info(f"Downloaded graph {block_number} from GCS in {download_time:.2f}s ({len(image_data)/1024:.1f}KB)")
         
-        # Encode to base64 for frontend display
-        img_str = base64.b64encode(image_data).decode('utf-8')
-        
-        # Cache the result
-        graph_cache[block_number] = {
-            'image': img_str,
-            'timestamp': time.time()
-        }
+        # Cache the raw bytes; base64 is only produced when a JSON response needs it
+        cache_image(graph_cache, block_number, image_data)
         
         # Clean up the cache if it's getting too large (keep the 50 most recent entries)
         if len(graph_cache) > 50:
@@ -323,74 +517,130 @@ def get_image_from_gcs(block_number):
             for k, v in sorted_cache[:50]:
                 graph_cache[k] = v
         
-        return img_str
+        return memoryview(image_data)
+    except StorageOverloaded:
+        raise
     except Exception as e:
         logger.error(f"Error downloading graph {block_number}: {e}")
+        if block_number in graph_cache:
+            # An expired copy is better than no image while storage is failing
+            return memoryview(graph_cache[block_number]['data'])
         return None
 
-def get_gantt_from_gcs(block_number):
-    """Get a pre-rendered Gantt chart image from Google Cloud Storage."""
-    if DEMO_MODE:
+def get_image_from_gcs(block_number):
+    """Get a pre-rendered image from Google Cloud Storage, base64 encoded."""
+    if USE_MOCK_DATA:
         # Return a mock image in demo mode
         return MOCK_IMAGE
     
+    if get_image_bytes(block_number) is None:
+        return None
+    return encode_image_base64(graph_cache, block_number)
+
+def get_gantt_bytes(block_number):
+    """Get a pre-rendered Gantt chart image from Google Cloud Storage as a read-only memoryview."""
+    if USE_MOCK_DATA:
+        # Return a mock image in demo mode
+        return memoryview(MOCK_IMAGE_BYTES)
+    
     # Check cache first
-    if block_number in gantt_cache and time.time() - gantt_cache[block_number]['timestamp'] < CACHE_TIMEOUT:
-        return gantt_cache[block_number]['image']
+    entry = cache_lookup('gantt', gantt_cache, block_number)
+    if entry is not None:
+        return memoryview(entry['data'])
         
     bucket = get_storage_client().bucket(BUCKET_NAME)
     blob = bucket.blob(f"chart_data_images/{block_number}.png")
     
-    if not blob.exists():
-        return None
-    
     try:
-        # Download as bytes
-        image_data = blob.download_as_bytes()
+        # Blocks without a graph have no gantt chart either; availability is
+        # decided by the graph image, the chart may still be missing
+        if not is_block_available(block_number, bucket.blob(f"{IMAGES_FOLDER}/{block_number}.png")) or not storage_exists(blob):
+            return None
         
-        # Encode to base64 for frontend display
-        img_str = base64.b64encode(image_data).decode('utf-8')
+        # Download as bytes
+        image_data = storage_download(blob)
         
-        # Cache the result
-        gantt_cache[block_number] = {
-            'image': img_str,
-            'timestamp': time.time()
-        }
+        # Cache the raw bytes; base64 is only produced when a JSON response needs it
+        cache_image(gantt_cache, block_number, image_data)
         
-        return img_str
+        return memoryview(image_data)
         
+    except StorageOverloaded:
+        raise
     except Exception as e:
         print(f"Error loading Gantt chart image for block {block_number}: {e}")
+        if block_number in gantt_cache:
+            # An expired copy is better than no image while storage is failing
+            return memoryview(gantt_cache[block_number]['data'])
+        return None
+
+def get_gantt_from_gcs(block_number):
+    """Get a pre-rendered Gantt chart image from Google Cloud Storage, base64 encoded."""
+    if USE_MOCK_DATA:
+        # Return a mock image in demo mode
+        return MOCK_IMAGE
+    
+    if get_gantt_bytes(block_number) is None:
         return None
+    return encode_image_base64(gantt_cache, block_number)
+
+def get_availability():
+    """Get the set of blocks that have a graph image.
+
+    The images folder is listed once per cache period; in between, existence
+    checks, nearest-block lookups and the recent/minimum block numbers are
+    answered from memory. New blocks are added by the stream detector.
+    """
+    if availability_cache['data'] is not None and (USE_MOCK_DATA or is_fresh(availability_cache)):
+        return availability_cache['data']
+
+    if USE_MOCK_DATA:
+        block_numbers = MOCK_BLOCKS
+    else:
+        bucket = get_storage_client().bucket(BUCKET_NAME)
+        block_numbers = []
+        for blob in storage_list(bucket, prefix=f"{IMAGES_FOLDER}/"):
+            filename = blob.name.split('/')[-1]
+            if filename.endswith('.png') and filename[:-len('.png')].isdigit():
+                block_numbers.append(filename[:-len('.png')])
+
+    availability_cache['data'] = BlockAvailability.from_blocks(block_numbers)
+    availability_cache['timestamp'] = time.time()
+    response_cache.pop('availability', None)
+    return availability_cache['data']
+
+def is_block_available(block_number, blob=None):
+    """Check whether a block has a graph image, normally without a storage call.
+
+    Blocks newer than the newest known one may have been added since the
+    last listing, so for those ``blob`` is checked in storage instead.
+    """
+    if not block_number.isdigit():
+        return False
+    availability = get_availability()
+    if block_number in availability:
+        return True
+    newest = availability.max()
+    if blob is None or (newest is not None and int(block_number) <= newest):
+        return False
+    if not storage_exists(blob):
+        return False
+    availability.add(block_number)
+    return True
 
 def get_recent_block_numbers():
     """Get the most recent block numbers from GCS."""
-    if DEMO_MODE:
+    if USE_MOCK_DATA:
         return MOCK_BLOCKS
     
     # Check cache first
-    if recent_blocks_cache['data'] and time.time() - recent_blocks_cache['timestamp'] < CACHE_TIMEOUT:
+    if recent_blocks_cache['data'] and is_fresh(recent_blocks_cache):
         return recent_blocks_cache['data']
         
-    bucket = get_storage_client().bucket(BUCKET_NAME)
-    blobs = list(bucket.list_blobs(prefix=f"{IMAGES_FOLDER}/"))
-    
-    # Extract block numbers from filenames
-    block_numbers = []
-    for blob in blobs:
-        filename = blob.name.split('/')[-1]
-        if filename.endswith('.png'):
-            try:
-                block_number = filename.split('.')[0]
-                block_numbers.append(block_number)
-            except ValueError:
-                continue
-    
-    # Sort and get 9 highest block numbers
-    # We'll convert to int for sorting, then back to string
+    # Get the 9 highest block numbers
+    block_numbers = [str(block) for block in get_availability().newest(9)]
     if block_numbers:
-        block_numbers = sorted(block_numbers, key=lambda x: int(x), reverse=True)
-        result = block_numbers[:9]
+        result = block_numbers
         
         # Cache the result
         recent_blocks_cache['data'] = result
@@ -400,105 +650,548 @@ def get_recent_block_numbers():
     
     return []
 
+def load_graph_from_gcs(block_number):
+    """Download and unpickle the dependency graph of a block, or return None."""
+    if USE_MOCK_DATA:
+        # Build a small random DAG matching the mock node and edge counts
+        node_count = MOCK_NODE_COUNTS.get(block_number, 5)
+        edge_count = MOCK_EDGE_COUNTS.get(block_number, 5)
+        seed = int(block_number) if block_number.isdigit() else 0
+        mock_graph = nx.gnm_random_graph(node_count, edge_count, seed=seed, directed=True)
+        graph = nx.DiGraph()
+        graph.add_nodes_from(mock_graph.nodes)
+        graph.add_edges_from((min(u, v), max(u, v)) for u, v in mock_graph.edges)
+        return graph
+
+    bucket = get_storage_client().bucket(BUCKET_NAME)
+    blob = bucket.blob(f"graphs/{block_number}.pkl")
+
+    # Availability is decided by the graph image; the pickle is checked once on its own
+    if not is_block_available(block_number, bucket.blob(f"{IMAGES_FOLDER}/{block_number}.png")) or not storage_exists(blob):
+        return None
+
+    # Download the pickle file and load the graph object
+    pkl_data = storage_download(blob)
+    with timing.phase('deserialize'):
+        graph = pickle.loads(pkl_data)
+
+    # Every caller needs the stats sooner or later, so cache them right away
+    entry = stats_cache.get(block_number)
+    if entry is None or not is_fresh(entry):
+        with timing.phase('analytics'):
+            labels, sources, targets = graph_to_arrays(graph)
+            stats = {
+                "node_count": len(graph.nodes),
+                "edge_count": len(graph.edges),
+                **block_analytics(len(labels), sources, targets)
+            }
+        cache_stats(block_number, stats)
+
+    return graph
+
+def load_stats_from_gcs(block_number):
+    """Read the precomputed stats record of a block, or None if it has none with analytics."""
+    bucket = get_storage_client().bucket(BUCKET_NAME)
+    blob = bucket.blob(f"{STATS_FOLDER}/{block_number}.json")
+
+    if not is_block_available(block_number) or not storage_exists(blob):
+        return None
+
+    with timing.phase('deserialize'):
+        record = json.loads(storage_download(blob))
+    # Records written before the analytics existed only hold the counts
+    if any(field not in record for field in ANALYTICS_FIELDS):
+        return None
+
+    stats = {field: record[field] for field in ('node_count', 'edge_count') + ANALYTICS_FIELDS}
+    cache_stats(block_number, stats)
+    return stats
+
+def cache_stats(block_number, stats):
+    """Cache the stats of a block, dropping the oldest entry when the cache is full."""
+    stats_cache[block_number] = {'stats': stats, 'timestamp': time.time()}
+    if len(stats_cache) > STATS_CACHE_MAX_ENTRIES:
+        oldest = min(stats_cache, key=lambda k: stats_cache[k]['timestamp'])
+        del stats_cache[oldest]
+
+def stats_fields(stats):
+    """The counts and, where known, the parallelism analytics of a stats entry, for responses."""
+    return {field: stats[field] for field in ('node_count', 'edge_count') + ANALYTICS_FIELDS if field in stats}
+
 def get_graph_stats(block_number):
-    """Get the number of nodes and edges for a graph."""
-    if DEMO_MODE:
-        return {
+    """Get the node and edge counts and the parallelism analytics of a graph.
+
+    When the stats cannot be loaded, placeholder counts are returned and
+    counted in ``placeholder_stats``, so response bodies built from them are
+    not cached.
+    """
+    # Check cache first
+    entry = cache_lookup('stats', stats_cache, block_number)
+    if entry is not None:
+        return entry['stats']
+    
+    if USE_MOCK_DATA:
+        stats = {
             "node_count": MOCK_NODE_COUNTS.get(block_number, 5),
-            "edge_count": MOCK_EDGE_COUNTS.get(block_number, 5)
+            "edge_count": MOCK_EDGE_COUNTS.get(block_number, 5),
+            **graph_analytics(load_graph_from_gcs(block_number))
         }
+        cache_stats(block_number, stats)
+        return stats
     
-    # Check cache first
-    if block_number in stats_cache and time.time() - stats_cache[block_number]['timestamp'] < CACHE_TIMEOUT:
-        return stats_cache[block_number]['stats']
-    
-    # Try to load the graph data from the pickle file
     try:
-        bucket = get_storage_client().bucket(BUCKET_NAME)
-        blob = bucket.blob(f"graphs/{block_number}.pkl")
-        
-        if blob.exists():
-            # Download the pickle file
-            pkl_data = blob.download_as_bytes()
-            
-            # Load the graph object
-            graph = pickle.loads(pkl_data)
-            
-            # Extract node and edge counts
-            stats = {
-                "node_count": len(graph.nodes),
-                "edge_count": len(graph.edges)
-            }
-            
-            # Cache the result
-            stats_cache[block_number] = {
-                'stats': stats,
-                'timestamp': time.time()
-            }
-            
+        # A precomputed stats record is much smaller than the graph
+        stats = load_stats_from_gcs(block_number)
+        if stats is not None:
             return stats
+        # Loading the graph also caches its stats
+        if load_graph_from_gcs(block_number) is not None:
+            return stats_cache[block_number]['stats']
+    except StorageOverloaded:
+        raise
     except Exception as e:
         print(f"Error loading graph data for block {block_number}: {e}")
     
     # Fallback to placeholder values if loading fails
+    placeholder_stats.served = getattr(placeholder_stats, 'served', 0) + 1
     return {
         "node_count": 10,  # Placeholder
         "edge_count": 15   # Placeholder
     }
 
+def get_edge_list(block_number):
+    """Get the compact binary edge list of a block's dependency graph."""
+    # Check cache first
+    entry = cache_lookup('edges', edges_cache, block_number)
+    if entry is not None:
+        return entry['payload']
+
+    graph = load_graph_from_gcs(block_number)
+    if graph is None:
+        return None
+
+    with timing.phase('encode'):
+        payload = encode_edge_list(*graph_to_arrays(graph))
+
+    # Cache the result
+    edges_cache[block_number] = {
+        'payload': payload,
+        'timestamp': time.time()
+    }
+
+    # Edge lists are small, but keep the cache bounded like the image cache
+    if len(edges_cache) > 200:
+        oldest = min(edges_cache, key=lambda k: edges_cache[k]['timestamp'])
+        del edges_cache[oldest]
+
+    return payload
+
+def get_gantt_schedule(block_number):
+    """Get the per-transaction start/end slots of a block as compact JSON bytes.
+
+    Precomputed schedules in the chart data folder are used when available,
+    otherwise the schedule is computed from the stored dependency graph.
+    """
+    # Check cache first
+    entry = cache_lookup('schedule', schedule_cache, block_number)
+    if entry is not None:
+        return entry['payload']
+
+    payload = None
+    if not USE_MOCK_DATA:
+        bucket = get_storage_client().bucket(BUCKET_NAME)
+        blob = bucket.blob(f"{CHARTS_FOLDER}/{block_number}.json")
+        if storage_exists(blob):
+            payload = storage_download(blob)
+
+    if payload is None:
+        graph = load_graph_from_gcs(block_number)
+        if graph is None:
+            return None
+        with timing.phase('encode'):
+            labels, sources, targets = graph_to_arrays(graph)
+            start, end = compute_schedule(len(labels), sources, targets)
+            payload = schedule_to_json(block_number, labels, start, end)
+
+    # Cache the result
+    schedule_cache[block_number] = {
+        'payload': payload,
+        'timestamp': time.time()
+    }
+
+    # Keep the cache bounded like the edge list cache
+    if len(schedule_cache) > 200:
+        oldest = min(schedule_cache, key=lambda k: schedule_cache[k]['timestamp'])
+        del schedule_cache[oldest]
+
+    return payload
+
 def get_min_block_number():
     """Get the minimum block number available."""
-    if DEMO_MODE:
+    if USE_MOCK_DATA:
         if MOCK_BLOCKS:
             return min(MOCK_BLOCKS, key=lambda x: int(x))
         return None
     
-    # Check cache first
-    if min_block_cache['data'] and time.time() - min_block_cache['timestamp'] < CACHE_TIMEOUT:
-        return min_block_cache['data']
-        
-    bucket = get_storage_client().bucket(BUCKET_NAME)
-    blobs = list(bucket.list_blobs(prefix=f"{IMAGES_FOLDER}/"))
-    
-    block_numbers = []
-    for blob in blobs:
-        filename = blob.name.split('/')[-1]
-        if filename.endswith('.png'):
-            try:
-                block_number = filename.split('.')[0]
-                block_numbers.append(int(block_number))
-            except ValueError:
+    min_block = get_availability().min()
+    return str(min_block) if min_block is not None else None
+
+@app.before_request
+def track_request_start():
+    """Count foreground API requests so prefetching can stay out of their way."""
+    global active_requests
+    if request.path.startswith('/api/'):
+        with prefetch_lock:
+            active_requests += 1
+
+@app.teardown_request
+def track_request_end(exc=None):
+    global active_requests
+    if request.path.startswith('/api/'):
+        with prefetch_lock:
+            active_requests = max(0, active_requests - 1)
+
+def prefetch_worker():
+    """Background loop that warms the caches for queued neighbouring blocks."""
+    # Storage calls from this thread are shed instead of queued when storage is busy
+    background_work.active = True
+    while True:
+        block_number = prefetch_queue.get()
+        try:
+            # Low priority: never compete with requests that are being served
+            while active_requests > 0:
+                time.sleep(0.05)
+
+            if get_image_bytes(block_number) is None:
+                continue
+            get_gantt_bytes(block_number)
+            get_graph_stats(block_number)
+
+            with prefetch_lock:
+                prefetched_blocks[block_number] = time.time()
+                # Forget the oldest prefetched blocks that were never requested
+                while len(prefetched_blocks) > PREFETCH_QUEUE_SIZE * 4:
+                    prefetched_blocks.popitem(last=False)
+                prefetch_stats['completed'] += 1
+        except StorageOverloaded:
+            prefetch_stats['shed'] += 1
+        except Exception as e:
+            logger.warning(f"Prefetch of block {block_number} failed: {e}")
+        finally:
+            prefetch_queue.task_done()
+
+def ensure_prefetch_worker():
+    """Start the prefetch thread on first use (and again after a fork)."""
+    global prefetch_thread
+    if prefetch_thread is None or not prefetch_thread.is_alive():
+        prefetch_thread = threading.Thread(target=prefetch_worker, name='prefetch', daemon=True)
+        prefetch_thread.start()
+
+def is_block_cached(block_number):
+    """Check whether the graph, gantt chart and stats for a block are all cached."""
+    return all(
+        block_number in cache and is_fresh(cache[block_number])
+        for cache in (graph_cache, gantt_cache, stats_cache)
+    )
+
+def schedule_prefetch(block_number):
+    """Queue the neighbours of a block that was just served for prefetching."""
+    if USE_MOCK_DATA or not PREFETCH_ENABLED or not block_number.isdigit():
+        return
+
+    ensure_prefetch_worker()
+    latest_block = int(recent_blocks_cache['data'][0]) if recent_blocks_cache['data'] else None
+
+    for offset in range(1, PREFETCH_DISTANCE + 1):
+        for neighbour in (int(block_number) + offset, int(block_number) - offset):
+            if neighbour < 0 or (latest_block is not None and neighbour > latest_block):
+                continue
+            neighbour = str(neighbour)
+            if neighbour in prefetched_blocks or is_block_cached(neighbour):
                 continue
+            try:
+                prefetch_queue.put_nowait(neighbour)
+                with prefetch_lock:
+                    prefetch_stats['scheduled'] += 1
+            except queue.Full:
+                with prefetch_lock:
+                    prefetch_stats['dropped'] += 1
+
+def record_prefetch_hit(block_number):
+    """Count a foreground request that is served from a prefetched cache entry."""
+    with prefetch_lock:
+        if prefetched_blocks.pop(block_number, None) is not None:
+            prefetch_stats['hits'] += 1
+
+def get_prefetch_stats():
+    """Return the prefetch counters together with the hit rate."""
+    with prefetch_lock:
+        stats = dict(prefetch_stats)
+    stats['queued'] = prefetch_queue.qsize()
+    stats['hit_rate'] = round(stats['hits'] / stats['completed'], 3) if stats['completed'] else 0.0
+    return stats
+
+def warm_caches():
+    """Load the block listing and the newest blocks into the caches.
+
+    Called once in the gunicorn master before the workers are forked (see
+    gunicorn.conf.py), so every worker starts with the same warm caches,
+    shared copy-on-write instead of fetched once per worker.
+    """
+    if USE_MOCK_DATA:
+        return
+    start_time = time.time()
+    get_availability()
+    recent_blocks = get_recent_block_numbers()
+    for block_number in recent_blocks[:WARM_START_BLOCKS]:
+        get_image_bytes(block_number)
+        get_gantt_bytes(block_number)
+        get_graph_stats(block_number)
+    logger.info(f"Warmed caches with {min(len(recent_blocks), WARM_START_BLOCKS)} blocks in {time.time() - start_time:.2f}s")
+
+def get_cached_body(cache_key, build_data, min_builds=1):
+    """Get a pre-serialized JSON response body, building it on a cache miss.
+
+    ``build_data`` returns the data to serialize, or None if the resource does
+    not exist (which is not cached). The body, its gzip variant and its ETag
+    are computed once, so repeat requests cost no JSON encoding at all.
+    Bodies that embed images are large, so callers pass ``min_builds`` to
+    cache them only once they have been requested that often. Bodies built
+    from placeholder stats are served but not cached.
+    """
+    entry = cache_lookup('response', response_cache, cache_key)
+    if entry is not None:
+        return entry
+
+    placeholders_before = getattr(placeholder_stats, 'served', 0)
+    data = build_data()
+    if data is None:
+        return None
+
+    with timing.phase('serialize'):
+        body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    with timing.phase('encode'):
+        entry = {
+            'body': body,
+            'gzip': gzip.compress(body, compresslevel=6),
+            'etag': hashlib.sha1(body).hexdigest(),
+            'timestamp': time.time()
+        }
+    entry['size'] = len(entry['body']) + len(entry['gzip'])
+
+    if getattr(placeholder_stats, 'served', 0) != placeholders_before:
+        return entry
+    if min_builds > 1:
+        builds = response_builds.pop(cache_key, 0) + 1
+        if builds < min_builds:
+            response_builds[cache_key] = builds
+            while len(response_builds) > RESPONSE_BUILDS_TRACKED:
+                response_builds.popitem(last=False)
+            return entry
+    if entry['size'] > RESPONSE_CACHE_MAX_BYTES:
+        return entry
+    response_cache[cache_key] = entry
+
+    # Drop the oldest bodies while the cache is over its size budget
+    entries = sorted(list(response_cache.items()), key=lambda item: item[1]['timestamp'])
+    total = sum(cached['size'] for _, cached in entries)
+    for key, cached in entries:
+        if total <= RESPONSE_CACHE_MAX_BYTES:
+            break
+        response_cache.pop(key, None)
+        total -= cached['size']
+
+    return entry
+
+def make_cached_response(entry):
+    """Turn a cached body into a response, answering 304 when the client has it.
+
+    The gzip and plain representations have distinct strong ETags; either one
+    matches, since both stand for the same content.
+    """
+    use_gzip = bool(request.accept_encodings['gzip'])
+    etag = f"{entry['etag']}-gz" if use_gzip else entry['etag']
+    if request.if_none_match.contains(entry['etag']) or request.if_none_match.contains(f"{entry['etag']}-gz"):
+        response = Response(status=304)
+    elif use_gzip:
+        response = Response(entry['gzip'], mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(entry['body'], mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Add caching headers
+    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return response
+
+def block_not_found(message, block_number):
+    """404 response for a missing block, pointing at the nearest block that has a graph."""
+    body = {"error": message}
+    if block_number.isdigit():
+        try:
+            nearest = get_availability().nearest(block_number)
+        except StorageOverloaded:
+            nearest = None
+        body["nearest_block"] = str(nearest) if nearest is not None else None
+    return jsonify(body), 404
+
+@app.route('/api/graph/<block_number>', methods=['GET'])
+def get_graph(block_number):
+    record_prefetch_hit(block_number)
     
-    if block_numbers:
-        min_block = str(min(block_numbers))
+    def build_data():
+        image_data = get_image_from_gcs(block_number)
+        if image_data is None:
+            return None
         
-        # Cache the result
-        min_block_cache['data'] = min_block
-        min_block_cache['timestamp'] = time.time()
+        # Get graph stats
+        stats = get_graph_stats(block_number)
         
-        return min_block
+        return {
+            "block_number": block_number,
+            "image": image_data,
+            **stats_fields(stats),
+            "demo_mode": DEMO_MODE
+        }
     
-    return None
-
-@app.route('/api/graph/<block_number>', methods=['GET'])
-def get_graph(block_number):
-    image_data = get_image_from_gcs(block_number)
+    entry = get_cached_body(f"graph:{block_number}", build_data, min_builds=BASE64_CACHE_MIN_HITS)
+    if entry is None:
+        return block_not_found("Graph not found", block_number)
     
-    if image_data is None:
-        return jsonify({"error": "Graph not found"}), 404
+    # Warm the caches for the blocks the user is likely to open next
+    schedule_prefetch(block_number)
     
-    # Get graph stats
-    stats = get_graph_stats(block_number)
+    return make_cached_response(entry)
+
+def make_png_response(image_view):
+    """Serve cached PNG bytes without base64 or JSON wrapping."""
+    # The caches hold immutable bytes, so the memoryview's underlying object can be sent without a copy
+    response = Response(image_view.obj if isinstance(image_view.obj, bytes) else image_view.tobytes(), mimetype='image/png')
+    # Add caching headers
+    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return response
+
+@app.route('/api/graph/<block_number>/image.png', methods=['GET'])
+def get_graph_image(block_number):
+    """Get the pre-rendered graph image of a block as a plain PNG."""
+    record_prefetch_hit(block_number)
+    image_view = get_image_bytes(block_number)
+    if image_view is None:
+        return block_not_found("Graph not found", block_number)
     
+    # Warm the caches for the blocks the user is likely to open next
+    schedule_prefetch(block_number)
+    return make_png_response(image_view)
+
+@app.route('/api/gantt/<block_number>/image.png', methods=['GET'])
+def get_gantt_image(block_number):
+    """Get the pre-rendered Gantt chart of a block as a plain PNG."""
+    image_view = get_gantt_bytes(block_number)
+    if image_view is None:
+        return block_not_found(f'Gantt chart not found for block {block_number}', block_number)
+    return make_png_response(image_view)
+
+def get_tiles_descriptor(block_number):
+    """Get the deep-zoom descriptor of a block's graph image, or None if it has no tile pyramid."""
+    entry = cache_lookup('tiles', tiles_cache, block_number)
+    if entry is not None:
+        return entry['descriptor']
+
+    descriptor = None
+    # Mock images are tiny, they never get a pyramid
+    if not USE_MOCK_DATA and is_block_available(block_number):
+        blob = get_storage_client().bucket(BUCKET_NAME).blob(f"{TILES_FOLDER}/{tiles.descriptor_path(block_number)}")
+        if storage_exists(blob):
+            descriptor = storage_download(blob)
+
+    tiles_cache[block_number] = {'descriptor': descriptor, 'timestamp': time.time()}
+    return descriptor
+
+def tile_exists(descriptor, level, column, row):
+    """Check a tile position against the image size in the descriptor."""
+    match = re.search(rb'Width="(\d+)"\s+Height="(\d+)"', descriptor)
+    tile_size = re.search(rb'TileSize="(\d+)"', descriptor)
+    if not match or not tile_size:
+        return False
+    width, height = int(match.group(1)), int(match.group(2))
+    if level > tiles.max_level(width, height):
+        return False
+    level_width, level_height = tiles.level_size(width, height, level)
+    size = int(tile_size.group(1))
+    return column * size < level_width and row * size < level_height
+
+@app.route('/api/graph/<block_number>/tiles.dzi', methods=['GET'])
+def get_graph_tiles_descriptor(block_number):
+    """Get the Deep Zoom descriptor of a large graph image.
+
+    Tiles are served next to it under ``tiles_files/``, the layout Deep Zoom
+    viewers derive from the descriptor URL. Blocks whose image is small
+    enough to be shown whole have no descriptor (404).
+    """
+    descriptor = get_tiles_descriptor(block_number)
+    if descriptor is None:
+        return block_not_found("No tile pyramid for this block", block_number)
+    response = Response(descriptor, mimetype='application/xml')
+    # Add caching headers
+    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return response
+
+@app.route('/api/graph/<block_number>/tiles_files/<int:level>/<int:column>_<int:row>.png', methods=['GET'])
+def get_graph_tile(block_number, level, column, row):
+    """Get one tile of a large graph image."""
+    descriptor = get_tiles_descriptor(block_number)
+    if descriptor is None or not tile_exists(descriptor, level, column, row):
+        return block_not_found("Tile not found", block_number)
+
+    blob = get_storage_client().bucket(BUCKET_NAME).blob(
+        f"{TILES_FOLDER}/{tiles.tile_path(block_number, level, column, row)}")
+    try:
+        data = storage_download(blob)
+    except StorageOverloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error downloading tile {level}/{column}_{row} of block {block_number}: {e}")
+        return jsonify({"error": f"Error retrieving tile: {str(e)}"}), 500
+    # Tiles are only downloaded on demand and not kept in memory, browsers cache them instead
+    return make_png_response(memoryview(data))
+
+@app.route('/api/graph/<block_number>/edges', methods=['GET'])
+def get_graph_edges(block_number):
+    """Get a block's dependency graph as a compact binary edge list.
+
+    See graph_arrays.py for the format. Clients can render the graph locally
+    from this payload instead of downloading the pre-rendered PNG.
+    """
+    try:
+        payload = get_edge_list(block_number)
+    except StorageOverloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error building edge list for block {block_number}: {e}")
+        return jsonify({"error": f"Error retrieving edge list: {str(e)}"}), 500
+
+    if payload is None:
+        return block_not_found("Graph not found", block_number)
+
+    response = Response(payload, mimetype='application/octet-stream')
+    # Add caching headers
+    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return response
+
+@app.route('/api/graph/<block_number>/stats', methods=['GET'])
+def get_graph_stats_only(block_number):
+    """Get the counts and parallelism analytics of a block without any image data."""
+    blob = None if USE_MOCK_DATA else get_storage_client().bucket(BUCKET_NAME).blob(f"{IMAGES_FOLDER}/{block_number}.png")
+    if not is_block_available(block_number, blob):
+        return block_not_found("Graph not found", block_number)
+
+    stats = get_graph_stats(block_number)
     response = jsonify({
         "block_number": block_number,
-        "image": image_data,
-        "node_count": stats["node_count"],
-        "edge_count": stats["edge_count"],
+        **stats_fields(stats),
         "demo_mode": DEMO_MODE
     })
-    
     # Add caching headers
     response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
     return response
@@ -507,52 +1200,395 @@ def get_graph(block_number):
 def get_gantt(block_number):
     """Get a Gantt chart for a given block number."""
     try:
-        # Get chart image from GCS
-        image_data = get_gantt_from_gcs(block_number)
+        record_prefetch_hit(block_number)
+        
+        def build_data():
+            # Get chart image from GCS
+            image_data = get_gantt_from_gcs(block_number)
+            if not image_data:
+                return None
+            
+            # Get graph stats
+            stats = get_graph_stats(block_number)
+            
+            # Return image data and stats
+            return {
+                'block_number': block_number,
+                'image': image_data,
+                **stats_fields(stats),
+                'demo_mode': DEMO_MODE
+            }
         
-        if not image_data:
-            return jsonify({'error': f'Gantt chart not found for block {block_number}'}), 404
+        entry = get_cached_body(f"gantt:{block_number}", build_data, min_builds=BASE64_CACHE_MIN_HITS)
+        if entry is None:
+            return block_not_found(f'Gantt chart not found for block {block_number}', block_number)
         
-        # Get graph stats
-        stats = get_graph_stats(block_number)
+        # Warm the caches for the blocks the user is likely to open next
+        schedule_prefetch(block_number)
         
-        # Return image data and stats
-        response = jsonify({
-            'block_number': block_number,
-            'image': image_data,
-            'node_count': stats['node_count'],
-            'edge_count': stats['edge_count'],
-            'demo_mode': DEMO_MODE
-        })
-        
-        # Add caching headers
-        response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
-        return response
+        return make_cached_response(entry)
+    except StorageOverloaded:
+        raise
     except Exception as e:
         print(f"Error in gantt API for block {block_number}: {e}")
         return jsonify({'error': f'Error retrieving Gantt chart: {str(e)}'}), 500
 
+def get_block_summary(block_number, include_images=False):
+    """Collect metadata and image references for a single block.
+
+    Used by the batch endpoint; every storage call goes through the same
+    cached helpers as the single-block routes, so a batch also warms the caches.
+    """
+    if not block_number.isdigit():
+        return {"block_number": block_number, "status": "invalid"}
+
+    try:
+        if get_image_bytes(block_number) is None:
+            return {"block_number": block_number, "status": "not_found"}
+
+        has_gantt = get_gantt_bytes(block_number) is not None
+        stats = get_graph_stats(block_number)
+
+        summary = {
+            "block_number": block_number,
+            "status": "ok",
+            "graph_url": f"/api/graph/{block_number}",
+            "image_url": f"/api/graph/{block_number}/image.png",
+            "gantt_url": f"/api/gantt/{block_number}" if has_gantt else None,
+            "gantt_image_url": f"/api/gantt/{block_number}/image.png" if has_gantt else None,
+            **stats_fields(stats),
+            "demo_mode": DEMO_MODE
+        }
+        if include_images:
+            summary["image"] = get_image_from_gcs(block_number)
+            summary["gantt_image"] = get_gantt_from_gcs(block_number) if has_gantt else None
+        return summary
+    except StorageOverloaded:
+        return {"block_number": block_number, "status": "unavailable"}
+    except Exception as e:
+        logger.error(f"Error building batch entry for block {block_number}: {e}")
+        return {"block_number": block_number, "status": "error"}
+
+@app.route('/api/graphs', methods=['GET'])
+def get_graphs_batch():
+    """Get metadata and image references for many blocks in one request.
+
+    Blocks are passed as a comma-separated list, e.g. ``/api/graphs?blocks=1,2,3``.
+    Cache misses are fetched concurrently and every block gets its own status.
+    """
+    blocks_param = request.args.get('blocks', '')
+    block_numbers = []
+    for block in blocks_param.split(','):
+        block = block.strip()
+        if block and block not in block_numbers:
+            block_numbers.append(block)
+
+    if not block_numbers:
+        return jsonify({"error": "No block numbers given, use ?blocks=a,b,c"}), 400
+
+    if len(block_numbers) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Too many blocks requested (maximum is {MAX_BATCH_SIZE})"}), 400
+
+    include_images = request.args.get('include_images', '').lower() == 'true'
+
+    # Fetch all blocks concurrently; map() keeps the request order
+    # Storage time spent on the fetch threads still shows up in Server-Timing
+    results = list(batch_executor.map(
+        timing.bind(lambda block: get_block_summary(block, include_images)), block_numbers
+    ))
+
+    response = jsonify({
+        "blocks": results,
+        "found": sum(1 for r in results if r["status"] == "ok"),
+        "requested": len(block_numbers),
+        "demo_mode": DEMO_MODE
+    })
+
+    # Add caching headers
+    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return response
+
+@app.route('/api/gantt/<block_number>/schedule', methods=['GET'])
+def get_gantt_schedule_data(block_number):
+    """Get the gantt schedule of a block as data instead of an image.
+
+    The response lists transactions with their start and end execution slots
+    as parallel arrays, so the frontend can draw the chart itself.
+    """
+    blob = None if USE_MOCK_DATA else get_storage_client().bucket(BUCKET_NAME).blob(f"{IMAGES_FOLDER}/{block_number}.png")
+    if not is_block_available(block_number, blob):
+        return block_not_found(f'Gantt schedule not found for block {block_number}', block_number)
+
+    try:
+        payload = get_gantt_schedule(block_number)
+    except StorageOverloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing gantt schedule for block {block_number}: {e}")
+        return jsonify({'error': f'Error computing Gantt schedule: {str(e)}'}), 500
+
+    if payload is None:
+        return block_not_found(f'Gantt schedule not found for block {block_number}', block_number)
+
+    response = Response(payload, mimetype='application/json')
+    # Add caching headers
+    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return response
+
+@app.route('/api/availability', methods=['GET'])
+def get_block_availability():
+    """Get the run-length encoded set of blocks that have a graph.
+
+    See availability.py for the format. Clients can answer existence and
+    nearest-block questions locally instead of requesting missing blocks.
+    """
+    response = make_cached_response(get_cached_body('availability', lambda: get_availability().to_json()))
+    # New blocks are added continuously, so clients should revalidate (cheaply, by ETag) soon
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
+
+@app.route('/api/blocks/<block_number>/nearest', methods=['GET'])
+def get_nearest_block(block_number):
+    """Get the available block closest to a block number."""
+    if not block_number.isdigit():
+        return jsonify({"error": "Block number must be a positive integer"}), 400
+
+    availability = get_availability()
+    nearest = availability.nearest(block_number)
+    return jsonify({
+        "block_number": block_number,
+        "available": block_number in availability,
+        "nearest_block": str(nearest) if nearest is not None else None
+    })
+
 @app.route('/api/recent_graphs', methods=['GET'])
 def get_recent_graphs():
     """Get the 9 most recent graphs."""
-    recent_blocks = get_recent_block_numbers()
-    
-    result = []
-    for block in recent_blocks:
-        image_data = get_image_from_gcs(block)
-        if image_data:
-            stats = get_graph_stats(block)
-            result.append({
-                "block_number": block,
-                "image": image_data,
-                "node_count": stats["node_count"],
-                "edge_count": stats["edge_count"],
-                "demo_mode": DEMO_MODE
-            })
+    def build_data():
+        recent_blocks = get_recent_block_numbers()
+        
+        result = []
+        for block in recent_blocks:
+            image_data = get_image_from_gcs(block)
+            if image_data:
+                stats = get_graph_stats(block)
+                result.append({
+                    "block_number": block,
+                    "image": image_data,
+                    **stats_fields(stats),
+                    "demo_mode": DEMO_MODE
+                })
+        return result
     
-    response = jsonify(result)
-    # Add caching headers
-    response.headers['Cache-Control'] = f'public, max-age={CACHE_TIMEOUT}'
+    return make_cached_response(get_cached_body('recent_graphs', build_data))
+
+def detect_new_blocks():
+    """List graph images newer than the latest announced block.
+
+    Only objects after the last known block are listed, so each check is a
+    small incremental listing instead of a full scan of the images folder.
+    Names are not zero-padded, so that listing only sees blocks with as many
+    digits as the latest one (``images/10000000.png`` sorts before
+    ``images/9999999.png``). Once the next power of ten is within
+    STREAM_ROLLOVER_WINDOW blocks, the first blocks with one digit more are
+    listed by their common prefix as well.
+    """
+    bucket = get_storage_client().bucket(BUCKET_NAME)
+    listings = [{'prefix': f"{IMAGES_FOLDER}/"}]
+    if latest_streamed_block:
+        latest = int(latest_streamed_block)
+        listings = [{'prefix': f"{IMAGES_FOLDER}/", 'start_offset': f"{IMAGES_FOLDER}/{latest + 1}"}]
+        next_power = 10 ** len(str(latest))
+        if latest + STREAM_ROLLOVER_WINDOW >= next_power:
+            # 10000000-10009999 share the prefix 1000, for a window of 10000
+            rollover_prefix = str(next_power)[:len(str(next_power)) - len(str(STREAM_ROLLOVER_WINDOW - 1))]
+            listings.append({'prefix': f"{IMAGES_FOLDER}/{rollover_prefix}"})
+
+    new_blocks = set()
+    for listing in listings:
+        for blob in storage_list(bucket, **listing):
+            filename = blob.name.split('/')[-1]
+            if not filename.endswith('.png'):
+                continue
+            block_number = filename.split('.')[0]
+            if block_number.isdigit() and (latest_streamed_block is None or int(block_number) > int(latest_streamed_block)):
+                new_blocks.add(block_number)
+
+    return sorted(new_blocks, key=int)
+
+def format_block_event(block_number):
+    """Format a new block as a server-sent event."""
+    data = json.dumps({"block_number": block_number}, separators=(',', ':'))
+    return f"id: {block_number}\nevent: block\ndata: {data}\n\n"
+
+def publish_block_event(block_number):
+    """Fan a new block out to every connected stream client."""
+    event = format_block_event(block_number)
+    with stream_lock:
+        for subscriber in list(stream_subscribers):
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Too slow to keep up: drop the client, it will reconnect
+                stream_subscribers.discard(subscriber)
+                try:
+                    while True:
+                        subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+                subscriber.put_nowait(None)
+
+def acquire_stream_leadership():
+    """Try to become the process that polls storage for new blocks.
+
+    The lock is held until the process exits, then another process takes over
+    on its next check.
+    """
+    global stream_leader_file
+    if stream_leader_file is not None or fcntl is None:
+        return True
+    lock_file = open(f"{STREAM_STATE_FILE}.lock", 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    stream_leader_file = lock_file
+    logger.info(f"Process {os.getpid()} now polls storage for new blocks")
+    return True
+
+def read_stream_state():
+    """Read the newest blocks found by the polling process, or None."""
+    try:
+        with open(STREAM_STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_stream_state(new_blocks):
+    """Share newly found blocks with the other processes."""
+    state = read_stream_state() or {'blocks': []}
+    blocks = (state['blocks'] + new_blocks)[-STREAM_CLIENT_QUEUE_SIZE:]
+    temp_path = f"{STREAM_STATE_FILE}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump({'latest': blocks[-1], 'blocks': blocks}, f)
+    os.replace(temp_path, STREAM_STATE_FILE)
+
+def announce_block(block_number):
+    """Record a new block in the caches and notify this process's stream clients."""
+    global latest_streamed_block
+    latest_streamed_block = block_number
+    # Keep the recent blocks list fresh without re-listing the bucket
+    if recent_blocks_cache['data'] is not None:
+        recent_blocks_cache['data'] = [block_number] + recent_blocks_cache['data'][:8]
+        recent_blocks_cache['timestamp'] = time.time()
+    if availability_cache['data'] is not None:
+        availability_cache['data'].add(block_number)
+    response_cache.pop('recent_graphs', None)
+    response_cache.pop('availability', None)
+    publish_block_event(block_number)
+
+def stream_detector():
+    """Loop that announces new blocks to the clients of this process.
+
+    One process lists storage for new blocks, the others pick them up from
+    STREAM_STATE_FILE, so storage sees one listing per interval however many
+    workers there are.
+    """
+    global latest_streamed_block
+    background_work.active = True
+    while True:
+        try:
+            if latest_streamed_block is None:
+                # Start from the newest block already announced, or that already exists
+                state = read_stream_state()
+                if state:
+                    latest_streamed_block = state['latest']
+                else:
+                    recent_blocks = get_recent_block_numbers()
+                    latest_streamed_block = recent_blocks[0] if recent_blocks else None
+            elif USE_MOCK_DATA:
+                pass
+            elif acquire_stream_leadership():
+                new_blocks = detect_new_blocks()
+                for block_number in new_blocks:
+                    announce_block(block_number)
+                if new_blocks:
+                    write_stream_state(new_blocks)
+            else:
+                state = read_stream_state()
+                if state and int(state['latest']) > int(latest_streamed_block):
+                    for block_number in state['blocks']:
+                        if int(block_number) > int(latest_streamed_block):
+                            announce_block(block_number)
+        except StorageOverloaded:
+            logger.info("Storage is busy, skipping this check for new blocks")
+        except Exception as e:
+            logger.error(f"Error checking for new blocks: {e}")
+        time.sleep(STREAM_POLL_INTERVAL)
+
+def ensure_stream_detector():
+    """Start the shared new block detector on first use (and again after a fork)."""
+    global stream_detector_thread
+    with stream_lock:
+        if stream_detector_thread is None or not stream_detector_thread.is_alive():
+            stream_detector_thread = threading.Thread(target=stream_detector, name='block-stream', daemon=True)
+            stream_detector_thread.start()
+
+@app.route('/api/stream/blocks', methods=['GET'])
+def stream_blocks():
+    """Push an event to the client whenever a new block becomes available.
+
+    Uses server-sent events. Reconnecting clients send Last-Event-ID and are
+    sent the recent blocks they missed.
+    """
+    ensure_stream_detector()
+    last_event_id = request.headers.get('Last-Event-ID', '')
+
+    # Every open stream holds a thread, so leave the rest to API requests
+    subscriber = queue.Queue(maxsize=STREAM_CLIENT_QUEUE_SIZE)
+    with stream_lock:
+        accepted = len(stream_subscribers) < STREAM_MAX_CLIENTS
+        if accepted:
+            stream_subscribers.add(subscriber)
+    if not accepted:
+        logger.warning(f"503 Too many open streams: {request.path}")
+        response = jsonify({"error": "Too many open streams, please retry later"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(STREAM_RETRY_AFTER)
+        return response
+
+    def unsubscribe():
+        with stream_lock:
+            stream_subscribers.discard(subscriber)
+
+    def generate():
+        try:
+            yield f"retry: {int(STREAM_POLL_INTERVAL * 1000)}\n\n"
+
+            # Catch up reconnecting clients on the blocks they missed
+            if last_event_id.isdigit() and recent_blocks_cache['data']:
+                for block_number in sorted(recent_blocks_cache['data'], key=int):
+                    if int(block_number) > int(last_event_id):
+                        yield format_block_event(block_number)
+
+            while True:
+                try:
+                    event = subscriber.get(timeout=STREAM_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield event
+        finally:
+            unsubscribe()
+
+    response = Response(generate(), mimetype='text/event-stream')
+    # Frees the slot also when the client goes away before the stream started
+    response.call_on_close(unsubscribe)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering
     return response
 
 @app.route('/api/status', methods=['GET'])
@@ -563,8 +1599,16 @@ def get_status():
     return jsonify({
         "status": "ok",
         "demo_mode": DEMO_MODE,
-        "message": "Demo mode active with mock data" if DEMO_MODE else "Connected to Backend",
-        "min_block_number": min_block
+        "message": ("Demo mode active with mock data" if USE_MOCK_DATA
+                    else "Demo mode serving a synthetic corpus" if DEMO_MODE else "Connected to Backend"),
+        "min_block_number": min_block,
+        "prefetch": get_prefetch_stats(),
+        "stream_clients": len(stream_subscribers),
+        "storage": {
+            **storage_gate.stats(),
+            "circuit": storage_breaker.stats(),
+            "hedging": hedged_reader.stats() if hedged_reader is not None else None
+        }
     })
 
 @app.errorhandler(404)
@@ -572,6 +1616,14 @@ def not_found(e):
     logger.warning(f"404 Not Found: {request.path}")
     return jsonify({"error": "Resource not found"}), 404
 
+@app.errorhandler(StorageOverloaded)
+def storage_overloaded(e):
+    logger.warning(f"503 Storage overloaded: {request.path} ({e})")
+    response = jsonify({"error": "Storage is busy, please retry shortly"})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
 @app.errorhandler(500)
 def server_error(e):
     logger.error(f"500 Internal Server Error: {str(e)}")
@@ -635,6 +1687,44 @@ if os.environ.get('PRODUCTION', '').lower() != 'true':
                     <p>Returns a specific transaction dependency graph for the given block number.</p>
                 </div>
                 
+                <div class="endpoint">
+                    <h3>Gantt Schedule</h3>
+                    <code>GET /api/gantt/{block_number}/schedule</code>
+                    <p>Returns the start and end execution slot of every transaction, computed from the dependency graph.</p>
+                </div>
+                
+                <div class="endpoint">
+                    <h3>Graph and Gantt Images</h3>
+                    <code>GET /api/graph/{block_number}/image.png</code><br>
+                    <code>GET /api/gantt/{block_number}/image.png</code>
+                    <p>Return the pre-rendered images as plain PNGs, without base64 encoding.</p>
+                </div>
+                
+                <div class="endpoint">
+                    <h3>Graph Edge List</h3>
+                    <code>GET /api/graph/{block_number}/edges</code>
+                    <p>Returns the dependency graph as a compact binary edge list for client-side rendering.</p>
+                </div>
+                
+                <div class="endpoint">
+                    <h3>Batch Graphs</h3>
+                    <code>GET /api/graphs?blocks={a},{b},{c}</code>
+                    <p>Returns metadata and image references for up to 50 blocks in one response, with a status per block.</p>
+                </div>
+                
+                <div class="endpoint">
+                    <h3>Block Availability</h3>
+                    <code>GET /api/availability</code><br>
+                    <code>GET /api/blocks/{block_number}/nearest</code>
+                    <p>Return the run-length encoded set of blocks with a graph, and the available block closest to a block number.</p>
+                </div>
+                
+                <div class="endpoint">
+                    <h3>New Block Stream</h3>
+                    <code>GET /api/stream/blocks</code>
+                    <p>Server-sent events stream that announces every new block as soon as its graph is available.</p>
+                </div>
+                
                 <div class="endpoint">
                     <h3>Gantt Chart</h3>
                     <code>GET /api/gantt/{block_number}</code>
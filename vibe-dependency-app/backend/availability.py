@@ -0,0 +1,137 @@
+import bisect
+import threading
+
+# Run-length encoded set of available block numbers
+#
+# Blocks are produced in long consecutive ranges, so the set is kept as sorted
+# runs of consecutive numbers. Membership and nearest-block lookups are a
+# binary search over the runs, and the whole history fits in a few bytes per
+# gap. JSON form (version 1):
+#   {"version": 1, "count": <blocks>, "runs": [gap, length, gap, length, ...]}
+# where each gap is the distance from the end of the previous run (or from 0
+# for the first run) to the start of the next one.
+
+class BlockAvailability:
+    """Thread-safe set of block numbers stored as runs of consecutive blocks."""
+
+    def __init__(self, runs=()):
+        self._starts = []
+        self._ends = []  # Inclusive
+        self._count = 0
+        self._lock = threading.Lock()
+        for start, end in runs:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._count += end - start + 1
+
+    @classmethod
+    def from_blocks(cls, blocks):
+        runs = []
+        for block in sorted({int(block) for block in blocks}):
+            if runs and block == runs[-1][1] + 1:
+                runs[-1][1] = block
+            else:
+                runs.append([block, block])
+        return cls(runs)
+
+    @classmethod
+    def from_json(cls, data):
+        if data.get('version') != 1:
+            raise ValueError("Unsupported availability format")
+        runs, position = [], 0
+        values = data['runs']
+        for gap, length in zip(values[0::2], values[1::2]):
+            start = position + gap
+            runs.append((start, start + length - 1))
+            position = start + length - 1
+        return cls(runs)
+
+    def to_json(self):
+        with self._lock:
+            values, position = [], 0
+            for start, end in zip(self._starts, self._ends):
+                values.extend((start - position, end - start + 1))
+                position = end
+            return {'version': 1, 'count': self._count, 'runs': values}
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, block):
+        block = int(block)
+        with self._lock:
+            i = bisect.bisect_right(self._starts, block) - 1
+            return i >= 0 and block <= self._ends[i]
+
+    def add(self, block):
+        """Add a block, merging it into the neighbouring runs. Returns False if it was present."""
+        block = int(block)
+        with self._lock:
+            i = bisect.bisect_right(self._starts, block) - 1
+            if i >= 0 and block <= self._ends[i]:
+                return False
+
+            joins_left = i >= 0 and self._ends[i] == block - 1
+            joins_right = i + 1 < len(self._starts) and self._starts[i + 1] == block + 1
+            if joins_left and joins_right:
+                self._ends[i] = self._ends[i + 1]
+                del self._starts[i + 1]
+                del self._ends[i + 1]
+            elif joins_left:
+                self._ends[i] = block
+            elif joins_right:
+                self._starts[i + 1] = block
+            else:
+                self._starts.insert(i + 1, block)
+                self._ends.insert(i + 1, block)
+            self._count += 1
+            return True
+
+    def discard_below(self, block):
+        """Remove every block lower than ``block``. Returns the number of blocks removed."""
+        block = int(block)
+        with self._lock:
+            i = bisect.bisect_left(self._ends, block)
+            removed = sum(end - start + 1 for start, end in zip(self._starts[:i], self._ends[:i]))
+            del self._starts[:i]
+            del self._ends[:i]
+            if self._starts and self._starts[0] < block:
+                removed += block - self._starts[0]
+                self._starts[0] = block
+            self._count -= removed
+            return removed
+
+    def nearest(self, block):
+        """Return the available block closest to ``block`` (the lower one on ties), or None."""
+        block = int(block)
+        with self._lock:
+            if not self._starts:
+                return None
+            i = bisect.bisect_right(self._starts, block) - 1
+            if i >= 0 and block <= self._ends[i]:
+                return block
+            below = self._ends[i] if i >= 0 else None
+            above = self._starts[i + 1] if i + 1 < len(self._starts) else None
+        if below is None:
+            return above
+        if above is None or block - below <= above - block:
+            return below
+        return above
+
+    def min(self):
+        with self._lock:
+            return self._starts[0] if self._starts else None
+
+    def max(self):
+        with self._lock:
+            return self._ends[-1] if self._ends else None
+
+    def newest(self, limit):
+        """Return up to ``limit`` of the highest block numbers, newest first."""
+        blocks = []
+        with self._lock:
+            for start, end in zip(reversed(self._starts), reversed(self._ends)):
+                blocks.extend(range(end, max(start, end - (limit - len(blocks)) + 1) - 1, -1))
+                if len(blocks) >= limit:
+                    break
+        return blocks
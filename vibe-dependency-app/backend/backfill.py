@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import storage_access
+from graph_builder import build_graph_from_file
+from graph_arrays import graph_to_arrays, compute_schedule, schedule_to_json
+from analytics import block_analytics
+from resilience import CircuitOpen
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger('dependency-backfill')
+
+# Storage layout, must match what app.py reads
+BUCKET_NAME = "ethereum-graphs"
+GRAPHS_FOLDER = "graphs"
+STATS_FOLDER = "stats"
+CHARTS_FOLDER = "chart_data"
+
+def open_bucket(output, bucket_name, pool_size=1):
+    """Open the destination bucket: ``gs://<bucket>`` or a local directory tree.
+
+    Buckets in Cloud Storage use the pooled client of this process (see
+    storage_access.py), sized for ``pool_size`` concurrent calls.
+    """
+    if output.startswith('gs://'):
+        storage_access.configure(pool_size)
+        return storage_access.get_client().bucket(output[len('gs://'):].strip('/') or bucket_name)
+
+    from local_storage import LocalClient
+    return LocalClient(output).bucket(bucket_name)
+
+def find_fixture(input_dir, block_number):
+    """Return the access list fixture for a block, preferring Parquet over JSON."""
+    for extension in ('.parquet', '.json'):
+        path = os.path.join(input_dir, f"{block_number}{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+def build_block(bucket, input_dir, block_number):
+    """Build and upload the graph, stats record and gantt schedule for one block.
+
+    Returns the graph, or None if there is no fixture for the block.
+    """
+    fixture = find_fixture(input_dir, block_number)
+    if fixture is None:
+        return None
+
+    graph = build_graph_from_file(fixture)
+    labels, sources, targets = graph_to_arrays(graph)
+    stats = {
+        'block_number': str(block_number),
+        'node_count': graph.number_of_nodes(),
+        'edge_count': graph.number_of_edges(),
+        **block_analytics(len(labels), sources, targets)
+    }
+
+    storage_access.upload(bucket, f"{GRAPHS_FOLDER}/{block_number}.pkl",
+                          pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL), 'application/octet-stream')
+    storage_access.upload(bucket, f"{STATS_FOLDER}/{block_number}.json", json.dumps(stats), 'application/json')
+
+    start, end = compute_schedule(len(labels), sources, targets)
+    storage_access.upload(bucket, f"{CHARTS_FOLDER}/{block_number}.json",
+                          schedule_to_json(block_number, labels, start, end), 'application/json')
+    return graph
+
+def process_chunk(chunk_start, chunk_end, input_dir, output, bucket_name, render=False):
+    """Build every block in ``[chunk_start, chunk_end)``; runs inside a worker process."""
+    bucket = open_bucket(output, bucket_name)
+    if render:
+        # Imported here so plain graph backfills do not need matplotlib
+        from renderer import render_graph
+
+    start_time = time.time()
+    built, missing, failed = 0, 0, []
+
+    for block_number in range(chunk_start, chunk_end):
+        try:
+            graph = build_block(bucket, input_dir, block_number)
+            if graph is None:
+                missing += 1
+            else:
+                if render:
+                    # Rendered from the graph just built, not downloaded back from storage
+                    render_graph(bucket, block_number, graph)
+                built += 1
+        except CircuitOpen as e:
+            # The rest of the chunk would fail the same way; it is retried on the next run
+            logger.error(f"Stopping chunk {chunk_start}-{chunk_end - 1} at block {block_number}: {e}")
+            failed.extend(range(block_number, chunk_end))
+            break
+        except Exception as e:
+            logger.error(f"Error building block {block_number}: {e}")
+            failed.append(block_number)
+
+    return {
+        'chunk': [chunk_start, chunk_end],
+        'built': built,
+        'missing': missing,
+        'failed': failed,
+        'elapsed': time.time() - start_time
+    }
+
+def split_range(start, end, chunk_size):
+    """Split the block range ``[start, end)`` into contiguous chunks."""
+    return [(chunk_start, min(chunk_start + chunk_size, end)) for chunk_start in range(start, end, chunk_size)]
+
+def load_checkpoint(path, start, end, chunk_size):
+    """Load the completed chunks of a previous run over the same range."""
+    if not path or not os.path.exists(path):
+        return set()
+
+    with open(path, 'r') as f:
+        checkpoint = json.load(f)
+
+    if (checkpoint.get('start'), checkpoint.get('end'), checkpoint.get('chunk_size')) != (start, end, chunk_size):
+        logger.warning(f"Checkpoint {path} is for a different range or chunk size, ignoring it")
+        return set()
+
+    return {tuple(chunk) for chunk in checkpoint.get('completed', [])}
+
+def save_checkpoint(path, start, end, chunk_size, completed):
+    """Atomically write the set of completed chunks."""
+    if not path:
+        return
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump({
+            'start': start,
+            'end': end,
+            'chunk_size': chunk_size,
+            'completed': sorted(list(chunk) for chunk in completed)
+        }, f)
+    os.replace(temp_path, path)
+
+def run_backfill(start, end, input_dir, output, bucket_name=BUCKET_NAME, chunk_size=1000,
+                 workers=None, checkpoint_path=None, render=False):
+    """Build graphs for ``[start, end)`` across a process pool, resuming from a checkpoint."""
+    workers = workers or os.cpu_count() or 1
+    chunks = split_range(start, end, chunk_size)
+    completed = load_checkpoint(checkpoint_path, start, end, chunk_size)
+    pending = [chunk for chunk in chunks if chunk not in completed]
+
+    total_blocks = sum(chunk_end - chunk_start for chunk_start, chunk_end in pending)
+    logger.info(f"Backfilling blocks {start}-{end - 1}: {len(pending)} of {len(chunks)} chunks pending "
+                f"({total_blocks} blocks) on {workers} workers")
+
+    start_time = time.time()
+    done_blocks, built, missing, failed = 0, 0, 0, []
+
+    # Chunks are independent, so throughput scales with the number of workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(process_chunk, chunk_start, chunk_end, input_dir, output, bucket_name, render)
+            for chunk_start, chunk_end in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            chunk_start, chunk_end = result['chunk']
+            done_blocks += chunk_end - chunk_start
+            built += result['built']
+            missing += result['missing']
+            failed.extend(result['failed'])
+
+            # Chunks with failures are retried on the next run
+            if not result['failed']:
+                completed.add((chunk_start, chunk_end))
+                save_checkpoint(checkpoint_path, start, end, chunk_size, completed)
+
+            elapsed = time.time() - start_time
+            rate = done_blocks / elapsed if elapsed > 0 else 0.0
+            eta = (total_blocks - done_blocks) / rate if rate > 0 else 0.0
+            logger.info(f"Progress: {done_blocks}/{total_blocks} blocks ({rate:.1f} blocks/s, ETA {eta:.0f}s), "
+                        f"chunk {chunk_start}-{chunk_end - 1} built {result['built']} in {result['elapsed']:.1f}s")
+
+    logger.info(f"Backfill complete: {built} built, {missing} without fixture, {len(failed)} failed "
+                f"in {time.time() - start_time:.1f}s")
+    return {'built': built, 'missing': missing, 'failed': failed}
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill dependency graphs for a historical block range.')
+    parser.add_argument('--start', type=int, required=True, help='First block number (inclusive)')
+    parser.add_argument('--end', type=int, required=True, help='Last block number (exclusive)')
+    parser.add_argument('--input-dir', required=True, help='Directory with <block>.json / <block>.parquet access list fixtures')
+    parser.add_argument('--output', required=True, help='gs://<bucket> or a local directory holding the bucket tree')
+    parser.add_argument('--bucket', default=BUCKET_NAME, help=f'Bucket name for local output (default: {BUCKET_NAME})')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Blocks per work unit (default: 1000)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--checkpoint', default='backfill_checkpoint.json', help='Checkpoint file used to resume')
+    parser.add_argument('--render', action='store_true', help='Also render the graph and gantt PNGs')
+    args = parser.parse_args()
+
+    result = run_backfill(args.start, args.end, args.input_dir, args.output, args.bucket,
+                          args.chunk_size, args.workers, args.checkpoint, args.render)
+    return 1 if result['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+import json
+import struct
+
+import numpy as np
+
+# Array form of dependency graphs
+#
+# Nodes are renumbered to dense ids 0..n-1 in label order and edges become two
+# parallel arrays of ids sorted by (source, target). This is the form the
+# binary edge list endpoint serves and the form vectorized analytics work on.
+
+# Binary edge list format (little endian):
+#   header:  magic 'DEPG' | version u8 | flags u8 | value width u16 (2 or 4) | node count u32 | edge count u32
+#   labels:  node count values, delta encoded  (only if FLAG_INT_LABELS is set)
+#   sources: edge count values, delta encoded  (sources are sorted, deltas are >= 0)
+#   targets: edge count values, plain dense ids
+EDGE_LIST_MAGIC = b'DEPG'
+EDGE_LIST_VERSION = 1
+EDGE_LIST_HEADER = struct.Struct('<4sBBHII')
+FLAG_INT_LABELS = 0x01
+
+def _has_int_labels(nodes):
+    return all(isinstance(node, (int, np.integer)) for node in nodes)
+
+def _sort_labels(nodes):
+    """Sort node labels numerically when they are all integers, else by string."""
+    if _has_int_labels(nodes):
+        return sorted(nodes)
+    return sorted(nodes, key=str)
+
+def graph_to_arrays(graph):
+    """Convert a graph to ``(labels, sources, targets)``.
+
+    ``labels`` lists the original node labels in dense id order, ``sources``
+    and ``targets`` are int64 arrays of dense ids sorted by (source, target).
+    """
+    labels = _sort_labels(list(graph.nodes))
+    index = {node: i for i, node in enumerate(labels)}
+
+    edge_count = graph.number_of_edges()
+    sources = np.fromiter((index[u] for u, _ in graph.edges), dtype=np.int64, count=edge_count)
+    targets = np.fromiter((index[v] for _, v in graph.edges), dtype=np.int64, count=edge_count)
+
+    order = np.lexsort((targets, sources))
+    return labels, sources[order], targets[order]
+
+def _delta_encode(values):
+    if len(values) == 0:
+        return values
+    return np.diff(values, prepend=0)
+
+def encode_edge_list(labels, sources, targets):
+    """Serialize a graph in array form to the compact binary edge list format."""
+    int_labels = _has_int_labels(labels)
+    flags = FLAG_INT_LABELS if int_labels else 0
+
+    parts = []
+    if int_labels:
+        parts.append(_delta_encode(np.asarray(labels, dtype=np.int64)))
+    parts.append(_delta_encode(np.asarray(sources, dtype=np.int64)))
+    parts.append(np.asarray(targets, dtype=np.int64))
+
+    # Use 16 bit values whenever everything fits
+    max_value = max((int(part.max()) for part in parts if len(part)), default=0)
+    min_value = min((int(part.min()) for part in parts if len(part)), default=0)
+    if min_value < 0 or max_value >= 2 ** 32:
+        raise ValueError("Node labels must be sorted non-negative integers below 2**32")
+    width = 2 if max_value < 2 ** 16 else 4
+    dtype = '<u2' if width == 2 else '<u4'
+
+    header = EDGE_LIST_HEADER.pack(EDGE_LIST_MAGIC, EDGE_LIST_VERSION, flags, width, len(labels), len(sources))
+    return header + b''.join(part.astype(dtype).tobytes() for part in parts)
+
+def decode_edge_list(payload):
+    """Parse a binary edge list back into ``(labels, sources, targets)`` arrays.
+
+    Without integer labels, ``labels`` is simply the range of dense ids.
+    """
+    magic, version, flags, width, node_count, edge_count = EDGE_LIST_HEADER.unpack_from(payload)
+    if magic != EDGE_LIST_MAGIC or version != EDGE_LIST_VERSION:
+        raise ValueError("Not a version 1 dependency edge list")
+
+    dtype = '<u2' if width == 2 else '<u4'
+    offset = EDGE_LIST_HEADER.size
+
+    def read(count):
+        nonlocal offset
+        values = np.frombuffer(payload, dtype=dtype, count=count, offset=offset).astype(np.int64)
+        offset += count * width
+        return values
+
+    labels = np.cumsum(read(node_count)) if flags & FLAG_INT_LABELS else np.arange(node_count, dtype=np.int64)
+    sources = np.cumsum(read(edge_count))
+    targets = read(edge_count)
+    return labels, sources, targets
+
+def to_csr(node_count, sources, targets):
+    """Build CSR adjacency ``(indptr, indices)`` from edges sorted by source."""
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+    return indptr, np.asarray(targets, dtype=np.int64)
+
+def compute_schedule(node_count, sources, targets, durations=None):
+    """Earliest start/end slot of every transaction by topological longest path.
+
+    Works frontier by frontier over the CSR arrays: all transactions whose
+    dependencies are finished are handled in one vectorized step, so the
+    number of Python-level iterations equals the critical path length, not the
+    number of transactions. Durations default to one slot per transaction.
+
+    Returns ``(start, end)`` int64 arrays indexed by dense node id.
+    """
+    if durations is None:
+        durations = np.ones(node_count, dtype=np.int64)
+    indptr, indices = to_csr(node_count, sources, targets)
+    indegree = np.bincount(indices, minlength=node_count)
+    start = np.zeros(node_count, dtype=np.int64)
+
+    frontier = np.flatnonzero(indegree == 0)
+    scheduled = 0
+    while frontier.size:
+        scheduled += frontier.size
+        finish = start[frontier] + durations[frontier]
+
+        # Gather all out-edges of the frontier from the CSR arrays
+        first_edge = indptr[frontier]
+        out_degree = indptr[frontier + 1] - first_edge
+        edge_total = int(out_degree.sum())
+        if edge_total == 0:
+            break
+        edge_offsets = np.repeat(first_edge - (np.cumsum(out_degree) - out_degree), out_degree) + np.arange(edge_total)
+        children = indices[edge_offsets]
+
+        # A child starts once its latest dependency has finished
+        np.maximum.at(start, children, np.repeat(finish, out_degree))
+        indegree -= np.bincount(children, minlength=node_count)
+        frontier = np.unique(children[indegree[children] == 0])
+
+    if scheduled < node_count:
+        raise ValueError("Dependency graph contains a cycle")
+
+    return start, start + durations
+
+def schedule_to_json(block_number, labels, start, end):
+    """Serialize a schedule as compact columnar JSON bytes."""
+    return json.dumps({
+        'block_number': str(block_number),
+        'tx': [label.item() if isinstance(label, np.generic) else label for label in labels],
+        'start': start.tolist(),
+        'end': end.tolist(),
+        'slots': int(end.max()) if len(end) else 0
+    }, separators=(',', ':')).encode('utf-8')
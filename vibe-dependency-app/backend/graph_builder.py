@@ -0,0 +1,168 @@
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import argparse
+
+import networkx as nx
+
+logger = logging.getLogger('dependency-graph-builder')
+
+# Access list fixture format
+#
+# JSON (one file per block):
+#   {
+#     "block_number": 22216953,
+#     "transactions": [
+#       {"index": 0, "hash": "0x...", "reads": ["0xabc:0x01", ...], "writes": ["0xabc:0x02", ...]},
+#       ...
+#     ]
+#   }
+#
+# Parquet (one file per block, one row per access):
+#   block_number | tx_index | tx_hash | key | access ('read' or 'write')
+#
+# Keys are opaque: any string (e.g. "address:slot") or a list such as
+# [address, slot] identifies one piece of state.
+
+def _normalize_key(key):
+    """Make an accessed key hashable (JSON lists become tuples)."""
+    if isinstance(key, list):
+        return tuple(key)
+    return key
+
+def load_access_lists(path):
+    """Load per-transaction read/write sets for a block from a JSON or Parquet fixture.
+
+    Returns a tuple ``(block_number, transactions)`` where every transaction is a
+    dict with ``index``, ``hash``, ``reads`` and ``writes``, ordered by index.
+    """
+    if path.endswith('.parquet'):
+        import pandas as pd
+        # pandas reads Parquet through pyarrow, which the JSON path does not need
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError(f"Reading Parquet fixtures needs pyarrow, install it with "
+                              f"'pip install -r requirements.txt' ({e})") from e
+
+        frame = pd.read_parquet(path)
+        block_number = int(frame['block_number'].iloc[0]) if 'block_number' in frame and len(frame) else None
+        transactions = []
+        for tx_index, rows in frame.groupby('tx_index', sort=True):
+            is_write = rows['access'] == 'write'
+            transactions.append({
+                'index': int(tx_index),
+                'hash': rows['tx_hash'].iloc[0] if 'tx_hash' in rows else None,
+                'reads': rows.loc[~is_write, 'key'].tolist(),
+                'writes': rows.loc[is_write, 'key'].tolist()
+            })
+        return block_number, transactions
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+
+    transactions = []
+    for position, tx in enumerate(data.get('transactions', [])):
+        transactions.append({
+            'index': int(tx.get('index', position)),
+            'hash': tx.get('hash'),
+            'reads': tx.get('reads', []),
+            'writes': tx.get('writes', [])
+        })
+    transactions.sort(key=lambda tx: tx['index'])
+    return data.get('block_number'), transactions
+
+def find_dependencies(transactions):
+    """Detect conflicting transaction pairs with a hash join over accessed keys.
+
+    Instead of comparing every pair of transactions, all accesses are grouped by
+    key in one pass and each key's accesses are swept in transaction order. A
+    transaction depends on the last earlier writer of every key it reads or
+    writes (read-after-write, write-after-write), and a write also depends on
+    the readers since that last write (write-after-read). This keeps the work
+    linear in the number of accesses.
+
+    Returns a dict mapping ``(earlier_index, later_index)`` to the number of
+    keys the two transactions conflict on.
+    """
+    # Build side of the join: key -> [(tx_index, is_write), ...] in tx order
+    accesses_by_key = {}
+    for tx in transactions:
+        writes = {_normalize_key(key) for key in tx['writes']}
+        for key in writes:
+            accesses_by_key.setdefault(key, []).append((tx['index'], True))
+        for key in {_normalize_key(key) for key in tx['reads']} - writes:
+            accesses_by_key.setdefault(key, []).append((tx['index'], False))
+
+    dependencies = {}
+    for accesses in accesses_by_key.values():
+        if len(accesses) < 2:
+            continue
+        accesses.sort()
+
+        last_writer = None
+        readers_since_write = []
+        for tx_index, is_write in accesses:
+            if last_writer is not None:
+                edge = (last_writer, tx_index)
+                dependencies[edge] = dependencies.get(edge, 0) + 1
+            if is_write:
+                for reader in readers_since_write:
+                    edge = (reader, tx_index)
+                    dependencies[edge] = dependencies.get(edge, 0) + 1
+                last_writer = tx_index
+                readers_since_write = []
+            else:
+                readers_since_write.append(tx_index)
+
+    return dependencies
+
+def build_dependency_graph(transactions, block_number=None):
+    """Build the transaction dependency graph of a block.
+
+    Nodes are transaction indices (with the transaction hash as attribute),
+    edges point from the earlier to the later of two conflicting transactions.
+    Transactions without conflicts are kept as isolated nodes so node counts
+    match the number of transactions in the block.
+    """
+    graph = nx.DiGraph(block_number=block_number)
+    for tx in transactions:
+        graph.add_node(tx['index'], hash=tx['hash'])
+
+    for (source, target), weight in find_dependencies(transactions).items():
+        graph.add_edge(source, target, weight=weight)
+
+    return graph
+
+def build_graph_from_file(path):
+    """Load an access list fixture and build its dependency graph."""
+    block_number, transactions = load_access_lists(path)
+    return build_dependency_graph(transactions, block_number)
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Build a transaction dependency graph from an access list fixture.')
+    parser.add_argument('fixture', help='Path to a JSON or Parquet access list fixture')
+    parser.add_argument('-o', '--output', help='Write the pickled graph to this path (default: graphs/<block>.pkl)')
+    args = parser.parse_args()
+
+    start_time = time.time()
+    graph = build_graph_from_file(args.fixture)
+    build_time = time.time() - start_time
+
+    block_number = graph.graph.get('block_number')
+    logger.info(f"Built graph for block {block_number}: {graph.number_of_nodes()} nodes, "
+                f"{graph.number_of_edges()} edges in {build_time * 1000:.1f}ms")
+
+    output = args.output or os.path.join('graphs', f"{block_number}.pkl")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'wb') as f:
+        pickle.dump(graph, f)
+    logger.info(f"Saved graph to {output}")
+
+if __name__ == '__main__':
+    sys.exit(main())
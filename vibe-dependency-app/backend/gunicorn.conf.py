@@ -0,0 +1,56 @@
+import gc
+import math
+import os
+
+# Production server configuration, used with: gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master (credential setup, storage client,
+# module state) and the caches are warmed there before the workers are forked,
+# so workers start warm and share that memory copy-on-write.
+#
+# Sizing: one worker process per CPU for the CPU-bound parts of a request
+# (unpickling, JSON, gzip), and enough threads per worker to keep that CPU
+# busy while other requests wait on storage. With a fraction w of request time
+# spent waiting on I/O, a core is saturated at 1 / (1 - w) threads.
+#
+# IO_WAIT_RATIO is that w. The default of 0.75 is an assumption (uncached
+# requests are dominated by storage round trips), not a measurement: tune it
+# from the Server-Timing headers of production traffic, as the share of
+# "total" spent in the exists, download and list phases.
+
+# gunicorn reads this file before it loads the app (with preload_app, in
+# Arbiter.setup), so the collector is off while the app is imported and the
+# caches are warmed; when_ready turns it back on and freezes what was loaded
+gc.disable()
+
+IO_WAIT_RATIO = min(0.95, max(0.0, float(os.environ.get('IO_WAIT_RATIO', 0.75))))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+# Event streams hold a thread each for as long as they are open, so up to
+# STREAM_MAX_CLIENTS threads come on top of the ones serving API requests
+STREAM_MAX_CLIENTS = int(os.environ.get('STREAM_MAX_CLIENTS', 8))
+threads = int(os.environ.get('GUNICORN_THREADS', min(32, math.ceil(1 / (1 - IO_WAIT_RATIO))) + STREAM_MAX_CLIENTS))
+preload_app = True
+
+# Long enough for a cold batch request; event streams send keep-alives well within it
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = 5
+accesslog = '-'
+
+def when_ready(server):
+    import app
+
+    try:
+        app.warm_caches()
+    except Exception as e:
+        server.log.warning(f"Cache warm-up failed, workers will start cold: {e}")
+
+    # Move everything loaded so far out of the collector's reach, so collections
+    # in the workers (which inherit the enabled collector) do not write to the
+    # pages they share with the master
+    gc.enable()
+    gc.freeze()
+    server.log.info(f"Starting {workers} workers with {threads} threads each, {STREAM_MAX_CLIENTS} of them for event streams "
+                    f"(I/O wait ratio {IO_WAIT_RATIO})")
@@ -0,0 +1,132 @@
+import os
+import time
+import random
+import tempfile
+
+# A minimal local stand-in for google.cloud.storage that keeps objects as files
+# under <root>/<bucket>/<object name>. It implements only the subset of the
+# client/bucket/blob API that the backend uses, so code written against GCS
+# can read and write a local tree unchanged.
+#
+# Reads can be made slow or flaky to exercise the hedging and circuit breaker
+# code paths without a real object store:
+#   LOCAL_STORAGE_LATENCY_MS    latency added to every read
+#   LOCAL_STORAGE_SLOW_MS       extra latency added to a fraction of reads
+#   LOCAL_STORAGE_SLOW_RATE     fraction of reads that get the extra latency
+#   LOCAL_STORAGE_FAILURE_RATE  fraction of reads that raise ConnectionError
+
+class LocalBlob:
+    """A single object stored as a file in a local bucket directory."""
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.metadata = None
+
+    @property
+    def path(self):
+        return os.path.join(self.bucket.path, *self.name.split('/'))
+
+    @property
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return None
+
+    @property
+    def etag(self):
+        """Changes whenever the file is rewritten, like a GCS etag."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def exists(self):
+        self.bucket.client.inject_faults()
+        return os.path.isfile(self.path)
+
+    def download_as_bytes(self):
+        self.bucket.client.inject_faults()
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def upload_from_string(self, data, content_type=None):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial objects
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def delete(self):
+        os.unlink(self.path)
+
+class LocalBucket:
+    """A directory that behaves like a GCS bucket."""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.path = os.path.join(client.root, name)
+
+    def blob(self, name):
+        return LocalBlob(self, name)
+
+    def list_blobs(self, prefix='', delimiter=None, start_offset=None, max_results=None):
+        """List objects in lexicographic name order, like GCS does."""
+        self.client.inject_faults()
+        names = []
+        # Only walk the directory the prefix points into, so listing one folder
+        # of a large tree does not touch the others
+        top = os.path.join(self.path, *prefix.split('/')[:-1])
+        for dirpath, dirnames, filenames in os.walk(top):
+            if delimiter == '/':
+                dirnames[:] = []
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.path).replace(os.sep, '/')
+                if not name.startswith(prefix):
+                    continue
+                if delimiter and delimiter in name[len(prefix):]:
+                    continue
+                if start_offset and name < start_offset:
+                    continue
+                names.append(name)
+
+        names.sort()
+        if max_results is not None:
+            names = names[:max_results]
+        return [LocalBlob(self, name) for name in names]
+
+class LocalClient:
+    """Drop-in replacement for ``storage.Client`` backed by a local directory."""
+
+    def __init__(self, root, latency_ms=None, slow_ms=None, slow_rate=None, failure_rate=None):
+        self.root = os.path.abspath(root)
+        self.latency_ms = float(os.environ.get('LOCAL_STORAGE_LATENCY_MS', 0)) if latency_ms is None else latency_ms
+        self.slow_ms = float(os.environ.get('LOCAL_STORAGE_SLOW_MS', 0)) if slow_ms is None else slow_ms
+        self.slow_rate = float(os.environ.get('LOCAL_STORAGE_SLOW_RATE', 0)) if slow_rate is None else slow_rate
+        self.failure_rate = float(os.environ.get('LOCAL_STORAGE_FAILURE_RATE', 0)) if failure_rate is None else failure_rate
+
+    def inject_faults(self):
+        """Apply the configured latency and failures to one read."""
+        delay = self.latency_ms
+        if self.slow_rate and random.random() < self.slow_rate:
+            delay += self.slow_ms
+        if delay:
+            time.sleep(delay / 1000.0)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise ConnectionError("Injected local storage failure")
+
+    def bucket(self, name):
+        return LocalBucket(self, name)
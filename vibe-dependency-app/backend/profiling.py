@@ -0,0 +1,117 @@
+import os
+import re
+import hmac
+import time
+import random
+import logging
+import threading
+
+# Opt-in cProfile capture of single API requests
+#
+# Nothing is registered unless PROFILE_REQUESTS=true, so a normal deployment
+# runs exactly the same code as without this module. When enabled, a request
+# is profiled if it carries an X-Profile-Token header matching PROFILE_TOKEN,
+# or if it is picked by PROFILE_SAMPLE_RATE. The profile is written to
+# PROFILE_DIR as a .prof file (pstats format), keeping the newest PROFILE_KEEP
+# files. Inspect one with:
+#   python -m pstats profiles/<file>.prof      (then: sort cumtime, stats 30)
+#
+# cProfile only sees the thread it was enabled on, and only one profiler can
+# be active per process on newer Pythons, so at most one request is profiled
+# at a time. Work a request hands to other threads (batch fetches, hedged
+# reads) shows up as time spent waiting for them.
+
+logger = logging.getLogger('dependency-app')
+
+PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', 'false').lower() == 'true'
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN', '')  # Requests with a matching X-Profile-Token header are profiled
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))  # Fraction of API requests profiled at random
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 200))  # Older profiles are deleted
+
+# Event streams never finish, so they are never profiled
+PROFILED_PREFIX = '/api/'
+SKIPPED_PREFIXES = ('/api/stream/',)
+
+_active = threading.Lock()
+_counter = 0
+
+def should_profile(request):
+    path = request.path
+    if not path.startswith(PROFILED_PREFIX) or path.startswith(SKIPPED_PREFIXES):
+        return False
+    token = request.headers.get('X-Profile-Token')
+    if token and PROFILE_TOKEN and hmac.compare_digest(token, PROFILE_TOKEN):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def profile_filename(request):
+    global _counter
+    _counter += 1
+    route = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_')[:80]
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_counter}-{request.method}-{route}.prof"
+
+def rotate(directory, keep):
+    """Delete all but the newest ``keep`` profiles."""
+    profiles = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.prof')]
+    if len(profiles) <= keep:
+        return
+    profiles.sort(key=os.path.getmtime)
+    for path in profiles[:len(profiles) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def install(app):
+    """Register the profiling hooks on the app if PROFILE_REQUESTS is enabled."""
+    if not PROFILE_REQUESTS:
+        return False
+    if not PROFILE_TOKEN and PROFILE_SAMPLE_RATE <= 0:
+        logger.warning("PROFILE_REQUESTS is set but neither PROFILE_TOKEN nor PROFILE_SAMPLE_RATE, nothing will be profiled")
+        return False
+
+    import cProfile
+    from flask import g, request
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    @app.before_request
+    def start_profile():
+        if not should_profile(request) or not _active.acquire(blocking=False):
+            return
+        g.profile_name = profile_filename(request)
+        g.profile_start = time.perf_counter()
+        g.profiler = cProfile.Profile()
+        try:
+            g.profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active in this process
+            g.profiler = None
+            _active.release()
+
+    @app.after_request
+    def add_profile_header(response):
+        if g.get('profiler') is not None:
+            response.headers['X-Profile-Id'] = g.profile_name
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            elapsed_ms = (time.perf_counter() - g.profile_start) * 1000
+            profiler.dump_stats(os.path.join(PROFILE_DIR, g.profile_name))
+            rotate(PROFILE_DIR, PROFILE_KEEP)
+            logger.info(f"Profiled {request.method} {request.path} ({elapsed_ms:.1f}ms) -> {g.profile_name}")
+        except Exception as e:
+            logger.error(f"Error writing request profile: {e}")
+        finally:
+            _active.release()
+
+    logger.info(f"Request profiling enabled (sample rate {PROFILE_SAMPLE_RATE}, "
+                f"token {'set' if PROFILE_TOKEN else 'not set'}), writing to {PROFILE_DIR}")
+    return True
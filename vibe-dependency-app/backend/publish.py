@@ -0,0 +1,284 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import subprocess
+
+from availability import BlockAvailability
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger('dependency-publish')
+
+# Differential publishing of the static site to its GitHub Pages repository
+#
+# The deploy repository is fetched shallow and without file contents (a
+# partial clone with only commits and trees), and the new tree is built in
+# the git index from the published tree plus the changeset written by
+# static_generator.py: added and changed files are hashed from static/,
+# deleted files are dropped. Nothing is checked out, and the push only sends
+# the changed files, so a deploy costs as much as the change, not the site.
+#
+# History is kept to STATIC_HISTORY_DEPTH commits: older commits are cut off
+# by re-rooting the kept ones, so the deploy repository does not grow with
+# every deploy (the branch is force-pushed).
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STATIC_DEPLOY_REMOTE = os.environ.get('STATIC_DEPLOY_REMOTE', 'git@github.com:nerolation/dependency.pics-static.git')
+STATIC_DEPLOY_BRANCH = os.environ.get('STATIC_DEPLOY_BRANCH', 'main')
+STATIC_DEPLOY_DIR = os.environ.get('STATIC_DEPLOY_DIR', os.path.join(REPO_DIR, '.static-deploy'))
+STATIC_HISTORY_DEPTH = int(os.environ.get('STATIC_HISTORY_DEPTH', 1))  # 1 publishes every deploy as a single commit
+
+# Block files come and go through the changeset; everything else (the frontend
+# build, .nojekyll) is small and compared on every publish
+BLOCK_FOLDERS = ('graphs', 'gantt', 'data', 'tiles')
+
+# What static_generator.py needs to continue incrementally from the published site
+GENERATOR_STATE = ['data/index', 'data/availability.json', 'data/recent_blocks.json', 'data/min_block.json']
+
+# Hash of the frontend sources the published build was made from, written by
+# the workflow, which only rebuilds the frontend when the hash changes
+FRONTEND_BUILD_MARKER = 'frontend-build.txt'
+
+# Deploy commits need an identity, CI runners have none configured
+GIT_IDENTITY = {
+    'GIT_AUTHOR_NAME': os.environ.get('GIT_AUTHOR_NAME', 'dependency.pics'),
+    'GIT_AUTHOR_EMAIL': os.environ.get('GIT_AUTHOR_EMAIL', 'static-site@dependency.pics'),
+    'GIT_COMMITTER_NAME': os.environ.get('GIT_COMMITTER_NAME', 'dependency.pics'),
+    'GIT_COMMITTER_EMAIL': os.environ.get('GIT_COMMITTER_EMAIL', 'static-site@dependency.pics')
+}
+
+def git(deploy_dir, *args, input=None, env=None):
+    """Run a git command in the deploy repository and return its output."""
+    result = subprocess.run(['git', '-C', deploy_dir, *args], input=input, capture_output=True, text=True,
+                            env={**os.environ, **GIT_IDENTITY, **(env or {})})
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+def open_deploy_repo(deploy_dir, remote, branch, depth):
+    """Fetch the last ``depth`` published commits without file contents.
+
+    Returns the published commit, or None if the branch does not exist yet.
+    """
+    if not os.path.isdir(os.path.join(deploy_dir, '.git')):
+        os.makedirs(deploy_dir, exist_ok=True)
+        git(deploy_dir, 'init', '-q')
+        git(deploy_dir, 'remote', 'add', 'origin', remote)
+        # Blobs are only fetched when something actually reads them (see restore_state)
+        git(deploy_dir, 'config', 'remote.origin.promisor', 'true')
+        git(deploy_dir, 'config', 'remote.origin.partialclonefilter', 'blob:none')
+    else:
+        git(deploy_dir, 'remote', 'set-url', 'origin', remote)
+
+    if not git(deploy_dir, 'ls-remote', '--heads', 'origin', branch):
+        return None
+    git(deploy_dir, 'fetch', '-q', '--depth', str(depth), 'origin',
+        f"+refs/heads/{branch}:refs/remotes/origin/{branch}")
+    return git(deploy_dir, 'rev-parse', f"refs/remotes/origin/{branch}")
+
+def load_changeset(changeset_path):
+    if not os.path.exists(changeset_path):
+        return {'added': [], 'changed': [], 'deleted': []}
+    with open(changeset_path, 'r') as f:
+        return json.load(f)
+
+def list_site_files(static_dir, skip_folders=()):
+    """List the files of the static directory relative to it, outside the skipped top-level folders."""
+    paths = []
+    for root, dirs, files in os.walk(static_dir):
+        relative_root = os.path.relpath(root, static_dir)
+        if relative_root == '.':
+            dirs[:] = [d for d in dirs if d != '.git' and d not in skip_folders]
+        for filename in files:
+            paths.append(os.path.normpath(os.path.join(relative_root, filename)).replace(os.sep, '/'))
+    return paths
+
+def list_published_site_files(deploy_dir, published):
+    """List the published files outside the block folders, without walking the block folders."""
+    top_level = [name for name in git(deploy_dir, 'ls-tree', '--name-only', published).split('\n')
+                 if name and name not in BLOCK_FOLDERS]
+    if not top_level:
+        return []
+    return git(deploy_dir, 'ls-tree', '-r', '--name-only', published, '--', *top_level).split('\n')
+
+def list_published_folder_files(deploy_dir, folders, exclude=()):
+    """List the files in the index (the published tree) inside any of the folders, given with a trailing slash."""
+    top_level = sorted({folder.split('/', 1)[0] for folder in folders})
+    paths = []
+    for path in git(deploy_dir, 'ls-files', '--', *top_level).split('\n'):
+        parts = path.split('/')
+        if path not in exclude and any('/'.join(parts[:i]) + '/' in folders for i in range(1, len(parts))):
+            paths.append(path)
+    return paths
+
+def changed_site_files(deploy_dir, static_dir, published, site_files):
+    """Keep the site files whose content differs from the published tree.
+
+    Only the hashes are compared, which needs the published trees but none of
+    their blobs, so unchanged files are never restaged.
+    """
+    if not site_files:
+        return []
+    hashes = git(deploy_dir, 'hash-object', '--stdin-paths',
+                 input='\n'.join(os.path.join(static_dir, path) for path in site_files) + '\n').split('\n')
+    top_level = sorted({path.split('/', 1)[0] for path in site_files})
+    published_hashes = {}
+    for line in git(deploy_dir, 'ls-tree', '-r', published, '--', *top_level).split('\n'):
+        if line:
+            info, path = line.split('\t', 1)
+            published_hashes[path] = info.split()[2]
+    return [path for path, sha in zip(site_files, hashes) if published_hashes.get(path) != sha]
+
+def stage_files(deploy_dir, static_dir, updated, deleted):
+    """Point the deploy index at the current content of ``updated`` and drop ``deleted``."""
+    lines = []
+    if updated:
+        hashes = git(deploy_dir, 'hash-object', '-w', '--stdin-paths',
+                     input='\n'.join(os.path.join(static_dir, path) for path in updated) + '\n').split('\n')
+        lines.extend(f"100644 {sha}\t{path}" for sha, path in zip(hashes, updated))
+    lines.extend(f"0 {'0' * 40}\t{path}" for path in deleted)
+    if lines:
+        git(deploy_dir, 'update-index', '--index-info', input='\n'.join(lines) + '\n')
+
+def make_commit(deploy_dir, tree, published, depth, message):
+    """Commit the tree on top of at most ``depth - 1`` of the published commits."""
+    parent = None
+    if published is not None and depth > 1:
+        kept = git(deploy_dir, 'rev-list', f"--max-count={depth - 1}", published).split('\n')
+        # Re-root the kept commits so the history never grows past the depth;
+        # their trees are unchanged, so this only writes small commit objects
+        for commit in reversed(kept):
+            commit_tree, author_date, committer_date, commit_message = git(
+                deploy_dir, 'log', '-1', '--format=%T%n%aI%n%cI%n%B', commit).split('\n', 3)
+            args = ['commit-tree', commit_tree, '-m', commit_message]
+            if parent:
+                args[2:2] = ['-p', parent]
+            parent = git(deploy_dir, *args, env={'GIT_AUTHOR_DATE': author_date, 'GIT_COMMITTER_DATE': committer_date})
+
+    args = ['commit-tree', tree, '-m', message]
+    if parent:
+        args[2:2] = ['-p', parent]
+    return git(deploy_dir, *args)
+
+def publish(static_dir, changeset_path, deploy_dir=STATIC_DEPLOY_DIR, remote=STATIC_DEPLOY_REMOTE,
+            branch=STATIC_DEPLOY_BRANCH, depth=STATIC_HISTORY_DEPTH, full=False):
+    """Push the changes recorded in the changeset to the deploy repository.
+
+    The changeset is removed once the push succeeded; if anything fails it is
+    kept, and the generator keeps adding to it until a publish goes through.
+    With ``full`` (or on the first deploy) the whole static directory is published.
+    """
+    start_time = time.time()
+    deploy_dir = os.path.abspath(deploy_dir)
+    static_dir = os.path.abspath(static_dir)
+    changeset = load_changeset(changeset_path)
+    published = open_deploy_repo(deploy_dir, remote, branch, depth)
+
+    if published is None or full:
+        git(deploy_dir, 'read-tree', '--empty')
+        updated, deleted = list_site_files(static_dir), []
+    else:
+        git(deploy_dir, 'read-tree', published)
+        changed = changeset['added'] + changeset['changed']
+        updated = [path for path in changed if os.path.exists(os.path.join(static_dir, path))]
+        # Files recorded as written but gone since then are removed as well
+        deleted = changeset['deleted'] + sorted(set(changed) - set(updated))
+        folders = {path for path in deleted if path.endswith('/')}
+        if folders:
+            deleted = [path for path in deleted if path not in folders] + \
+                list_published_folder_files(deploy_dir, folders, exclude=set(updated))
+        site_files = list_site_files(static_dir, skip_folders=BLOCK_FOLDERS)
+        updated += changed_site_files(deploy_dir, static_dir, published, site_files)
+        if 'index.html' in site_files:
+            # A frontend build replaces the previous one, including its hashed asset names
+            deleted += sorted(set(list_published_site_files(deploy_dir, published)) - set(site_files))
+    stage_files(deploy_dir, static_dir, updated, deleted)
+
+    # Without --missing-ok, write-tree checks every blob in the index and the
+    # partial clone would download the whole published site to do so
+    tree = git(deploy_dir, 'write-tree', '--missing-ok')
+    if published is not None and tree == git(deploy_dir, 'rev-parse', f"{published}^{{tree}}"):
+        logger.info("The published site is up to date")
+    else:
+        commit = make_commit(deploy_dir, tree, published, depth, f"Update static site: {time.ctime()}")
+        git(deploy_dir, 'push', '-q', '--force', 'origin', f"{commit}:refs/heads/{branch}")
+        git(deploy_dir, 'update-ref', f"refs/remotes/origin/{branch}", commit)
+        logger.info(f"Published {len(updated)} written and {len(deleted)} deleted files "
+                    f"in {time.time() - start_time:.1f}s")
+
+    if os.path.exists(changeset_path):
+        os.remove(changeset_path)
+    return True
+
+def restore_state(static_dir, deploy_dir=STATIC_DEPLOY_DIR, remote=STATIC_DEPLOY_REMOTE,
+                  branch=STATIC_DEPLOY_BRANCH, depth=STATIC_HISTORY_DEPTH):
+    """Copy the published index files and frontend build marker into the static directory.
+
+    On a fresh checkout (e.g. in CI) this lets the generator continue from
+    the published site and export only new blocks. Only the index files are
+    downloaded, not the images.
+    """
+    deploy_dir = os.path.abspath(deploy_dir)
+    published = open_deploy_repo(deploy_dir, remote, branch, depth)
+    if published is None:
+        logger.info("Nothing published yet, the generator will start from scratch")
+        return False
+
+    paths = git(deploy_dir, 'ls-tree', '-r', '--name-only', published, '--', *GENERATOR_STATE, FRONTEND_BUILD_MARKER).split('\n')
+    paths = [path for path in paths if path]
+    if paths:
+        # A fresh checkout has no static directory yet, and git needs the work tree to exist
+        os.makedirs(static_dir, exist_ok=True)
+        git(deploy_dir, f"--work-tree={os.path.abspath(static_dir)}", 'checkout', published, '--', *paths)
+    logger.info(f"Restored {len(paths)} state files from the published site")
+
+    if 'data/availability.json' not in paths:
+        # Sites published before the bitmap existed: derive it from the published
+        # stats files, so the generator does not hide blocks it did not export itself
+        names = git(deploy_dir, 'ls-tree', '--name-only', published, 'data/').split('\n')
+        blocks = [os.path.basename(name)[:-len('.json')] for name in names if name.endswith('.json')]
+        availability = BlockAvailability.from_blocks(block for block in blocks if block.isdigit())
+        os.makedirs(os.path.join(static_dir, 'data'), exist_ok=True)
+        with open(os.path.join(static_dir, 'data', 'availability.json'), 'w') as f:
+            json.dump(availability.to_json(), f, separators=(',', ':'))
+        logger.info(f"Derived the availability of {len(availability)} published blocks")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish the static site, sending only the changed files.')
+    parser.add_argument('--static-dir', default=os.path.join(REPO_DIR, 'static'), help='Static site directory')
+    parser.add_argument('--changeset', default=os.environ.get('STATIC_CHANGESET_PATH', os.path.join(REPO_DIR, '.static-changeset.json')),
+                        help='Changeset manifest written by static_generator.py')
+    parser.add_argument('--deploy-dir', default=STATIC_DEPLOY_DIR, help='Working repository for deploys')
+    parser.add_argument('--remote', default=STATIC_DEPLOY_REMOTE, help='Repository the site is published to')
+    parser.add_argument('--branch', default=STATIC_DEPLOY_BRANCH, help=f'Published branch (default: {STATIC_DEPLOY_BRANCH})')
+    parser.add_argument('--depth', type=int, default=STATIC_HISTORY_DEPTH,
+                        help=f'Number of deploy commits to keep (default: {STATIC_HISTORY_DEPTH})')
+    parser.add_argument('--full', action='store_true', help='Publish the whole static directory, not just the changeset')
+    parser.add_argument('--restore', action='store_true',
+                        help='Restore the generator index files from the published site instead of publishing')
+    args = parser.parse_args()
+    depth = max(1, args.depth)
+
+    try:
+        if args.restore:
+            restore_state(args.static_dir, args.deploy_dir, args.remote, args.branch, depth)
+        else:
+            publish(args.static_dir, args.changeset, args.deploy_dir, args.remote, args.branch, depth, args.full)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+import os
+import io
+import sys
+import math
+import time
+import pickle
+import hashlib
+import logging
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use('Agg')  # Render without a display
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+
+from graph_arrays import graph_to_arrays, compute_schedule
+import storage_access
+import tiles
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger('dependency-renderer')
+
+# Storage layout, must match what app.py reads
+BUCKET_NAME = "ethereum-graphs"
+GRAPHS_FOLDER = "graphs"
+IMAGES_FOLDER = "images"
+GANTT_IMAGES_FOLDER = "chart_data_images"
+TILES_FOLDER = "tiles"
+
+# Layouts are cached in memory per process and on disk across processes and runs;
+# the in-memory copy only keeps the most recently used ones, since pool workers live
+# for a whole backfill
+LAYOUT_CACHE_DIR = os.environ.get('LAYOUT_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layout_cache'))
+LAYOUT_CACHE_SIZE = int(os.environ.get('LAYOUT_CACHE_SIZE', 256))
+layout_cache = OrderedDict()
+
+# Above this many edges, edges are drawn as plain lines instead of arrows
+MAX_ARROW_EDGES = int(os.environ.get('MAX_ARROW_EDGES', 300))
+
+# Graphs with more transactions than this are also rendered larger, spreading
+# out the nodes, and cut into a deep-zoom tile pyramid (see tiles.py)
+DEEP_ZOOM_MIN_NODES = int(os.environ.get('DEEP_ZOOM_MIN_NODES', 1000))
+DEEP_ZOOM_MAX_SCALE = float(os.environ.get('DEEP_ZOOM_MAX_SCALE', 8))  # Largest render, relative to the normal image size
+
+THEMES = {
+    'light': {
+        'background': '#ffffff',
+        'node': '#3498db',
+        'edge': '#95a5a6',
+        'bar': '#3498db',
+        'text': '#2c3e50'
+    },
+    'dark': {
+        'background': '#1e272e',
+        'node': '#4bcffa',
+        'edge': '#808e9b',
+        'bar': '#4bcffa',
+        'text': '#d2dae2'
+    }
+}
+
+def graph_structure_hash(graph):
+    """Hash the structure of a graph (connected nodes and edges, no attributes).
+
+    Two graphs with the same hash get the same layout, whatever the theme or
+    image size they are rendered with.
+    """
+    digest = hashlib.sha256()
+    nodes = sorted((node for node in graph.nodes if graph.degree(node) > 0), key=str)
+    edges = sorted(((str(u), str(v)) for u, v in graph.edges))
+    digest.update(repr(nodes).encode('utf-8'))
+    digest.update(repr(edges).encode('utf-8'))
+    return digest.hexdigest()
+
+def compute_layout(graph):
+    """Compute node positions for the connected part of a graph.
+
+    Isolated transactions are left out, they do not take part in any
+    dependency and would only make the layout larger and slower.
+    """
+    connected = graph.subgraph([node for node in graph.nodes if graph.degree(node) > 0])
+    if connected.number_of_nodes() == 0:
+        return {}
+
+    try:
+        return nx.nx_agraph.graphviz_layout(connected, prog='dot')
+    except ImportError:
+        logger.warning("pygraphviz is not available, falling back to a layered layout")
+
+    # Layered layout: x is the dependency depth, y spreads nodes within a level
+    levels = {}
+    for node in nx.topological_sort(connected):
+        levels[node] = max((levels[pred] + 1 for pred in connected.predecessors(node)), default=0)
+    layered = nx.DiGraph()
+    layered.add_nodes_from((node, {'level': level}) for node, level in levels.items())
+    return nx.multipartite_layout(layered, subset_key='level')
+
+def get_layout(graph, cache_dir=LAYOUT_CACHE_DIR):
+    """Return the layout for a graph, computing it only once per structure."""
+    key = graph_structure_hash(graph)
+    if key in layout_cache:
+        layout_cache.move_to_end(key)
+        return layout_cache[key]
+
+    cache_path = os.path.join(cache_dir, f"{key}.pkl") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            layout = pickle.load(f)
+    else:
+        start_time = time.time()
+        layout = compute_layout(graph)
+        logger.info(f"Computed layout for {len(layout)} nodes in {time.time() - start_time:.2f}s")
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(layout, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+
+    layout_cache[key] = layout
+    while len(layout_cache) > LAYOUT_CACHE_SIZE:
+        layout_cache.popitem(last=False)
+    return layout
+
+def figure_to_png(fig, dpi):
+    """Serialize a matplotlib figure to PNG bytes and free it."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, facecolor=fig.get_facecolor())
+    plt.close(fig)
+    return buffer.getvalue()
+
+def render_graph_png(graph, theme='light', size=(12, 8), dpi=100, cache_dir=LAYOUT_CACHE_DIR):
+    """Render the dependency graph of a block as PNG bytes."""
+    colors = THEMES[theme]
+    layout = get_layout(graph, cache_dir)
+    isolated = graph.number_of_nodes() - len(layout)
+
+    fig, ax = plt.subplots(figsize=size)
+    fig.patch.set_facecolor(colors['background'])
+    ax.set_facecolor(colors['background'])
+    ax.axis('off')
+
+    if layout:
+        connected = graph.subgraph(layout.keys())
+        # Arrow patches are drawn one by one; large graphs use a single line collection
+        draw_arrows = connected.number_of_edges() <= MAX_ARROW_EDGES
+        nx.draw_networkx_edges(connected, layout, ax=ax, edge_color=colors['edge'], arrows=draw_arrows,
+                               arrowsize=6, width=0.6)
+        nx.draw_networkx_nodes(connected, layout, ax=ax, node_color=colors['node'], node_size=30)
+
+    block_number = graph.graph.get('block_number')
+    ax.set_title(f"Block {block_number}: {graph.number_of_nodes()} transactions, "
+                 f"{graph.number_of_edges()} dependencies ({isolated} independent)", color=colors['text'])
+    return figure_to_png(fig, dpi)
+
+def render_gantt_png(graph, theme='light', size=(12, 8), dpi=100):
+    """Render the earliest-start schedule of a block as a Gantt chart PNG."""
+    colors = THEMES[theme]
+    labels, sources, targets = graph_to_arrays(graph)
+    start, end = compute_schedule(len(labels), sources, targets)
+    order = np.argsort(start, kind='stable')
+
+    fig, ax = plt.subplots(figsize=size)
+    fig.patch.set_facecolor(colors['background'])
+    ax.set_facecolor(colors['background'])
+
+    if len(labels):
+        ax.barh(np.arange(len(labels)), (end - start)[order], left=start[order], color=colors['bar'], height=0.8)
+    ax.invert_yaxis()
+    ax.set_xlabel('Execution slot', color=colors['text'])
+    ax.set_ylabel('Transaction', color=colors['text'])
+    ax.tick_params(colors=colors['text'])
+
+    block_number = graph.graph.get('block_number')
+    slots = int(end.max()) if len(end) else 0
+    ax.set_title(f"Block {block_number}: {len(labels)} transactions in {slots} slots", color=colors['text'])
+    return figure_to_png(fig, dpi)
+
+def deep_zoom_scale(node_count):
+    """How much larger than normal a graph is rendered for its tile pyramid, or None for no pyramid."""
+    if node_count <= DEEP_ZOOM_MIN_NODES:
+        return None
+    # Keep the area per node roughly constant, starting at four times the normal size
+    return min(DEEP_ZOOM_MAX_SCALE, 4 * math.sqrt(node_count / DEEP_ZOOM_MIN_NODES))
+
+def upload_pyramid(bucket, block_number, png):
+    """Cut a large graph image into tiles and upload them. Returns the number of files written."""
+    def upload(path, data):
+        content_type = 'application/xml' if path.endswith('.dzi') else 'image/png'
+        storage_access.upload(bucket, f"{TILES_FOLDER}/{path}", data, content_type)
+    return tiles.write_pyramid(png, str(block_number), upload)
+
+def render_block(bucket, block_number, theme='light', size=(12, 8), dpi=100, cache_dir=LAYOUT_CACHE_DIR):
+    """Render the graph and gantt PNGs of a stored graph and upload them.
+
+    Large graphs additionally get a deep-zoom tile pyramid.
+
+    Returns False if the block has no stored graph.
+    """
+    graph_blob = bucket.blob(f"{GRAPHS_FOLDER}/{block_number}.pkl")
+    if not storage_access.call(graph_blob.exists):
+        return False
+
+    graph = pickle.loads(storage_access.call(graph_blob.download_as_bytes))
+    render_graph(bucket, block_number, graph, theme, size, dpi, cache_dir)
+    return True
+
+def render_graph(bucket, block_number, graph, theme='light', size=(12, 8), dpi=100, cache_dir=LAYOUT_CACHE_DIR):
+    """Render the graph and gantt PNGs of a graph in memory and upload them (and a tile pyramid if large)."""
+    if graph.graph.get('block_number') is None:
+        graph.graph['block_number'] = block_number
+
+    storage_access.upload(bucket, f"{IMAGES_FOLDER}/{block_number}.png",
+                          render_graph_png(graph, theme, size, dpi, cache_dir), 'image/png')
+    storage_access.upload(bucket, f"{GANTT_IMAGES_FOLDER}/{block_number}.png",
+                          render_gantt_png(graph, theme, size, dpi), 'image/png')
+
+    scale = deep_zoom_scale(graph.number_of_nodes())
+    if scale is not None:
+        large_png = render_graph_png(graph, theme, (size[0] * scale, size[1] * scale), dpi, cache_dir)
+        if tiles.needs_pyramid(*tiles.png_size(large_png)):
+            files = upload_pyramid(bucket, block_number, large_png)
+            logger.info(f"Uploaded a {files}-file tile pyramid for block {block_number}")
+
+def render_chunk(block_numbers, output, bucket_name, theme, size, dpi, cache_dir):
+    """Render a list of blocks; runs inside a worker process."""
+    from backfill import open_bucket
+
+    bucket = open_bucket(output, bucket_name)
+    rendered, failed = 0, []
+    for block_number in block_numbers:
+        try:
+            if render_block(bucket, block_number, theme, size, dpi, cache_dir):
+                rendered += 1
+        except Exception as e:
+            logger.error(f"Error rendering block {block_number}: {e}")
+            failed.append(block_number)
+    return {'rendered': rendered, 'failed': failed}
+
+def render_blocks(block_numbers, output, bucket_name=BUCKET_NAME, workers=None, theme='light',
+                  size=(12, 8), dpi=100, cache_dir=LAYOUT_CACHE_DIR, chunk_size=50):
+    """Render many blocks across a process pool."""
+    workers = workers or os.cpu_count() or 1
+    chunks = [block_numbers[i:i + chunk_size] for i in range(0, len(block_numbers), chunk_size)]
+    start_time = time.time()
+    rendered, failed = 0, []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(render_chunk, chunk, output, bucket_name, theme, size, dpi, cache_dir)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            rendered += result['rendered']
+            failed.extend(result['failed'])
+            logger.info(f"Rendered {rendered}/{len(block_numbers)} blocks")
+
+    logger.info(f"Rendering complete: {rendered} rendered, {len(failed)} failed in {time.time() - start_time:.1f}s")
+    return {'rendered': rendered, 'failed': failed}
+
+def main():
+    parser = argparse.ArgumentParser(description='Render graph and gantt PNGs for stored dependency graphs.')
+    parser.add_argument('--start', type=int, required=True, help='First block number (inclusive)')
+    parser.add_argument('--end', type=int, required=True, help='Last block number (exclusive)')
+    parser.add_argument('--output', required=True, help='gs://<bucket> or a local directory holding the bucket tree')
+    parser.add_argument('--bucket', default=BUCKET_NAME, help=f'Bucket name for local output (default: {BUCKET_NAME})')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--theme', choices=sorted(THEMES), default='light', help='Color theme')
+    parser.add_argument('--width', type=float, default=12, help='Image width in inches')
+    parser.add_argument('--height', type=float, default=8, help='Image height in inches')
+    parser.add_argument('--dpi', type=int, default=100, help='Image resolution')
+    parser.add_argument('--layout-cache', default=LAYOUT_CACHE_DIR, help='Directory for cached layouts')
+    args = parser.parse_args()
+
+    result = render_blocks(list(range(args.start, args.end)), args.output, args.bucket, args.workers,
+                           args.theme, (args.width, args.height), args.dpi, args.layout_cache)
+    return 1 if result['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
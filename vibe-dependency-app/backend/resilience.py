@@ -0,0 +1,219 @@
+import time
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from admission import StorageOverloaded
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    from google.auth import exceptions as auth_exceptions
+except ImportError:  # Local object store only
+    google_exceptions = auth_exceptions = None
+
+class CircuitOpen(StorageOverloaded):
+    """Raised instead of calling storage while the circuit breaker is open."""
+
+def is_storage_failure(error):
+    """Tell whether an error means the store is unhealthy.
+
+    Transport errors, timeouts and 5xx/429 responses count. A missing object
+    or any other 4xx is an answer from a healthy store.
+    """
+    if isinstance(error, FileNotFoundError):
+        return False
+    if google_exceptions is not None:
+        if isinstance(error, google_exceptions.GoogleAPICallError):
+            return error.code is None or error.code >= 500 or error.code == 429
+        if isinstance(error, google_exceptions.RetryError):
+            return True
+    if auth_exceptions is not None and isinstance(error, auth_exceptions.TransportError):
+        return True
+    # ConnectionError, socket timeouts and the requests transport errors are all OSErrors
+    return isinstance(error, OSError)
+
+class LatencyTracker:
+    """Rolling window of recent call durations for one kind of storage call."""
+
+    def __init__(self, window=200):
+        self._durations = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._durations.append(seconds)
+
+    def __len__(self):
+        return len(self._durations)
+
+    def percentile(self, q):
+        """Return the q-th percentile of the window, or None while it is empty."""
+        with self._lock:
+            durations = sorted(self._durations)
+        if not durations:
+            return None
+        return durations[min(len(durations) - 1, int(len(durations) * q / 100))]
+
+class HedgedReader:
+    """Run idempotent storage reads with a hedge against tail latency.
+
+    The read is started on the executor; if it has not finished after the
+    observed ``percentile`` latency of that kind of call, one duplicate is
+    started and whichever finishes first wins. Hedging only starts once
+    ``min_samples`` calls have been observed, and at most ``max_hedge_ratio``
+    of all calls are hedged so a slow store is never hit with double load.
+    """
+
+    def __init__(self, executor, percentile=95, min_delay=0.02, min_samples=20, max_hedge_ratio=0.1):
+        self.executor = executor
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self._trackers = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'calls': 0,
+            'hedged': 0,
+            'hedge_wins': 0
+        }
+
+    def _tracker(self, kind):
+        with self._lock:
+            if kind not in self._trackers:
+                self._trackers[kind] = LatencyTracker()
+            return self._trackers[kind]
+
+    def hedge_delay(self, kind):
+        """Seconds to wait before hedging a call of this kind, or None if it should not be hedged."""
+        tracker = self._tracker(kind)
+        if len(tracker) < self.min_samples:
+            return None
+        with self._lock:
+            if self._stats['hedged'] >= self._stats['calls'] * self.max_hedge_ratio:
+                return None
+        return max(self.min_delay, tracker.percentile(self.percentile))
+
+    def call(self, kind, fn, *args):
+        start_time = time.monotonic()
+        with self._lock:
+            self._stats['calls'] += 1
+
+        primary = self.executor.submit(fn, *args)
+        delay = self.hedge_delay(kind)
+        if delay is None:
+            result = primary.result()
+            self._tracker(kind).record(time.monotonic() - start_time)
+            return result
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            result = primary.result()
+            self._tracker(kind).record(time.monotonic() - start_time)
+            return result
+
+        with self._lock:
+            self._stats['hedged'] += 1
+        pending = {primary, self.executor.submit(fn, *args)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is not primary:
+                    with self._lock:
+                        self._stats['hedge_wins'] += 1
+                # The slow call is left to finish in the background
+                self._tracker(kind).record(time.monotonic() - start_time)
+                return future.result()
+        raise error
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            trackers = dict(self._trackers)
+        stats['p95_ms'] = {
+            kind: round(tracker.percentile(95) * 1000, 1)
+            for kind, tracker in trackers.items() if len(tracker)
+        }
+        return stats
+
+class CircuitBreaker:
+    """Stop calling a failing store and let callers fall back to cached data.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail immediately with CircuitOpen for ``reset_timeout`` seconds.
+    Then a single trial call is let through: success closes the circuit,
+    failure opens it again. Only errors for which is_storage_failure() holds
+    are failures; others (e.g. NotFound) are re-raised but count as success.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._stats = {
+            'failures': 0,
+            'opened': 0,
+            'short_circuited': 0
+        }
+
+    def is_open(self):
+        """True while calls are being refused, so cached data should be served even if stale."""
+        with self._lock:
+            return self._opened_at is not None
+
+    def _retry_after(self):
+        return max(1, int(self._opened_at + self.reset_timeout - time.monotonic() + 0.999))
+
+    def _before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+                self._stats['short_circuited'] += 1
+                raise CircuitOpen("Storage is failing, circuit breaker is open", self._retry_after())
+            self._trial_running = True
+
+    def call(self, fn, *args):
+        self._before_call()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if not is_storage_failure(e):
+                self._record_success()
+                raise
+            with self._lock:
+                self._stats['failures'] += 1
+                self._failures += 1
+                if self._trial_running or self._failures >= self.failure_threshold:
+                    if self._opened_at is None or self._trial_running:
+                        self._stats['opened'] += 1
+                    self._opened_at = time.monotonic()
+                self._trial_running = False
+            raise
+
+        self._record_success()
+        return result
+
+    def _record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            if self._opened_at is None:
+                stats['state'] = 'closed'
+            elif self._trial_running or time.monotonic() - self._opened_at >= self.reset_timeout:
+                stats['state'] = 'half_open'
+            else:
+                stats['state'] = 'open'
+        return stats
@@ -0,0 +1,392 @@
+import os
+import sys
+import mmap
+import time
+import zlib
+import pickle
+import struct
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from graph_arrays import EDGE_LIST_HEADER, graph_to_arrays, encode_edge_list, decode_edge_list
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger('dependency-segments')
+
+# Packed segment archive of dependency graphs
+#
+# The graphs of SEGMENT_BLOCKS consecutive block numbers are packed into one
+# append-only segment file, so a scan over many blocks reads a few large
+# files sequentially instead of fetching and unpickling one object per block.
+# Each graph is stored as a binary edge list (see graph_arrays.py).
+#
+# <start>.seg (little endian):
+#   header:  magic 'DEPS' | version u8 | 3 pad | first block u64 | block count u32 | 4 pad
+#   records: block u64 | payload length u32 | payload crc32 u32 | payload, zero padded to 8 bytes
+# <start>.idx: one entry per record, in record order:
+#   block u64 | payload offset u64 | payload length u32 | payload crc32 u32
+#
+# Records are only ever appended; a block written twice is read from its last
+# record. The index is written after the records it points to, so a crash
+# leaves at most unindexed records, which the next writer re-indexes (or cuts
+# off, if the last one is incomplete). Readers map the segment and hand out
+# payloads as memoryviews into the mapping, without copying.
+
+SEGMENTS_DIR = os.environ.get('SEGMENTS_DIR', 'segments')
+SEGMENT_BLOCKS = int(os.environ.get('SEGMENT_BLOCKS', 10000))  # Block numbers per segment
+
+SEGMENT_MAGIC = b'DEPS'
+SEGMENT_VERSION = 1
+SEGMENT_HEADER = struct.Struct('<4sB3xQI4x')
+RECORD_HEADER = struct.Struct('<QII')
+RECORD_ALIGNMENT = 8
+INDEX_DTYPE = np.dtype([('block', '<u8'), ('offset', '<u8'), ('length', '<u4'), ('crc', '<u4')])
+
+# Storage layout of the per-block objects, must match what app.py reads
+BUCKET_NAME = "ethereum-graphs"
+GRAPHS_FOLDER = "graphs"
+
+def segment_start(block_number, segment_blocks=SEGMENT_BLOCKS):
+    return block_number - block_number % segment_blocks
+
+def segment_paths(directory, start):
+    base = os.path.join(directory, f"{start:012d}")
+    return f"{base}.seg", f"{base}.idx"
+
+def read_segment_header(path):
+    """Return ``(first block, block count)`` of a segment file."""
+    with open(path, 'rb') as f:
+        magic, version, start, count = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+    if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+        raise ValueError(f"{path} is not a version 1 graph segment")
+    return start, count
+
+def list_segments(directory):
+    """List ``(first block, block count, path)`` of the segments in a directory, in block order."""
+    if not os.path.isdir(directory):
+        return []
+    segments = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.seg'):
+            path = os.path.join(directory, filename)
+            start, count = read_segment_header(path)
+            segments.append((start, count, path))
+    return segments
+
+def _padding(length):
+    return -length % RECORD_ALIGNMENT
+
+class SegmentWriter:
+    """Appends graph records to one segment, recovering from an interrupted writer first."""
+
+    def __init__(self, directory, start, segment_blocks=SEGMENT_BLOCKS):
+        self.start = start
+        self.segment_blocks = segment_blocks
+        self.data_path, self.index_path = segment_paths(directory, start)
+        os.makedirs(directory, exist_ok=True)
+
+        if not os.path.exists(self.data_path):
+            with open(self.data_path, 'wb') as f:
+                f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, start, segment_blocks))
+            open(self.index_path, 'wb').close()
+        elif read_segment_header(self.data_path) != (start, segment_blocks):
+            raise ValueError(f"{self.data_path} was written with another segment size")
+
+        entries = self._recover()
+        self.blocks = set(int(block) for block in entries['block'])
+        self._data = open(self.data_path, 'ab')
+        self._index = open(self.index_path, 'ab')
+        self._size = self._data.tell()
+        self._pending = []
+
+    def _recover(self):
+        """Make the index match the data file and return its entries."""
+        data_size = os.path.getsize(self.data_path)
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        entries = np.fromfile(self.index_path, dtype=INDEX_DTYPE, count=index_size // INDEX_DTYPE.itemsize) \
+            if index_size else np.zeros(0, dtype=INDEX_DTYPE)
+
+        # Drop entries past the end of the data, then index the records after the last entry
+        entries = entries[entries['offset'] + entries['length'] <= data_size]
+        if len(entries):
+            position = int(entries['offset'][-1] + entries['length'][-1])
+            position += _padding(position)
+        else:
+            position = SEGMENT_HEADER.size
+
+        recovered = []
+        with open(self.data_path, 'rb') as f:
+            while True:
+                f.seek(position)
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                block, length, crc = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                offset = position + RECORD_HEADER.size
+                recovered.append((block, offset, length, crc))
+                position = offset + length + _padding(offset + length)
+
+        if position < data_size:
+            logger.warning(f"Cutting off an incomplete record at the end of {self.data_path}")
+            os.truncate(self.data_path, position)
+        if recovered:
+            logger.info(f"Re-indexed {len(recovered)} records of {self.data_path}")
+            entries = np.concatenate([entries, np.array(recovered, dtype=INDEX_DTYPE)])
+        if recovered or len(entries) * INDEX_DTYPE.itemsize != index_size:
+            temp_path = f"{self.index_path}.tmp"
+            entries.tofile(temp_path)
+            os.replace(temp_path, self.index_path)
+        return entries
+
+    def append(self, block_number, payload):
+        if not self.start <= block_number < self.start + self.segment_blocks:
+            raise ValueError(f"Block {block_number} is outside segment {self.start}")
+        payload = bytes(payload)
+        crc = zlib.crc32(payload)
+        offset = self._size + RECORD_HEADER.size
+        padding = _padding(offset + len(payload))
+        self._data.write(RECORD_HEADER.pack(block_number, len(payload), crc) + payload + b'\0' * padding)
+        self._size = offset + len(payload) + padding
+        self._pending.append((block_number, offset, len(payload), crc))
+        self.blocks.add(block_number)
+
+    def flush(self):
+        """Write out the appended records, then the index entries pointing to them."""
+        if not self._pending:
+            return
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._index.write(np.array(self._pending, dtype=INDEX_DTYPE).tobytes())
+        self._index.flush()
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class SegmentReader:
+    """Read-only memory-mapped view of one segment."""
+
+    def __init__(self, path):
+        self.path = path
+        self.start, self.segment_blocks = read_segment_header(path)
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mmap, 'madvise'):
+            # Scans read front to back, let the kernel read ahead aggressively
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+        self._view = memoryview(self._mmap)
+
+        index_path = os.path.splitext(path)[0] + '.idx'
+        index_size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        entries = np.fromfile(index_path, dtype=INDEX_DTYPE, count=index_size // INDEX_DTYPE.itemsize) \
+            if index_size else np.zeros(0, dtype=INDEX_DTYPE)
+        entries = entries[entries['offset'] + entries['length'] <= len(self._mmap)]
+
+        # Sort by block, keeping the last record of blocks written more than once
+        order = np.argsort(entries['block'], kind='stable')
+        entries = entries[order]
+        last = np.append(entries['block'][1:] != entries['block'][:-1], True) if len(entries) else np.zeros(0, dtype=bool)
+        entries = entries[last]
+        self.blocks = entries['block'].astype(np.int64)
+        self._offsets = entries['offset']
+        self._lengths = entries['length']
+        self._crcs = entries['crc']
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def _payload(self, i):
+        offset = int(self._offsets[i])
+        return self._view[offset:offset + int(self._lengths[i])]
+
+    def get(self, block_number):
+        """The payload of a block as a memoryview into the mapping, or None."""
+        i = int(np.searchsorted(self.blocks, block_number))
+        if i < len(self.blocks) and self.blocks[i] == block_number:
+            return self._payload(i)
+        return None
+
+    def iter_range(self, start=None, end=None):
+        """Yield ``(block number, payload)`` for the blocks in ``[start, end)`` in block order."""
+        low = 0 if start is None else int(np.searchsorted(self.blocks, start))
+        high = len(self.blocks) if end is None else int(np.searchsorted(self.blocks, end))
+        for i in range(low, high):
+            yield int(self.blocks[i]), self._payload(i)
+
+    def verify(self):
+        """Return the blocks whose payload does not match its checksum."""
+        return [int(self.blocks[i]) for i in range(len(self.blocks)) if zlib.crc32(self._payload(i)) != self._crcs[i]]
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A payload is still referenced; the mapping goes away with it
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_range(directory=SEGMENTS_DIR, start=None, end=None):
+    """Yield ``(block number, payload)`` for all packed blocks in ``[start, end)``.
+
+    Segments are opened one after the other. Payloads are memoryviews into the
+    mapped segment files; copy them to keep them past the iteration.
+    """
+    for segment_first, segment_blocks, path in list_segments(directory):
+        if (end is not None and segment_first >= end) or (start is not None and segment_first + segment_blocks <= start):
+            continue
+        with SegmentReader(path) as reader:
+            yield from reader.iter_range(start, end)
+
+def iter_graph_arrays(directory=SEGMENTS_DIR, start=None, end=None):
+    """Yield ``(block number, labels, sources, targets)`` for all packed blocks in ``[start, end)``."""
+    for block_number, payload in iter_range(directory, start, end):
+        yield (block_number, *decode_edge_list(payload))
+
+def list_block_objects(bucket, start=None, end=None):
+    """List the block numbers in ``[start, end)`` that have a per-block graph object."""
+    prefix = f"{GRAPHS_FOLDER}/"
+    blocks = []
+    for blob in bucket.list_blobs(prefix=prefix):
+        name = blob.name[len(prefix):]
+        if not name.endswith('.pkl') or not name[:-4].isdigit():
+            continue
+        block_number = int(name[:-4])
+        if (start is None or block_number >= start) and (end is None or block_number < end):
+            blocks.append(block_number)
+    return sorted(blocks)
+
+def compact_segment(first_block, blocks, source, bucket_name, output, segment_blocks, threads):
+    """Pack the per-block graph objects of one segment; runs inside a worker process."""
+    from backfill import open_bucket
+
+    start_time = time.time()
+    bucket = open_bucket(source, bucket_name, threads)
+    failed = []
+
+    def load(block_number):
+        try:
+            data = bucket.blob(f"{GRAPHS_FOLDER}/{block_number}.pkl").download_as_bytes()
+            return encode_edge_list(*graph_to_arrays(pickle.loads(data)))
+        except Exception as e:
+            logger.error(f"Error packing block {block_number}: {e}")
+            failed.append(block_number)
+            return None
+
+    with SegmentWriter(output, first_block, segment_blocks) as writer:
+        # Blocks packed by an earlier run are skipped, so an interrupted compaction resumes
+        pending = [block_number for block_number in blocks if block_number not in writer.blocks]
+        # Downloads overlap on threads, records are still appended in block order
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for i, (block_number, payload) in enumerate(zip(pending, executor.map(load, pending)), 1):
+                if payload is not None:
+                    writer.append(block_number, payload)
+                if i % 1000 == 0:
+                    writer.flush()
+
+    return {
+        'segment': first_block,
+        'packed': len(pending) - len(failed),
+        'skipped': len(blocks) - len(pending),
+        'failed': failed,
+        'elapsed': time.time() - start_time
+    }
+
+def run_compaction(source, output=SEGMENTS_DIR, start=None, end=None, bucket_name=BUCKET_NAME,
+                   segment_blocks=SEGMENT_BLOCKS, workers=None, threads=16):
+    """Pack the per-block graph objects in ``[start, end)`` into segments, one segment per task."""
+    from backfill import open_bucket
+
+    workers = workers or os.cpu_count() or 1
+    blocks = list_block_objects(open_bucket(source, bucket_name), start, end)
+    by_segment = {}
+    for block_number in blocks:
+        by_segment.setdefault(segment_start(block_number, segment_blocks), []).append(block_number)
+    logger.info(f"Compacting {len(blocks)} graphs into {len(by_segment)} segments on {workers} workers")
+
+    start_time = time.time()
+    packed, skipped, failed = 0, 0, []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(compact_segment, first_block, segment, source, bucket_name, output, segment_blocks, threads)
+            for first_block, segment in sorted(by_segment.items())
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            packed += result['packed']
+            skipped += result['skipped']
+            failed.extend(result['failed'])
+            elapsed = time.time() - start_time
+            logger.info(f"Segment {result['segment']}: packed {result['packed']}, {result['skipped']} already packed, "
+                        f"in {result['elapsed']:.1f}s ({packed / elapsed if elapsed > 0 else 0.0:.0f} blocks/s overall)")
+
+    logger.info(f"Compaction complete: {packed} packed, {skipped} already packed, {len(failed)} failed "
+                f"in {time.time() - start_time:.1f}s")
+    return {'packed': packed, 'skipped': skipped, 'failed': failed}
+
+def scan(directory=SEGMENTS_DIR, start=None, end=None):
+    """Read every packed block in the range and report the read throughput."""
+    start_time = time.time()
+    blocks, nodes, edges, size = 0, 0, 0, 0
+    for _, payload in iter_range(directory, start, end):
+        _, _, _, _, node_count, edge_count = EDGE_LIST_HEADER.unpack_from(payload)
+        blocks += 1
+        nodes += node_count
+        edges += edge_count
+        size += len(payload)
+    elapsed = time.time() - start_time
+    logger.info(f"Scanned {blocks} blocks ({nodes} transactions, {edges} dependencies, {size / 1e6:.1f}MB) "
+                f"in {elapsed:.2f}s ({blocks / elapsed if elapsed > 0 else 0.0:.0f} blocks/s)")
+    return {'blocks': blocks, 'node_count': nodes, 'edge_count': edges, 'bytes': size}
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack per-block dependency graphs into segment files, or scan them.')
+    parser.add_argument('--source', help='gs://<bucket> or a local directory holding the bucket tree to compact')
+    parser.add_argument('--output', default=SEGMENTS_DIR, help=f'Segment directory (default: {SEGMENTS_DIR})')
+    parser.add_argument('--start', type=int, default=None, help='First block number (inclusive)')
+    parser.add_argument('--end', type=int, default=None, help='Last block number (exclusive)')
+    parser.add_argument('--bucket', default=BUCKET_NAME, help=f'Bucket name for a local source (default: {BUCKET_NAME})')
+    parser.add_argument('--segment-blocks', type=int, default=SEGMENT_BLOCKS,
+                        help=f'Block numbers per segment (default: {SEGMENT_BLOCKS})')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--threads', type=int, default=16, help='Concurrent downloads per worker (default: 16)')
+    parser.add_argument('--scan', action='store_true', help='Scan the packed blocks in the range instead of compacting')
+    args = parser.parse_args()
+
+    if args.scan:
+        scan(args.output, args.start, args.end)
+        return 0
+    if not args.source:
+        parser.error('--source is required to compact')
+    result = run_compaction(args.source, args.output, args.start, args.end, args.bucket,
+                            args.segment_blocks, args.workers, args.threads)
+    return 1 if result['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
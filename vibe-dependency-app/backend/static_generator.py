@@ -8,7 +8,15 @@ import sys
 import traceback
 import logging
 import shutil
+import argparse
+import subprocess
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from resilience import CircuitBreaker, CircuitOpen, HedgedReader
+from availability import BlockAvailability
+import storage_access
+import tiles
 
 # Configure logging
 logging.basicConfig(
@@ -65,16 +73,31 @@ except ImportError as e:
     logger.error("Please run: pip install google-cloud-storage")
     sys.exit(1)
 
-# Global storage client
-storage_client = None
+
+# Tail latency and failure handling for storage reads, configured like the API server
+STORAGE_HEDGED_READS = os.environ.get('STORAGE_HEDGED_READS', 'false').lower() == 'true'
+storage_breaker = CircuitBreaker(
+    int(os.environ.get('STORAGE_CIRCUIT_FAILURES', 5)),
+    float(os.environ.get('STORAGE_CIRCUIT_RESET', 30))
+)
+hedged_reader = HedgedReader(
+    ThreadPoolExecutor(max_workers=4, thread_name_prefix='storage-read'),
+    float(os.environ.get('STORAGE_HEDGE_PERCENTILE', 95)),
+    float(os.environ.get('STORAGE_HEDGE_MIN_DELAY', 0.02))
+) if STORAGE_HEDGED_READS else None
+
+def storage_read(kind, fn, *args):
+    """Run one storage read through the circuit breaker, hedged if enabled."""
+    if hedged_reader is not None:
+        return storage_breaker.call(hedged_reader.call, kind, fn, *args)
+    return storage_breaker.call(fn, *args)
+
+# Exports are sequential, so the pool only needs room for the hedge threads
+storage_access.configure(4 if STORAGE_HEDGED_READS else 1)
 
 def get_storage_client():
-    """Get or create a Google Cloud Storage client instance."""
-    global storage_client
-    if storage_client is None:
-        logger.info("Initializing Google Cloud Storage client")
-        storage_client = storage.Client()
-    return storage_client
+    """Get the storage client of this process (thread-safe, recreated after a fork)."""
+    return storage_access.get_client()
 
 # Log environment variables (without sensitive data)
 logger.info(f"Number of environment variables: {len(os.environ)}")
@@ -88,8 +111,12 @@ if 'GOOGLE_APPLICATION_CREDENTIALS' in os.environ:
 else:
     logger.warning("GOOGLE_APPLICATION_CREDENTIALS environment variable is not set")
 
+# A local object store tree needs no credentials
+if storage_access.uses_local_storage():
+    print(f"Using local object store from LOCAL_STORAGE_DIR: {storage_access.LOCAL_STORAGE_DIR}")
+    DEMO_MODE = False
 # Check for alternate Google Cloud credentials format (separate env vars)
-if ('GOOGLE_CREDENTIALS_TYPE' in os.environ and 
+elif ('GOOGLE_CREDENTIALS_TYPE' in os.environ and 
     'GOOGLE_CREDENTIALS_PROJECT_ID' in os.environ and
     'GOOGLE_CREDENTIALS_CLIENT_EMAIL' in os.environ):
     print("Using credentials from separate environment variables")
@@ -248,12 +275,12 @@ def get_image_from_gcs(block_number):
         print(f"Looking for blob: {blob_path}")
         
         # Check if blob exists
-        if not blob.exists():
+        if not storage_read('exists', blob.exists):
             print(f"Blob {blob_path} does not exist")
             return None
         
         # Download blob content to memory
-        content = blob.download_as_bytes()
+        content = storage_read('download', blob.download_as_bytes)
         
         # Get blob metadata
         metadata = blob.metadata or {}
@@ -270,6 +297,8 @@ def get_image_from_gcs(block_number):
             'edge_count': edge_count,
             'demo_mode': False
         }
+    except CircuitOpen:
+        raise
     except Exception as e:
         print(f"Error retrieving image from GCS: {e}")
         print(traceback.format_exc())
@@ -294,12 +323,12 @@ def get_gantt_from_gcs(block_number):
         print(f"Looking for blob: {blob_path}")
         
         # Check if blob exists
-        if not blob.exists():
+        if not storage_read('exists', blob.exists):
             print(f"Blob {blob_path} does not exist")
             return None
         
         # Download blob content to memory
-        content = blob.download_as_bytes()
+        content = storage_read('download', blob.download_as_bytes)
         
         # Encode image as base64 for JSON response
         image_base64 = base64.b64encode(content).decode('utf-8')
@@ -309,6 +338,8 @@ def get_gantt_from_gcs(block_number):
             'image': image_base64,
             'demo_mode': False
         }
+    except CircuitOpen:
+        raise
     except Exception as e:
         print(f"Error retrieving gantt chart from GCS: {e}")
         print(traceback.format_exc())
@@ -324,7 +355,7 @@ def get_recent_block_numbers():
     try:
         client = get_storage_client()
         bucket = client.bucket('dependency-pics')
-        blobs = list(bucket.list_blobs(prefix='eth-txs/', delimiter='/'))
+        blobs = storage_read('list', lambda: list(bucket.list_blobs(prefix='eth-txs/', delimiter='/')))
         
         recent_blocks = []
         for blob in blobs:
@@ -354,6 +385,8 @@ def get_recent_block_numbers():
         
         # Limit to newest 9 blocks
         return recent_blocks[:9]
+    except CircuitOpen:
+        raise
     except Exception as e:
         print(f"Error retrieving recent block numbers: {e}")
         print(traceback.format_exc())
@@ -375,7 +408,7 @@ def get_graph_stats(block_number):
         blob = bucket.blob(blob_path)
         
         # Check if blob exists
-        if not blob.exists():
+        if not storage_read('exists', blob.exists):
             return None
         
         # Get blob metadata
@@ -387,11 +420,41 @@ def get_graph_stats(block_number):
             'node_count': node_count,
             'edge_count': edge_count
         }
+    except CircuitOpen:
+        raise
     except Exception as e:
         print(f"Error retrieving graph stats: {e}")
         print(traceback.format_exc())
         return None
 
+def list_block_blobs(start_offset=None):
+    """List dependency graph PNGs, optionally only those from start_offset on.
+
+    Returns a dict mapping block number to the blob's etag and stats metadata.
+    Object names are zero-padded, so a start_offset lists just the newest blocks.
+    """
+    if DEMO_MODE:
+        # Return mock data for demo mode
+        return {block['block_number']: {'etag': 'demo', 'node_count': 10, 'edge_count': 15}
+                for block in get_recent_block_numbers()}
+    
+    client = get_storage_client()
+    bucket = client.bucket('dependency-pics')
+    blobs = storage_read('list', lambda: list(bucket.list_blobs(prefix='eth-txs/', delimiter='/', start_offset=start_offset)))
+
+    block_blobs = {}
+    for blob in blobs:
+        # Only include the dependency graph PNGs, not gantt charts or other files
+        if blob.name.endswith('.png') and not blob.name.endswith('_gantt.png'):
+            block_number = blob.name.split('/')[-1].split('.')[0].lstrip('0') or '0'
+            metadata = blob.metadata or {}
+            block_blobs[block_number] = {
+                'etag': blob.etag,
+                'node_count': int(metadata.get('node_count', 0)),
+                'edge_count': int(metadata.get('edge_count', 0))
+            }
+    return block_blobs
+
 def get_min_block_number():
     """Get the minimum available block number."""
     if DEMO_MODE:
@@ -400,7 +463,7 @@ def get_min_block_number():
     try:
         client = get_storage_client()
         bucket = client.bucket('dependency-pics')
-        blobs = list(bucket.list_blobs(prefix='eth-txs/', delimiter='/'))
+        blobs = storage_read('list', lambda: list(bucket.list_blobs(prefix='eth-txs/', delimiter='/')))
         
         min_block = None
         for blob in blobs:
@@ -417,12 +480,108 @@ def get_min_block_number():
                     min_block = block_number
         
         return min_block or '0'
+    except CircuitOpen:
+        raise
     except Exception as e:
         print(f"Error retrieving minimum block number: {e}")
         print(traceback.format_exc())
         return '0'
 
-def save_image_to_file(block_data, output_dir):
+# Full-history export: every block gets its files, and the blocks are indexed in
+# JSON shards of INDEX_SHARD_SIZE consecutive block numbers under data/index/,
+# described by data/index/manifest.json. Clients fetch only the shard they need.
+INDEX_SHARD_SIZE = int(os.environ.get('STATIC_INDEX_SHARD_SIZE', 10000))
+
+# Only the newest STATIC_RETENTION_BLOCKS block numbers are kept on the site;
+# older blocks are removed from the index and their files deleted on publish
+STATIC_RETENTION_BLOCKS = int(os.environ.get('STATIC_RETENTION_BLOCKS', 0))  # 0 keeps every block
+
+# Files written or removed since the last publish, relative to the static directory
+changeset = {
+    'added': set(),
+    'changed': set(),
+    'deleted': set()
+}
+
+def write_static_file(path, data, static_dir):
+    """Write a file only if its content changed and record it in the changeset."""
+    existed = os.path.exists(path)
+    if existed:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+
+    # Create parent directories if they don't exist
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    relative_path = os.path.relpath(path, static_dir)
+    changeset['deleted'].discard(relative_path)
+    if existed:
+        changeset['changed'].add(relative_path)
+    else:
+        changeset['added'].add(relative_path)
+    return True
+
+def remove_static_file(path, static_dir):
+    """Delete a file and record it in the changeset.
+
+    The deletion is recorded even if the file is not there locally: the
+    published site may still have it (e.g. after a restore of only the index).
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    relative_path = os.path.relpath(path, static_dir)
+    changeset['added'].discard(relative_path)
+    changeset['changed'].discard(relative_path)
+    changeset['deleted'].add(relative_path)
+
+def remove_static_tree(path, static_dir):
+    """Delete a folder and record it in the changeset with a trailing slash.
+
+    publish.py expands the folder to the published files inside it, so the
+    deletion works without knowing which files the folder held.
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    relative_path = os.path.relpath(path, static_dir) + '/'
+    for recorded in (changeset['added'], changeset['changed']):
+        recorded.difference_update([p for p in recorded if p.startswith(relative_path)])
+    changeset['deleted'].add(relative_path)
+
+def retention_cutoff(newest_block):
+    """Return the oldest block number to keep, or None if every block is kept."""
+    if not STATIC_RETENTION_BLOCKS or newest_block is None:
+        return None
+    return int(newest_block) - STATIC_RETENTION_BLOCKS + 1
+
+def remove_block_files(static_dir, block_number):
+    for path in (os.path.join(static_dir, 'graphs', f"{block_number}.png"),
+                 os.path.join(static_dir, 'gantt', f"{block_number}.png"),
+                 os.path.join(static_dir, 'data', f"{block_number}.json"),
+                 os.path.join(static_dir, 'tiles', tiles.descriptor_path(block_number))):
+        remove_static_file(path, static_dir)
+    remove_static_tree(os.path.join(static_dir, 'tiles', tiles.tiles_folder(block_number)), static_dir)
+
+def prune_block_files(static_dir, cutoff):
+    """Remove the exported files of blocks older than the cutoff, found by listing the static directory."""
+    pruned = set()
+    for folder in ('graphs', 'gantt', 'data'):
+        folder_path = os.path.join(static_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for filename in os.listdir(folder_path):
+            block_number = filename.split('.')[0]
+            if block_number.isdigit() and int(block_number) < cutoff:
+                pruned.add(block_number)
+    for block_number in pruned:
+        remove_block_files(static_dir, block_number)
+    if pruned:
+        print(f"Removed {len(pruned)} blocks older than {cutoff}")
+    return len(pruned)
+
+def save_image_to_file(block_data, output_dir, static_dir):
     """Save an image from base64 to a PNG file."""
     if not block_data or 'image' not in block_data or not block_data['image']:
         print(f"No image data for block {block_data.get('block_number', 'unknown')}")
@@ -431,36 +590,97 @@ def save_image_to_file(block_data, output_dir):
     block_number = block_data['block_number']
     image_base64 = block_data['image']
     
-    # Create the output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    
     # Save the image as PNG
     image_path = os.path.join(output_dir, f"{block_number}.png")
     try:
-        with open(image_path, 'wb') as f:
-            f.write(base64.b64decode(image_base64))
-        print(f"Saved image to {image_path}")
+        if write_static_file(image_path, base64.b64decode(image_base64), static_dir):
+            print(f"Saved image to {image_path}")
         return True
     except Exception as e:
         print(f"Error saving image to {image_path}: {e}")
         print(traceback.format_exc())
         return False
 
-def save_json_to_file(data, output_path):
+def save_tile_pyramid(block_data, static_dir):
+    """Cut a large graph image into deep-zoom tiles under tiles/.
+
+    Returns the pyramid parameters for the block's stats, or None if the image
+    is small enough to be shown whole.
+    """
+    block_number = block_data['block_number']
+    image = base64.b64decode(block_data['image'])
+    try:
+        width, height = tiles.png_size(image)
+    except ValueError:
+        return None
+    if not tiles.needs_pyramid(width, height):
+        return None
+
+    tiles_dir = os.path.join(static_dir, 'tiles')
+    try:
+        count = tiles.write_pyramid(image, block_number,
+                                    lambda path, data: write_static_file(os.path.join(tiles_dir, *path.split('/')), data, static_dir))
+        print(f"Saved a {count}-file tile pyramid for block {block_number} ({width}x{height})")
+        return tiles.pyramid_info(width, height)
+    except Exception as e:
+        print(f"Error saving the tile pyramid of block {block_number}: {e}")
+        print(traceback.format_exc())
+        return None
+
+def save_json_to_file(data, output_path, static_dir):
     """Save data to a JSON file."""
     try:
-        # Create parent directories if they don't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Saved JSON to {output_path}")
+        if write_static_file(output_path, json.dumps(data, indent=2).encode('utf-8'), static_dir):
+            print(f"Saved JSON to {output_path}")
         return True
     except Exception as e:
         print(f"Error saving JSON to {output_path}: {e}")
         print(traceback.format_exc())
         return False
 
+def process_block(static_dir, block_number):
+    """Export the graph, stats and gantt chart of one block.
+
+    Returns the block's entry for the recent blocks index, or None if there is
+    no graph for the block.
+    """
+    print(f"Processing block {block_number}")
+    block_info = None
+    
+    # Get graph image
+    graph_data = get_image_from_gcs(block_number)
+    if graph_data:
+        # Save PNG image
+        graphs_dir = os.path.join(static_dir, 'graphs')
+        save_image_to_file(graph_data, graphs_dir, static_dir)
+        
+        # Save stats as JSON
+        block_info = {
+            'block_number': block_number,
+            'node_count': graph_data['node_count'],
+            'edge_count': graph_data['edge_count'],
+            'demo_mode': graph_data.get('demo_mode', False)
+        }
+        # Large images are also cut into tiles, so viewers can load just what is visible
+        pyramid = save_tile_pyramid(graph_data, static_dir)
+        if pyramid:
+            block_info['tiles'] = pyramid
+        stats_path = os.path.join(static_dir, 'data', f"{block_number}.json")
+        save_json_to_file(block_info, stats_path, static_dir)
+    else:
+        print(f"No graph data for block {block_number}")
+    
+    # Get gantt chart
+    gantt_data = get_gantt_from_gcs(block_number)
+    if gantt_data:
+        # Save PNG image
+        gantt_dir = os.path.join(static_dir, 'gantt')
+        save_image_to_file(gantt_data, gantt_dir, static_dir)
+    else:
+        print(f"No gantt data for block {block_number}")
+    
+    return block_info
+
 def process_recent_blocks(static_dir):
     """Process recent blocks and save them as static files."""
     # Get list of recent blocks
@@ -474,66 +694,401 @@ def process_recent_blocks(static_dir):
     # (to use for index)
     recent_blocks_light = []
     
-    # Process each block
-    for block_info in recent_blocks:
-        block_number = block_info['block_number']
-        print(f"Processing block {block_number}")
-        
-        # Get graph image
-        graph_data = get_image_from_gcs(block_number)
-        if graph_data:
-            # Save PNG image
-            graphs_dir = os.path.join(static_dir, 'graphs')
-            save_image_to_file(graph_data, graphs_dir)
-            
-            # Save stats as JSON
-            stats = {
-                'block_number': block_number,
-                'node_count': graph_data['node_count'],
-                'edge_count': graph_data['edge_count'],
-                'demo_mode': graph_data.get('demo_mode', False)
-            }
-            stats_path = os.path.join(static_dir, 'data', f"{block_number}.json")
-            save_json_to_file(stats, stats_path)
-            
-            # Add to light list (without image data)
-            recent_blocks_light.append({
-                'block_number': block_number,
-                'node_count': graph_data['node_count'],
-                'edge_count': graph_data['edge_count'],
-                'demo_mode': graph_data.get('demo_mode', False)
-            })
-        else:
-            print(f"No graph data for block {block_number}")
-        
-        # Get gantt chart
-        gantt_data = get_gantt_from_gcs(block_number)
-        if gantt_data:
-            # Save PNG image
-            gantt_dir = os.path.join(static_dir, 'gantt')
-            save_image_to_file(gantt_data, gantt_dir)
-        else:
-            print(f"No gantt data for block {block_number}")
+    try:
+        # Process each block
+        for block_info in recent_blocks:
+            block_entry = process_block(static_dir, block_info['block_number'])
+            if block_entry:
+                # Add to light list (without image data)
+                recent_blocks_light.append(block_entry)
+        
+        min_block = get_min_block_number()
+    except CircuitOpen as e:
+        # Keep serving the existing index rather than publishing a partial one
+        print(f"Storage is failing, keeping the existing index files: {e}")
+        return False
     
     # Save the recent blocks index file
     index_path = os.path.join(static_dir, 'data', 'recent_blocks.json')
-    save_json_to_file(recent_blocks_light, index_path)
+    save_json_to_file(recent_blocks_light, index_path, static_dir)
+    
+    cutoff = retention_cutoff(recent_blocks[0]['block_number'])
+    if cutoff is not None:
+        prune_block_files(static_dir, cutoff)
+        min_block = str(max(int(min_block), cutoff))
+    update_availability(static_dir, (block['block_number'] for block in recent_blocks_light), cutoff)
     
     # Save the minimum block number
-    min_block = get_min_block_number()
     min_block_data = {'min_block_number': min_block}
     min_block_path = os.path.join(static_dir, 'data', 'min_block.json')
-    save_json_to_file(min_block_data, min_block_path)
+    save_json_to_file(min_block_data, min_block_path, static_dir)
     
     print(f"Processed {len(recent_blocks)} recent blocks")
     return True
 
+def save_availability(static_dir, availability):
+    """Write the bitmap of exported blocks, so clients never request a missing block."""
+    path = os.path.join(static_dir, 'data', 'availability.json')
+    write_static_file(path, json.dumps(availability.to_json(), separators=(',', ':')).encode('utf-8'), static_dir)
+
+def load_availability(static_dir):
+    path = os.path.join(static_dir, 'data', 'availability.json')
+    if not os.path.exists(path):
+        return BlockAvailability()
+    with open(path, 'r') as f:
+        return BlockAvailability.from_json(json.load(f))
+
+def list_exported_blocks(static_dir):
+    """Return the block numbers that have a stats file in static/data."""
+    data_dir = os.path.join(static_dir, 'data')
+    if not os.path.isdir(data_dir):
+        return []
+    return [filename[:-len('.json')] for filename in os.listdir(data_dir)
+            if filename.endswith('.json') and filename[:-len('.json')].isdigit()]
+
+def update_availability(static_dir, blocks, cutoff=None):
+    """Add newly exported blocks to the availability bitmap.
+
+    Without --full-history only the newest blocks are exported, but the files
+    of older blocks stay published, so they are kept in the bitmap: the
+    previously published one (restored by publish.py --restore) is merged with
+    the stats files on disk. Blocks below the retention cutoff are dropped.
+    """
+    availability = load_availability(static_dir)
+    for block_number in list_exported_blocks(static_dir):
+        availability.add(block_number)
+    for block_number in blocks:
+        availability.add(block_number)
+    if cutoff is not None:
+        availability.discard_below(cutoff)
+    save_availability(static_dir, availability)
+
+def index_path(static_dir, name):
+    return os.path.join(static_dir, 'data', 'index', f"{name}.json")
+
+def load_index_file(static_dir, name, default):
+    path = index_path(static_dir, name)
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_index_shard(static_dir, shard, blocks):
+    """Write one index shard; shards are written compactly, they can hold many blocks."""
+    data = {
+        'shard': shard,
+        'first_block': shard * INDEX_SHARD_SIZE,
+        'blocks': {block: blocks[block] for block in sorted(blocks, key=int)}
+    }
+    write_static_file(index_path(static_dir, shard), json.dumps(data, separators=(',', ':')).encode('utf-8'), static_dir)
+
+def save_manifest(static_dir, manifest):
+    shards = manifest['shards'].values()
+    manifest['block_count'] = sum(info['count'] for info in shards)
+    manifest['min_block'] = min((info['first'] for info in shards), key=int) if shards else None
+    manifest['max_block'] = max((info['last'] for info in shards), key=int) if shards else None
+    save_json_to_file(manifest, index_path(static_dir, 'manifest'), static_dir)
+
+def prune_history(static_dir, manifest, availability, cutoff):
+    """Drop the blocks older than the cutoff from the index and delete their files."""
+    pruned = 0
+    for shard_id, info in list(manifest['shards'].items()):
+        if int(info['first']) >= cutoff:
+            continue
+        shard_blocks = load_index_file(static_dir, shard_id, {}).get('blocks', {})
+        old_blocks = [block for block in shard_blocks if int(block) < cutoff]
+        for block_number in old_blocks:
+            remove_block_files(static_dir, block_number)
+            del shard_blocks[block_number]
+        pruned += len(old_blocks)
+
+        if shard_blocks:
+            save_index_shard(static_dir, int(shard_id), shard_blocks)
+            ordered = sorted(shard_blocks, key=int)
+            manifest['shards'][shard_id] = {'first': ordered[0], 'last': ordered[-1], 'count': len(ordered)}
+        else:
+            remove_static_file(index_path(static_dir, shard_id), static_dir)
+            del manifest['shards'][shard_id]
+
+    if pruned:
+        save_manifest(static_dir, manifest)
+        availability.discard_below(cutoff)
+        print(f"Removed {pruned} blocks older than {cutoff}")
+    return pruned
+
+def export_history(static_dir, full_scan=False, max_blocks=None):
+    """Export every available block, incrementally, and maintain the sharded index.
+
+    Only objects from the newest indexed block on are listed, so a run costs
+    as much as the blocks added since the previous one. A full scan relists
+    everything and re-exports blocks whose graph PNG changed (by etag).
+    Shards are saved as soon as the export moves past them, so an interrupted
+    run resumes where it stopped. With ``max_blocks`` the run stops after
+    exporting that many blocks, and the next one continues from there, still
+    comparing etags if the stopped run was a full scan. With
+    STATIC_RETENTION_BLOCKS set, blocks that fall out of the window are
+    dropped from the index and their files deleted. Returns the number of
+    exported blocks.
+    """
+    manifest = load_index_file(static_dir, 'manifest', None)
+    if manifest is None or manifest.get('shard_size') != INDEX_SHARD_SIZE:
+        manifest = {'shard_size': INDEX_SHARD_SIZE, 'shards': {}, 'min_block': None, 'max_block': None, 'block_count': 0}
+        full_scan = True
+
+    if full_scan or manifest['max_block'] is None:
+        block_blobs = list_block_blobs()
+    else:
+        # A run that stopped at max_blocks is continued from the block it stopped
+        # at, which is below the newest indexed block if it was a full scan
+        start_block = manifest.get('resume_block') or manifest['max_block']
+        block_blobs = list_block_blobs(start_offset=f"eth-txs/{start_block.zfill(8)}")
+
+    exported = 0
+    truncated = False
+    shard, blocks = None, None
+    # A full scan visits every shard, so the bitmap is rebuilt from scratch,
+    # unless the run may stop before it got through all of them
+    availability = BlockAvailability() if full_scan and max_blocks is None else load_availability(static_dir)
+    cutoff = retention_cutoff(max(list(block_blobs) + [manifest['max_block'] or '0'], key=int))
+
+    def flush():
+        if shard is None or not blocks:
+            return
+        save_index_shard(static_dir, shard, blocks)
+        for block_number in blocks:
+            availability.add(block_number)
+        ordered = sorted(blocks, key=int)
+        manifest['shards'][str(shard)] = {'first': ordered[0], 'last': ordered[-1], 'count': len(ordered)}
+        save_manifest(static_dir, manifest)
+
+    try:
+        for block_number in sorted(block_blobs, key=int):
+            if cutoff is not None and int(block_number) < cutoff:
+                continue
+            info = block_blobs[block_number]
+            block_shard = int(block_number) // INDEX_SHARD_SIZE
+            if block_shard != shard:
+                flush()
+                shard = block_shard
+                blocks = load_index_file(static_dir, shard, {}).get('blocks', {})
+
+            if blocks.get(block_number, {}).get('etag') == info['etag']:
+                continue
+            if max_blocks is not None and exported >= max_blocks:
+                truncated = block_number
+                break
+            block_entry = process_block(static_dir, block_number)
+            if block_entry:
+                blocks[block_number] = {
+                    'node_count': block_entry['node_count'],
+                    'edge_count': block_entry['edge_count'],
+                    'etag': info['etag']
+                }
+                exported += 1
+
+        if cutoff is not None:
+            flush()
+            shard = None
+            prune_history(static_dir, manifest, availability, cutoff)
+    finally:
+        # Keep what was exported even if storage fails part way
+        flush()
+        save_availability(static_dir, availability)
+
+    if truncated or manifest.get('resume_block'):
+        if truncated:
+            manifest['resume_block'] = truncated
+        else:
+            del manifest['resume_block']
+        save_manifest(static_dir, manifest)
+
+    if truncated:
+        # Keep the published recent blocks until the export has caught up with them
+        print(f"Stopped after {exported} blocks at block {truncated}, the next run continues from there")
+    elif manifest['max_block'] is not None:
+        # The recent blocks index and minimum block now come from the index
+        recent = []
+        for shard_id in sorted(manifest['shards'], key=int, reverse=True):
+            shard_blocks = load_index_file(static_dir, shard_id, {}).get('blocks', {})
+            for block_number in sorted(shard_blocks, key=int, reverse=True):
+                recent.append({
+                    'block_number': block_number,
+                    'node_count': shard_blocks[block_number]['node_count'],
+                    'edge_count': shard_blocks[block_number]['edge_count'],
+                    'demo_mode': DEMO_MODE
+                })
+            if len(recent) >= 9:
+                break
+        save_json_to_file(recent[:9], os.path.join(static_dir, 'data', 'recent_blocks.json'), static_dir)
+        save_json_to_file({'min_block_number': manifest['min_block']},
+                          os.path.join(static_dir, 'data', 'min_block.json'), static_dir)
+
+    print(f"Exported {exported} blocks, {manifest['block_count']} blocks indexed in {len(manifest['shards'])} shards")
+    return exported
+
+def write_changeset(changeset_path):
+    """Merge the pending changes into the changeset manifest used by the publish step.
+
+    The manifest accumulates changes until the publish step consumes it, so
+    nothing is lost if a publish fails or is skipped.
+    """
+    if not any(changeset.values()):
+        return False
+
+    manifest = {'added': [], 'changed': [], 'deleted': []}
+    if os.path.exists(changeset_path):
+        with open(changeset_path, 'r') as f:
+            manifest = json.load(f)
+
+    added = (set(manifest['added']) | changeset['added']) - changeset['deleted']
+    deleted = (set(manifest['deleted']) | changeset['deleted']) - changeset['added'] - changeset['changed']
+    changed = (set(manifest['changed']) | changeset['changed']) - added - deleted
+    manifest = {
+        'added': sorted(added),
+        'changed': sorted(changed),
+        'deleted': sorted(deleted),
+        'updated_at': time.time()
+    }
+
+    temp_path = f"{changeset_path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, changeset_path)
+
+    print(f"Changeset: {len(changeset['added'])} added, {len(changeset['changed'])} changed, "
+          f"{len(changeset['deleted'])} deleted")
+    for changes in changeset.values():
+        changes.clear()
+    return True
+
+def publish(publish_cmd):
+    """Run the publish command, returning True if it succeeded."""
+    print(f"Publishing static site: {publish_cmd}")
+    result = subprocess.run(publish_cmd, shell=True)
+    if result.returncode != 0:
+        print(f"Publish command failed with exit code {result.returncode}")
+        return False
+    return True
+
+def tail_blocks(static_dir, state, full_scan=False):
+    """Export blocks that appeared or changed since the previous tick.
+
+    Incremental ticks only list objects from the newest known block on; a full
+    scan relists everything to pick up re-generated blocks and the minimum
+    block number. Returns the number of exported blocks.
+    """
+    if full_scan or state['latest'] is None:
+        block_blobs = list_block_blobs()
+    else:
+        block_blobs = list_block_blobs(start_offset=f"eth-txs/{state['latest'].zfill(8)}")
+
+    updated = {block for block, info in block_blobs.items() if state['etags'].get(block) != info['etag']}
+
+    # Only the newest blocks are exported, like in a one-shot run
+    candidates = set(state['recent']) | set(block_blobs)
+    recent = sorted(candidates, key=int, reverse=True)[:9]
+
+    for block, info in block_blobs.items():
+        if block not in recent:
+            state['etags'][block] = info['etag']
+
+    processed = 0
+    for block_number in recent:
+        if block_number in updated or block_number not in state['entries']:
+            block_entry = process_block(static_dir, block_number)
+            if block_entry:
+                state['entries'][block_number] = block_entry
+            # Recorded only after the export, so a tick cut short by a storage outage is retried
+            if block_number in block_blobs:
+                state['etags'][block_number] = block_blobs[block_number]['etag']
+            processed += 1
+
+    state['recent'] = [block for block in recent if block in state['entries']]
+    state['entries'] = {block: state['entries'][block] for block in state['recent']}
+    if block_blobs:
+        state['latest'] = max([state['latest'] or '0'] + list(block_blobs), key=int)
+
+    cutoff = retention_cutoff(state['latest'])
+    if processed:
+        index_path = os.path.join(static_dir, 'data', 'recent_blocks.json')
+        save_json_to_file([state['entries'][block] for block in state['recent']], index_path, static_dir)
+        if cutoff is not None:
+            prune_block_files(static_dir, cutoff)
+        update_availability(static_dir, state['recent'], cutoff)
+
+    if full_scan and block_blobs:
+        min_block = min(block_blobs, key=int)
+        if cutoff is not None:
+            min_block = str(max(int(min_block), cutoff))
+        min_block_path = os.path.join(static_dir, 'data', 'min_block.json')
+        save_json_to_file({'min_block_number': min_block}, min_block_path, static_dir)
+
+    return processed
+
+def run_daemon(static_dir, changeset_path, interval, publish_cmd=None, full_scan_every=60, full_history=False,
+               max_blocks=None):
+    """Keep the static files up to date by tailing new blocks on a short interval.
+
+    The storage client and the known blocks stay in memory between ticks, and
+    the publish command only runs when a tick actually changed files.
+    """
+    state = {
+        'latest': None,  # Newest block seen in storage
+        'etags': {},     # Block number -> etag of its graph PNG
+        'recent': [],    # Exported recent blocks, newest first
+        'entries': {}    # Block number -> recent blocks index entry
+    }
+    tick = 0
+    print(f"Running in daemon mode, checking for new blocks every {interval}s")
+
+    while True:
+        start_time = time.time()
+        try:
+            full_scan = tick % full_scan_every == 0
+            if full_history:
+                processed = export_history(static_dir, full_scan, max_blocks)
+            else:
+                processed = tail_blocks(static_dir, state, full_scan)
+            if processed:
+                print(f"Exported {processed} blocks in {time.time() - start_time:.1f}s")
+
+            if write_changeset(changeset_path) and publish_cmd:
+                publish(publish_cmd)
+        except CircuitOpen as e:
+            print(f"Storage is failing, keeping the current static files: {e}")
+        except Exception as e:
+            print(f"Error during daemon tick: {e}")
+            print(traceback.format_exc())
+
+        tick += 1
+        time.sleep(max(0.0, interval - (time.time() - start_time)))
+
 def main():
     # Determine the location of the static directory
     # This should be in the root of the repo
     repo_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     static_dir = os.path.join(repo_dir, 'static')
     
+    parser = argparse.ArgumentParser(description='Generate the static dependency.pics site data.')
+    parser.add_argument('--daemon', action='store_true', help='Keep running and export new blocks incrementally')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between checks in daemon mode (default: 30)')
+    parser.add_argument('--full-scan-every', type=int, default=60, help='Relist all blocks every N daemon ticks (default: 60)')
+    parser.add_argument('--publish-cmd', default=os.environ.get('STATIC_PUBLISH_CMD'),
+                        help='Command that publishes the site, run only when files changed')
+    parser.add_argument('--changeset', default=os.environ.get('STATIC_CHANGESET_PATH', os.path.join(repo_dir, '.static-changeset.json')),
+                        help='Path of the changeset manifest for the publish step')
+    parser.add_argument('--full-history', action='store_true',
+                        default=os.environ.get('STATIC_FULL_HISTORY', 'false').lower() == 'true',
+                        help='Export every available block with a sharded index, not just the recent ones')
+    parser.add_argument('--full-scan', action='store_true',
+                        help='With --full-history, relist all blocks and re-export changed ones')
+    parser.add_argument('--max-blocks', type=int, default=int(os.environ.get('STATIC_MAX_BLOCKS', 0)),
+                        help='With --full-history, export at most N blocks before publishing and continuing (default: 0, no limit)')
+    parser.add_argument('--always-publish', action='store_true',
+                        help='Run --publish-cmd at the end even if no block files changed, e.g. after a frontend build')
+    args = parser.parse_args()
+    max_blocks = args.max_blocks or None
+    
     print(f"Static directory: {static_dir}")
     
     # Create the static directory structure if it doesn't exist
@@ -541,8 +1096,31 @@ def main():
     os.makedirs(os.path.join(static_dir, 'gantt'), exist_ok=True)
     os.makedirs(os.path.join(static_dir, 'data'), exist_ok=True)
     
-    # Process recent blocks
-    process_recent_blocks(static_dir)
+    if args.daemon:
+        try:
+            run_daemon(static_dir, args.changeset, args.interval, args.publish_cmd, args.full_scan_every,
+                       args.full_history, max_blocks)
+        except KeyboardInterrupt:
+            print("Daemon stopped")
+        return
+    
+    if args.full_history:
+        try:
+            full_scan = args.full_scan
+            # Publish every chunk before the next one, so a failed or cancelled run keeps what it exported;
+            # the chunks after the first continue a full scan from where the previous one stopped
+            while export_history(static_dir, full_scan, max_blocks) == max_blocks and args.publish_cmd:
+                full_scan = False
+                if write_changeset(args.changeset) and not publish(args.publish_cmd):
+                    break
+        except CircuitOpen as e:
+            print(f"Storage is failing, keeping the existing index files: {e}")
+    else:
+        # Process recent blocks
+        process_recent_blocks(static_dir)
+    
+    if (write_changeset(args.changeset) or args.always_publish) and args.publish_cmd:
+        publish(args.publish_cmd)
     
     print("Static file generation complete")
 
@@ -0,0 +1,115 @@
+import os
+import logging
+import threading
+
+from resilience import CircuitBreaker
+
+# One storage client per process, shared by all threads
+#
+# The client is created on first use under a lock, with an HTTP connection
+# pool sized for the number of concurrent storage calls the process makes, so
+# connections are reused across requests instead of being opened and dropped.
+# Forked children (gunicorn workers) never share the parent's client or its
+# sockets: the client is dropped in the child and recreated on first use.
+#
+# Set LOCAL_STORAGE_DIR to serve the bucket tree from a local directory
+# instead of Google Cloud Storage (see local_storage.py).
+#
+# The batch tools (backfill, renderer) send their storage calls through call(),
+# so a failing store stops them quickly instead of timing out block by block.
+
+logger = logging.getLogger('dependency-storage')
+
+STORAGE_POOL_SIZE = int(os.environ.get('STORAGE_POOL_SIZE', 0))  # 0 sizes the pool from configure()
+LOCAL_STORAGE_DIR = os.environ.get('LOCAL_STORAGE_DIR')
+
+_client = None
+_client_pid = None
+_pool_size = 10  # The requests library default
+_lock = threading.Lock()
+
+# Circuit breaker of the batch tools, configured like the API server's
+STORAGE_CIRCUIT_FAILURES = int(os.environ.get('STORAGE_CIRCUIT_FAILURES', 5))
+STORAGE_CIRCUIT_RESET = float(os.environ.get('STORAGE_CIRCUIT_RESET', 30))
+breaker = CircuitBreaker(STORAGE_CIRCUIT_FAILURES, STORAGE_CIRCUIT_RESET)
+
+def configure(pool_size):
+    """Set the connection pool size used for clients created from now on.
+
+    STORAGE_POOL_SIZE, when set, takes precedence.
+    """
+    global _pool_size
+    _pool_size = STORAGE_POOL_SIZE or max(1, pool_size)
+
+def uses_local_storage():
+    return bool(LOCAL_STORAGE_DIR)
+
+def use_local_storage(path):
+    """Serve the bucket tree from ``path`` from now on, also in forked workers."""
+    global LOCAL_STORAGE_DIR, _client, _client_pid
+    with _lock:
+        LOCAL_STORAGE_DIR = path
+        _client = None
+        _client_pid = None
+
+def create_client(pool_size):
+    """Create a storage client whose HTTP session keeps up to ``pool_size`` connections open."""
+    if LOCAL_STORAGE_DIR:
+        from local_storage import LocalClient
+        logger.info(f"Using local object store at {LOCAL_STORAGE_DIR}")
+        return LocalClient(LOCAL_STORAGE_DIR)
+
+    import google.auth
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+
+    credentials, project = google.auth.default(scopes=storage.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    # Keep one pooled connection per concurrent call instead of discarding the overflow
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    logger.info(f"Initializing Google Cloud Storage client (connection pool size {pool_size})")
+    return storage.Client(project=project, credentials=credentials, _http=session)
+
+def get_client():
+    """Get the storage client of the current process, creating it on first use."""
+    global _client, _client_pid
+    client = _client
+    if client is not None and _client_pid == os.getpid():
+        return client
+
+    with _lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = create_client(_pool_size)
+            _client_pid = os.getpid()
+        return _client
+
+def call(fn, *args):
+    """Run one storage call through the circuit breaker; raises CircuitOpen while it is open."""
+    return breaker.call(fn, *args)
+
+def upload(bucket, path, data, content_type):
+    """Upload one object through the circuit breaker."""
+    blob = bucket.blob(path)
+    return call(lambda: blob.upload_from_string(data, content_type=content_type))
+
+def set_client(client):
+    """Use an existing client (for example a LocalClient) in this process."""
+    global _client, _client_pid
+    with _lock:
+        _client = client
+        _client_pid = os.getpid()
+
+def _reset_after_fork():
+    # The lock may have been held by another thread of the parent at fork time
+    global _client, _client_pid, _lock, breaker
+    _lock = threading.Lock()
+    breaker = CircuitBreaker(STORAGE_CIRCUIT_FAILURES, STORAGE_CIRCUIT_RESET)
+    _client = None
+    _client_pid = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import pickle
+import shutil
+import logging
+import argparse
+
+from graph_builder import build_dependency_graph
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger('dependency-synthetic-corpus')
+
+# Synthetic object-store tree for demo mode and load tests
+#
+# Writes the bucket layout app.py reads, in the LocalClient format
+# (<output>/ethereum-graphs/...):
+#   images/<block>.png             graph image
+#   chart_data_images/<block>.png  gantt image
+#   graphs/<block>.pkl             pickled networkx dependency graph
+#
+# Graphs are real: each one is built by graph_builder from synthetic access
+# lists in which a few hot contracts get most of the accesses, like on
+# mainnet. PNGs are valid images whose sizes follow a log-normal distribution
+# around --png-kb / --gantt-kb.
+#
+# Millions of blocks fit on a laptop because the blocks are hard links into
+# a pool of --pool-size distinct graphs and images (under <output>/_pool), so
+# the tree has one directory entry per block but only pool-size files of data.
+# A --pool-size of 0 writes every block's files separately. Existing files
+# are kept, so an interrupted run can simply be restarted.
+#
+# Serve the corpus with DEMO_CORPUS_DIR=<output> (demo mode) or
+# LOCAL_STORAGE_DIR=<output>.
+
+BUCKET_NAME = "ethereum-graphs"
+
+# Canvas of the synthetic PNGs, about the size of the rendered graphs
+PNG_WIDTH = 1600
+PNG_HEIGHT = 1200
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+def make_png(target_bytes, rng, width=PNG_WIDTH, height=PNG_HEIGHT):
+    """Build a valid RGB PNG of roughly ``target_bytes``.
+
+    Rows of noise do not compress and white rows almost vanish, so the share
+    of noise rows sets the file size.
+    """
+    row_bytes = width * 3
+    noise_rows = max(1, min(height, target_bytes // row_bytes))
+    white = b'\x00' + b'\xff' * row_bytes
+    rows = [b'\x00' + rng.randbytes(row_bytes) for _ in range(noise_rows)]
+    rows.extend(white for _ in range(height - noise_rows))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header)
+            + png_chunk(b'IDAT', zlib.compress(b''.join(rows), 6)) + png_chunk(b'IEND', b''))
+
+def make_transactions(rng, tx_min, tx_max, contracts=2000):
+    """Synthetic access lists: a few hot contracts (tokens, DEX pools) take most accesses."""
+    transactions = []
+    for index in range(rng.randint(tx_min, tx_max)):
+        def key():
+            # Pareto-distributed contract ids, a small set of slots per contract
+            contract = min(contracts - 1, int(rng.paretovariate(1.2)) - 1)
+            return f"0x{contract:040x}:0x{rng.randint(0, 31):02x}"
+        transactions.append({
+            'index': index,
+            'hash': f"0x{rng.getrandbits(256):064x}",
+            'reads': [key() for _ in range(rng.randint(1, 8))],
+            'writes': [key() for _ in range(rng.randint(0, 4))]
+        })
+    return transactions
+
+def make_graph(rng, block_number, tx_min, tx_max):
+    graph = build_dependency_graph(make_transactions(rng, tx_min, tx_max), block_number)
+    return pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL)
+
+def lognormal_size(rng, mean_kb):
+    return int(rng.lognormvariate(0, 0.5) * mean_kb * 1024 / 1.133)  # 1.133 = mean of lognormal(0, 0.5)
+
+def write_file(path, data):
+    if os.path.exists(path):
+        return False
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return True
+
+def link_file(source, path):
+    """Hard link a pool file into place, copying where hard links are not supported."""
+    try:
+        os.link(source, path)
+    except FileExistsError:
+        return False
+    except OSError:
+        shutil.copyfile(source, path)
+    return True
+
+def build_pool(pool_dir, size, seed, png_kb, gantt_kb, tx_min, tx_max):
+    """Write ``size`` distinct graph/image/gantt triples to the pool directory."""
+    for folder in ('graphs', 'images', 'gantt'):
+        os.makedirs(os.path.join(pool_dir, folder), exist_ok=True)
+    for i in range(size):
+        rng = random.Random(f"{seed}:pool:{i}")
+        write_file(os.path.join(pool_dir, 'graphs', f"{i}.pkl"), make_graph(rng, None, tx_min, tx_max))
+        write_file(os.path.join(pool_dir, 'images', f"{i}.png"), make_png(lognormal_size(rng, png_kb), rng))
+        write_file(os.path.join(pool_dir, 'gantt', f"{i}.png"), make_png(lognormal_size(rng, gantt_kb), rng))
+    logger.info(f"Pool of {size} graphs and images ready in {pool_dir}")
+
+def generate_corpus(output, start, count, seed=1, pool_size=1000, missing_rate=0.0,
+                    png_kb=150, gantt_kb=60, tx_min=50, tx_max=400):
+    """Write a corpus of ``count`` block numbers from ``start`` on. Returns the number of blocks written."""
+    start_time = time.time()
+    bucket_dir = os.path.join(output, BUCKET_NAME)
+    folders = {'images': 'images', 'chart_data_images': 'gantt', 'graphs': 'graphs'}
+    for folder in folders:
+        os.makedirs(os.path.join(bucket_dir, folder), exist_ok=True)
+
+    pool_dir = os.path.join(output, '_pool')
+    if pool_size:
+        build_pool(pool_dir, pool_size, seed, png_kb, gantt_kb, tx_min, tx_max)
+
+    rng = random.Random(f"{seed}:blocks")
+    written = 0
+    for block_number in range(start, start + count):
+        # Drawn for every block, so the gaps do not depend on the pool size
+        if rng.random() < missing_rate:
+            continue
+
+        paths = {folder: os.path.join(bucket_dir, folder, f"{block_number}.{'pkl' if folder == 'graphs' else 'png'}")
+                 for folder in folders}
+        if pool_size:
+            entry = (block_number * 2654435761) % pool_size  # Spread neighbouring blocks over the pool
+            for folder, pool_folder in folders.items():
+                extension = 'pkl' if folder == 'graphs' else 'png'
+                link_file(os.path.join(pool_dir, pool_folder, f"{entry}.{extension}"), paths[folder])
+        else:
+            block_rng = random.Random(f"{seed}:block:{block_number}")
+            write_file(paths['graphs'], make_graph(block_rng, block_number, tx_min, tx_max))
+            write_file(paths['images'], make_png(lognormal_size(block_rng, png_kb), block_rng))
+            write_file(paths['chart_data_images'], make_png(lognormal_size(block_rng, gantt_kb), block_rng))
+
+        written += 1
+        if written % 100000 == 0:
+            rate = written / (time.time() - start_time)
+            logger.info(f"Progress: {written} blocks ({rate:.0f} blocks/s), at block {block_number}")
+
+    with open(os.path.join(output, 'corpus.json'), 'w') as f:
+        json.dump({
+            'bucket': BUCKET_NAME,
+            'start': start,
+            'count': count,
+            'blocks': written,
+            'seed': seed,
+            'pool_size': pool_size,
+            'missing_rate': missing_rate,
+            'created_at': time.time()
+        }, f, indent=2)
+
+    logger.info(f"Corpus of {written} blocks written to {output} in {time.time() - start_time:.1f}s")
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic local object-store corpus for demo mode and load tests.')
+    parser.add_argument('--output', required=True, help='Directory to write the corpus to')
+    parser.add_argument('--blocks', type=int, default=10000, help='Number of block numbers (default: 10000)')
+    parser.add_argument('--start', type=int, default=22000000, help='First block number (default: 22000000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed gives the same corpus')
+    parser.add_argument('--pool-size', type=int, default=1000,
+                        help='Distinct graphs/images the blocks link to; 0 writes every block separately (default: 1000)')
+    parser.add_argument('--missing-rate', type=float, default=0.001, help='Fraction of block numbers left out (default: 0.001)')
+    parser.add_argument('--png-kb', type=int, default=150, help='Mean graph image size in KB (default: 150)')
+    parser.add_argument('--gantt-kb', type=int, default=60, help='Mean gantt image size in KB (default: 60)')
+    parser.add_argument('--tx-min', type=int, default=50, help='Minimum transactions per block (default: 50)')
+    parser.add_argument('--tx-max', type=int, default=400, help='Maximum transactions per block (default: 400)')
+    args = parser.parse_args()
+
+    generate_corpus(args.output, args.start, args.blocks, args.seed, args.pool_size, args.missing_rate,
+                    args.png_kb, args.gantt_kb, args.tx_min, args.tx_max)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
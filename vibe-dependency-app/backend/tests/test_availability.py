@@ -0,0 +1,80 @@
+import pytest
+
+from availability import BlockAvailability
+
+def runs(availability):
+    return availability.to_json()['runs']
+
+def test_from_blocks_builds_runs_of_consecutive_blocks():
+    availability = BlockAvailability.from_blocks(['105', 101, 102, 103, '110', 103])
+
+    assert len(availability) == 5
+    assert availability.to_json() == {'version': 1, 'count': 5, 'runs': [101, 3, 2, 1, 5, 1]}
+
+def test_json_round_trip():
+    availability = BlockAvailability.from_blocks([5, 6, 7, 20, 22, 23, 1000000])
+    restored = BlockAvailability.from_json(availability.to_json())
+
+    assert restored.to_json() == availability.to_json()
+    assert [block for block in range(1000001) if block in restored] == [5, 6, 7, 20, 22, 23, 1000000]
+
+def test_from_json_rejects_other_versions():
+    with pytest.raises(ValueError):
+        BlockAvailability.from_json({'version': 2, 'count': 0, 'runs': []})
+
+def test_add_merges_neighbouring_runs():
+    availability = BlockAvailability.from_blocks([10, 11, 13, 14])
+
+    assert availability.add(12)
+    assert runs(availability) == [10, 5]
+    assert availability.add('9')
+    assert availability.add(15)
+    assert runs(availability) == [9, 7]
+    assert availability.add(20)
+    assert runs(availability) == [9, 7, 5, 1]
+    assert len(availability) == 8
+
+def test_add_reports_present_blocks():
+    availability = BlockAvailability.from_blocks([10, 11])
+
+    assert not availability.add(11)
+    assert len(availability) == 2
+
+def test_contains_at_run_edges():
+    availability = BlockAvailability.from_blocks([10, 11, 12, 20])
+
+    assert 10 in availability and '12' in availability and 20 in availability
+    assert 9 not in availability and 13 not in availability and 21 not in availability
+    assert 0 not in BlockAvailability()
+
+def test_discard_below_cuts_into_a_run():
+    availability = BlockAvailability.from_blocks([1, 2, 5, 6, 7, 8, 12])
+
+    assert availability.discard_below(7) == 4
+    assert runs(availability) == [7, 2, 4, 1]
+    assert len(availability) == 3
+    assert availability.min() == 7
+
+def test_discard_below_everything():
+    availability = BlockAvailability.from_blocks([1, 2, 3])
+
+    assert availability.discard_below(100) == 3
+    assert len(availability) == 0
+    assert availability.min() is None and availability.max() is None
+
+def test_nearest_prefers_the_lower_block_on_ties():
+    availability = BlockAvailability.from_blocks([10, 11, 20])
+
+    assert availability.nearest(11) == 11
+    assert availability.nearest(15) == 11
+    assert availability.nearest(16) == 20
+    assert availability.nearest(0) == 10
+    assert availability.nearest(99) == 20
+    assert BlockAvailability().nearest(5) is None
+
+def test_newest_spans_runs():
+    availability = BlockAvailability.from_blocks([1, 2, 3, 7, 8])
+
+    assert availability.newest(4) == [8, 7, 3, 2]
+    assert availability.newest(10) == [8, 7, 3, 2, 1]
+    assert availability.newest(1) == [8]
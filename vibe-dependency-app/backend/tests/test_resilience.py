@@ -0,0 +1,192 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from admission import AdmissionGate, StorageOverloaded
+from resilience import CircuitBreaker, CircuitOpen, HedgedReader
+
+class SlowStore:
+    """Fake object store that injects latency (and optionally an error) into every read.
+
+    ``latency`` is either a number of seconds or a function of the 1-based
+    call number, so individual calls can be made slow. While ``hold`` is set,
+    reads block until it is released, for tests that need a call in flight.
+    """
+
+    def __init__(self, latency=0.0, error=None):
+        self.latency = latency
+        self.error = error
+        self.hold = None
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.started = threading.Event()
+        self._lock = threading.Lock()
+
+    def read(self, name='blob'):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.started.set()
+        try:
+            if self.hold is not None:
+                self.hold.wait(5)
+            time.sleep(self.latency(call) if callable(self.latency) else self.latency)
+            if self.error is not None:
+                raise self.error
+            return f"{name}:{call}".encode()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+def gated_read(gate, store, wait=True):
+    with gate.slot(wait):
+        return store.read()
+
+def hold_slot(gate, store):
+    """Start a read that keeps the gate's only slot busy until ``store.hold`` is set."""
+    store.hold = threading.Event()
+    thread = threading.Thread(target=gated_read, args=(gate, store))
+    thread.start()
+    assert store.started.wait(5)
+    return thread
+
+def test_gate_caps_concurrent_reads():
+    gate = AdmissionGate(max_concurrency=2, max_queue=10, wait_timeout=5, retry_after=1)
+    store = SlowStore(latency=0.05)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda _: gated_read(gate, store), range(6)))
+
+    assert len(results) == 6
+    assert store.max_active == 2
+    stats = gate.stats()
+    assert stats['admitted'] == 6
+    assert stats['active'] == 0 and stats['waiting'] == 0
+
+def test_gate_rejects_callers_beyond_the_queue():
+    gate = AdmissionGate(max_concurrency=1, max_queue=1, wait_timeout=5, retry_after=7)
+    store = SlowStore()
+    holder = hold_slot(gate, store)
+
+    queued = threading.Thread(target=gated_read, args=(gate, store))
+    queued.start()
+    deadline = time.monotonic() + 5
+    while gate.stats()['waiting'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    start_time = time.monotonic()
+    with pytest.raises(StorageOverloaded) as excinfo:
+        gated_read(gate, store)
+    # Rejected right away, not after waiting for the slow store
+    assert time.monotonic() - start_time < 0.5
+    assert excinfo.value.retry_after == 7
+
+    store.hold.set()
+    holder.join(5)
+    queued.join(5)
+    assert store.calls == 2
+    assert gate.stats()['rejected'] == 1
+
+def test_queued_caller_times_out_behind_a_slow_read():
+    gate = AdmissionGate(max_concurrency=1, max_queue=4, wait_timeout=0.05, retry_after=1)
+    store = SlowStore()
+    holder = hold_slot(gate, store)
+
+    with pytest.raises(StorageOverloaded):
+        gated_read(gate, store)
+
+    store.hold.set()
+    holder.join(5)
+    stats = gate.stats()
+    assert stats['timed_out'] == 1
+    assert stats['waiting'] == 0
+    # The slot is free again once the slow read finished
+    assert gated_read(gate, store) == b"blob:2"
+
+def test_background_reads_do_not_queue():
+    gate = AdmissionGate(max_concurrency=1, max_queue=4, wait_timeout=5, retry_after=1)
+    store = SlowStore()
+    holder = hold_slot(gate, store)
+
+    with pytest.raises(StorageOverloaded):
+        gated_read(gate, store, wait=False)
+    assert gate.stats()['queued'] == 0
+
+    store.hold.set()
+    holder.join(5)
+
+def test_breaker_opens_on_timeouts_and_recovers():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.1)
+    store = SlowStore(latency=0.01, error=TimeoutError("read timed out"))
+
+    for _ in range(3):
+        with pytest.raises(TimeoutError):
+            breaker.call(store.read)
+    assert breaker.is_open()
+
+    # While open, the slow store is not called at all
+    with pytest.raises(CircuitOpen) as excinfo:
+        breaker.call(store.read)
+    assert store.calls == 3
+    assert excinfo.value.retry_after >= 1
+
+    time.sleep(0.15)
+    store.error = None
+    assert breaker.call(store.read) == b"blob:4"
+    assert not breaker.is_open()
+    assert breaker.stats()['state'] == 'closed'
+
+def test_breaker_reopens_when_the_trial_call_fails():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    store = SlowStore(error=ConnectionError("connection reset"))
+
+    with pytest.raises(ConnectionError):
+        breaker.call(store.read)
+    time.sleep(0.08)
+    with pytest.raises(ConnectionError):
+        breaker.call(store.read)
+    with pytest.raises(CircuitOpen):
+        breaker.call(store.read)
+    assert breaker.stats()['opened'] == 2
+
+def test_missing_objects_do_not_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    store = SlowStore(error=FileNotFoundError("no such blob"))
+
+    for _ in range(3):
+        with pytest.raises(FileNotFoundError):
+            breaker.call(store.read)
+    assert not breaker.is_open()
+    assert breaker.stats()['failures'] == 0
+
+def test_hedged_read_beats_a_slow_primary():
+    store = SlowStore(latency=lambda call: 1.0 if call == 21 else 0.001)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        reader = HedgedReader(executor, percentile=95, min_delay=0.02, min_samples=20, max_hedge_ratio=0.5)
+        for _ in range(20):
+            reader.call('download', store.read)
+
+        start_time = time.monotonic()
+        result = reader.call('download', store.read)
+        elapsed = time.monotonic() - start_time
+
+        assert result == b"blob:22"
+        assert elapsed < 0.5
+        stats = reader.stats()
+        assert stats['hedged'] == 1
+        assert stats['hedge_wins'] == 1
+
+def test_hedging_waits_for_enough_samples():
+    store = SlowStore(latency=0.05)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        reader = HedgedReader(executor, min_samples=20)
+        for _ in range(3):
+            reader.call('exists', store.read)
+
+    assert store.calls == 3
+    assert reader.stats()['hedged'] == 0
@@ -0,0 +1,115 @@
+import os
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from graph_arrays import encode_edge_list, graph_to_arrays
+from segments import (INDEX_DTYPE, SegmentReader, SegmentWriter, iter_graph_arrays, iter_range,
+                      list_segments, segment_paths)
+
+def payload(block_number):
+    return f"graph of block {block_number}".encode() * (block_number % 3 + 1)
+
+def write_segment(directory, start, blocks, segment_blocks=100):
+    with SegmentWriter(directory, start, segment_blocks) as writer:
+        for block_number in blocks:
+            writer.append(block_number, payload(block_number))
+
+def test_round_trip(tmp_path):
+    write_segment(tmp_path, 100, [105, 101, 150])
+    data_path, _ = segment_paths(tmp_path, 100)
+
+    with SegmentReader(data_path) as reader:
+        assert len(reader) == 3
+        assert bytes(reader.get(105)) == payload(105)
+        assert reader.get(102) is None
+        assert [block for block, _ in reader.iter_range()] == [101, 105, 150]
+        assert reader.verify() == []
+
+def test_last_record_of_a_block_wins(tmp_path):
+    with SegmentWriter(tmp_path, 0, 100) as writer:
+        writer.append(7, b"first")
+        writer.append(8, b"other")
+        writer.append(7, b"second")
+    data_path, _ = segment_paths(tmp_path, 0)
+
+    with SegmentReader(data_path) as reader:
+        assert len(reader) == 2
+        assert bytes(reader.get(7)) == b"second"
+
+def test_append_outside_the_segment_is_refused(tmp_path):
+    with SegmentWriter(tmp_path, 100, 100) as writer:
+        with pytest.raises(ValueError):
+            writer.append(200, b"x")
+
+def test_segment_size_must_match(tmp_path):
+    write_segment(tmp_path, 0, [1], segment_blocks=100)
+    with pytest.raises(ValueError):
+        SegmentWriter(tmp_path, 0, 1000)
+
+def test_writer_resumes_with_the_packed_blocks(tmp_path):
+    write_segment(tmp_path, 0, [1, 2])
+    with SegmentWriter(tmp_path, 0, 100) as writer:
+        assert writer.blocks == {1, 2}
+        writer.append(3, payload(3))
+    data_path, _ = segment_paths(tmp_path, 0)
+
+    with SegmentReader(data_path) as reader:
+        assert [block for block, _ in reader.iter_range()] == [1, 2, 3]
+
+def test_unindexed_records_are_reindexed(tmp_path):
+    write_segment(tmp_path, 0, [1, 2, 3])
+    data_path, index_path = segment_paths(tmp_path, 0)
+    # A writer that crashed after the records but before their index entries
+    os.truncate(index_path, INDEX_DTYPE.itemsize)
+
+    with SegmentWriter(tmp_path, 0, 100) as writer:
+        assert writer.blocks == {1, 2, 3}
+    assert os.path.getsize(index_path) == 3 * INDEX_DTYPE.itemsize
+    with SegmentReader(data_path) as reader:
+        assert bytes(reader.get(3)) == payload(3)
+
+def test_incomplete_last_record_is_cut_off(tmp_path):
+    write_segment(tmp_path, 0, [1, 2])
+    data_path, index_path = segment_paths(tmp_path, 0)
+    complete_size = os.path.getsize(data_path)
+    # Half of a third record, without its index entry
+    with open(data_path, 'ab') as f:
+        f.write(np.array([3], dtype='<u8').tobytes() + b"\x40\x00\x00\x00" + b"\x00" * 8)
+
+    with SegmentWriter(tmp_path, 0, 100) as writer:
+        assert writer.blocks == {1, 2}
+    assert os.path.getsize(data_path) == complete_size
+    assert os.path.getsize(index_path) == 2 * INDEX_DTYPE.itemsize
+
+def test_verify_reports_corrupted_payloads(tmp_path):
+    write_segment(tmp_path, 0, [1, 2])
+    data_path, index_path = segment_paths(tmp_path, 0)
+    entries = np.fromfile(index_path, dtype=INDEX_DTYPE)
+    with open(data_path, 'r+b') as f:
+        f.seek(int(entries['offset'][1]))
+        f.write(b"X")
+
+    with SegmentReader(data_path) as reader:
+        assert reader.verify() == [2]
+
+def test_iter_range_spans_segments(tmp_path):
+    write_segment(tmp_path, 0, [10, 99])
+    write_segment(tmp_path, 100, [100, 150])
+    write_segment(tmp_path, 300, [301])
+
+    assert [start for start, _, _ in list_segments(tmp_path)] == [0, 100, 300]
+    assert [block for block, _ in iter_range(tmp_path)] == [10, 99, 100, 150, 301]
+    assert [block for block, _ in iter_range(tmp_path, start=99, end=301)] == [99, 100, 150]
+    assert list(iter_range(tmp_path / 'missing')) == []
+
+def test_graphs_decode_from_the_archive(tmp_path):
+    graph = nx.DiGraph([(0, 2), (1, 2), (2, 5)])
+    with SegmentWriter(tmp_path, 0, 100) as writer:
+        writer.append(42, encode_edge_list(*graph_to_arrays(graph)))
+
+    [(block_number, labels, sources, targets)] = list(iter_graph_arrays(tmp_path))
+    assert block_number == 42
+    assert list(labels) == [0, 1, 2, 5]
+    assert sorted(zip(sources.tolist(), targets.tolist())) == [(0, 2), (1, 2), (2, 3)]
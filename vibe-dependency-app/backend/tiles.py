@@ -0,0 +1,104 @@
+import io
+import os
+import math
+import struct
+
+# Deep-zoom (DZI) tile pyramids of large graph images
+#
+# A pyramid has one level per power of two: the last level is the full image,
+# every level below it is half the size of the next, down to a single pixel at
+# level 0. Each level is cut into TILE_SIZE tiles that overlap their
+# neighbours by TILE_OVERLAP pixels. The layout is the one Deep Zoom viewers
+# (e.g. OpenSeadragon) expect:
+#   <name>.dzi                                  XML descriptor with the image size
+#   <name>_files/<level>/<column>_<row>.png     tiles
+# so a viewer only downloads the tiles visible at its current zoom.
+#
+# Only images whose longer side is at least DEEP_ZOOM_MIN_SIZE pixels get a
+# pyramid; smaller ones are shown whole.
+
+TILE_SIZE = int(os.environ.get('TILE_SIZE', 256))
+TILE_OVERLAP = int(os.environ.get('TILE_OVERLAP', 1))
+DEEP_ZOOM_MIN_SIZE = int(os.environ.get('DEEP_ZOOM_MIN_SIZE', 4096))  # Pixels on the longer side
+
+DZI_NAMESPACE = 'http://schemas.microsoft.com/deepzoom/2008'
+
+def png_size(data):
+    """Read ``(width, height)`` from the header of a PNG without decoding it."""
+    if len(data) < 24 or bytes(data[:8]) != b'\x89PNG\r\n\x1a\n':
+        raise ValueError("Not a PNG image")
+    return struct.unpack('>II', bytes(data[16:24]))
+
+def needs_pyramid(width, height, min_size=None):
+    return max(width, height) >= (DEEP_ZOOM_MIN_SIZE if min_size is None else min_size)
+
+def max_level(width, height):
+    return math.ceil(math.log2(max(width, height, 1)))
+
+def level_size(width, height, level):
+    """Size of the image at a pyramid level."""
+    scale = 2 ** (max_level(width, height) - level)
+    return math.ceil(width / scale), math.ceil(height / scale)
+
+def tile_box(column, row, level_width, level_height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Pixel box ``(left, top, right, bottom)`` a tile covers at its level, overlap included."""
+    left = column * tile_size - (overlap if column else 0)
+    top = row * tile_size - (overlap if row else 0)
+    right = min(level_width, (column + 1) * tile_size + overlap)
+    bottom = min(level_height, (row + 1) * tile_size + overlap)
+    return left, top, right, bottom
+
+def descriptor_path(name):
+    return f"{name}.dzi"
+
+def tile_path(name, level, column, row):
+    return f"{name}_files/{level}/{column}_{row}.png"
+
+def tiles_folder(name):
+    return f"{name}_files"
+
+def make_descriptor(width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<Image xmlns="{DZI_NAMESPACE}" Format="png" Overlap="{overlap}" TileSize="{tile_size}">\n'
+            f'  <Size Width="{width}" Height="{height}"/>\n'
+            f'</Image>\n').encode('utf-8')
+
+def pyramid_info(width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Pyramid parameters as stored next to the block stats, for viewers that skip the descriptor."""
+    return {'width': width, 'height': height, 'tile_size': tile_size, 'overlap': overlap,
+            'max_level': max_level(width, height)}
+
+def build_pyramid(png, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Cut a PNG into a tile pyramid.
+
+    Yields ``(relative path, bytes)`` pairs, the descriptor first, with paths
+    relative to the pyramid name (``.dzi`` and ``_files/...``). Levels are
+    produced from the full image down, each by halving the one above it.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(bytes(png)))
+    image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        # Palette images can only be resized with nearest-neighbour sampling
+        image = image.convert('RGBA')
+    width, height = image.size
+    yield '.dzi', make_descriptor(width, height, tile_size, overlap)
+
+    for level in range(max_level(width, height), -1, -1):
+        level_width, level_height = level_size(width, height, level)
+        if image.size != (level_width, level_height):
+            image = image.resize((level_width, level_height), Image.LANCZOS)
+        for column in range(math.ceil(level_width / tile_size)):
+            for row in range(math.ceil(level_height / tile_size)):
+                buffer = io.BytesIO()
+                image.crop(tile_box(column, row, level_width, level_height, tile_size, overlap)).save(buffer, format='PNG')
+                yield f"_files/{level}/{column}_{row}.png", buffer.getvalue()
+
+def write_pyramid(png, name, write, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Cut a PNG into a pyramid and pass every file to ``write(path, data)``. Returns the number of files."""
+    count = 0
+    for suffix, data in build_pyramid(png, tile_size, overlap):
+        write(f"{name}{suffix}", data)
+        count += 1
+    return count
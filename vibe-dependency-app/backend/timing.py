@@ -0,0 +1,129 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Per-request phase timings, sent as a Server-Timing header on /api/ responses
+#
+#   Server-Timing: cache;dur=0.0;desc="response:miss image:hit stats:miss",
+#                  exists;dur=12.1;desc="1 call", download;dur=48.3;desc="2 calls",
+#                  deserialize;dur=3.2, encode;dur=1.4, serialize;dur=0.3, total;dur=66.0
+#
+# Timings are kept per thread, so code running outside a request (prefetch,
+# stream detector, cache warm-up) records nothing and pays only a thread-local
+# lookup. Work handed to other threads is attributed to the request with
+# bind(); phases from parallel threads are summed, so they can exceed total.
+
+# Phases in header order
+PHASES = ('cache', 'exists', 'download', 'list', 'deserialize', 'encode', 'serialize')
+
+# Event streams send their headers before any work is done
+SKIPPED_PREFIXES = ('/api/stream/',)
+
+_local = threading.local()
+
+class RequestTimings:
+    """Phase durations and cache outcomes of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._phases = {}  # Phase -> [seconds, calls]
+        self._cache = {}   # Cache name -> {'hit': n, 'miss': n}
+
+    def add(self, name, seconds):
+        with self._lock:
+            entry = self._phases.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def cache_result(self, name, hit):
+        with self._lock:
+            counts = self._cache.setdefault(name, {'hit': 0, 'miss': 0})
+            counts['hit' if hit else 'miss'] += 1
+
+    def header(self):
+        with self._lock:
+            phases = {name: list(entry) for name, entry in self._phases.items()}
+            cache = []
+            for name, counts in self._cache.items():
+                for result in ('hit', 'miss'):
+                    if counts[result]:
+                        cache.append(f"{name}:{result}" + (f"x{counts[result]}" if counts[result] > 1 else ''))
+
+        metrics = []
+        if cache or 'cache' in phases:
+            metric = 'cache'
+            if 'cache' in phases:
+                metric += f";dur={phases['cache'][0] * 1000:.1f}"
+            if cache:
+                metric += ';desc="' + ' '.join(cache) + '"'
+            metrics.append(metric)
+        for name in PHASES[1:] + tuple(sorted(set(phases) - set(PHASES))):
+            if name in phases:
+                seconds, calls = phases[name]
+                metric = f"{name};dur={seconds * 1000:.1f}"
+                if calls > 1 or name in ('exists', 'download', 'list'):
+                    metric += f';desc="{calls} call{"s" if calls != 1 else ""}"'
+                metrics.append(metric)
+        metrics.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ', '.join(metrics)
+
+def current():
+    """The timings of the request served by this thread, or None."""
+    return getattr(_local, 'timings', None)
+
+@contextmanager
+def phase(name):
+    """Time a block of code as one phase of the current request, if any."""
+    timings = getattr(_local, 'timings', None)
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+def cache_result(name, hit):
+    """Record whether a cache lookup of the current request hit."""
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings.cache_result(name, hit)
+
+def bind(fn):
+    """Wrap ``fn`` so its phases count towards the current request when run on another thread."""
+    timings = current()
+    if timings is None:
+        return fn
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, 'timings', None)
+        _local.timings = timings
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.timings = previous
+    return run
+
+def install(app):
+    """Time every /api/ request and add its Server-Timing header."""
+    from flask import request
+
+    @app.before_request
+    def start_timings():
+        if request.path.startswith('/api/') and not request.path.startswith(SKIPPED_PREFIXES):
+            _local.timings = RequestTimings()
+
+    @app.after_request
+    def add_server_timing(response):
+        timings = current()
+        if timings is not None:
+            response.headers['Server-Timing'] = timings.header()
+            # Let browser devtools on other origins (the static site) show the breakdown
+            response.headers['Timing-Allow-Origin'] = '*'
+        return response
+
+    @app.teardown_request
+    def clear_timings(exc=None):
+        _local.timings = None
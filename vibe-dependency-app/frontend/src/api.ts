@@ -119,24 +119,162 @@ export const fetchWithCache = async (url: string, params?: any) => {
 
 // New functions for static content
 
+// Sharded block index written by static_generator.py --full-history
+interface IndexManifest {
+  shard_size: number;
+  min_block: string | null;
+  max_block: string | null;
+  block_count: number;
+  shards: Record<string, { first: string; last: string; count: number }>;
+}
+
+interface IndexEntry {
+  node_count: number;
+  edge_count: number;
+}
+
+// Set once the site turned out to have no index, so it is not requested again
+let indexMissing = false;
+
+// Get the index manifest, or null for sites exported without an index
+export const getIndexManifest = async (): Promise<IndexManifest | null> => {
+  if (indexMissing) {
+    return null;
+  }
+  try {
+    return await fetchWithCache('/data/index/manifest.json');
+  } catch (error: any) {
+    if (error.response && error.response.status === 404) {
+      indexMissing = true;
+    }
+    return null;
+  }
+};
+
+// Look up a block in the one index shard that covers it.
+// Returns null if the block was not exported, undefined if there is no index.
+export const getBlockIndexEntry = async (blockNumber: string): Promise<IndexEntry | null | undefined> => {
+  const manifest = await getIndexManifest();
+  if (!manifest) {
+    return undefined;
+  }
+
+  const shard = Math.floor(Number(blockNumber) / manifest.shard_size).toString();
+  if (!(shard in manifest.shards)) {
+    return null;
+  }
+
+  const shardData = await fetchWithCache(`/data/index/${shard}.json`);
+  return shardData.blocks[blockNumber] || null;
+};
+
+// Run-length encoded set of exported blocks, see backend/availability.py
+interface Availability {
+  starts: number[];
+  ends: number[];
+}
+
+let decodedAvailability: { raw: any; value: Availability } | null = null;
+
+// Get the set of exported blocks, or null for sites exported without it
+export const getAvailability = async (): Promise<Availability | null> => {
+  let raw;
+  try {
+    raw = await fetchWithCache('/data/availability.json');
+  } catch (error) {
+    return null;
+  }
+
+  // Decode each fetched copy only once
+  if (!decodedAvailability || decodedAvailability.raw !== raw) {
+    const starts: number[] = [];
+    const ends: number[] = [];
+    let position = 0;
+    for (let i = 0; i + 1 < raw.runs.length; i += 2) {
+      const start = position + raw.runs[i];
+      position = start + raw.runs[i + 1] - 1;
+      starts.push(start);
+      ends.push(position);
+    }
+    decodedAvailability = { raw, value: { starts, ends } };
+  }
+  return decodedAvailability.value;
+};
+
+// Index of the run that starts at or before a block, -1 if there is none
+const findRun = (availability: Availability, block: number): number => {
+  let low = 0;
+  let high = availability.starts.length - 1;
+  let found = -1;
+  while (low <= high) {
+    const mid = (low + high) >> 1;
+    if (availability.starts[mid] <= block) {
+      found = mid;
+      low = mid + 1;
+    } else {
+      high = mid - 1;
+    }
+  }
+  return found;
+};
+
+export const isBlockAvailable = (availability: Availability, block: number): boolean => {
+  const run = findRun(availability, block);
+  return run >= 0 && block <= availability.ends[run];
+};
+
+// Get the exported block closest to a block number (the lower one on ties)
+export const getNearestBlock = (availability: Availability, block: number): number | null => {
+  const run = findRun(availability, block);
+  if (run >= 0 && block <= availability.ends[run]) {
+    return block;
+  }
+  const below = run >= 0 ? availability.ends[run] : null;
+  const above = run + 1 < availability.starts.length ? availability.starts[run + 1] : null;
+  if (below === null) {
+    return above;
+  }
+  if (above === null || block - below <= above - block) {
+    return below;
+  }
+  return above;
+};
+
+// Image URLs are handed to <img> directly, so the browser fetches, caches
+// and decodes the PNGs off the main thread
+export const graphImageUrl = (blockNumber: string) => `${STATIC_BASE_URL}/graphs/${blockNumber}.png`;
+export const ganttImageUrl = (blockNumber: string) => `${STATIC_BASE_URL}/gantt/${blockNumber}.png`;
+export const tilesUrl = (blockNumber: string) => `${STATIC_BASE_URL}/tiles/${blockNumber}_files`;
+
+// Deep-zoom pyramid of a large graph image, as stored in data/<block>.json
+export interface TilePyramid {
+  width: number;
+  height: number;
+  tile_size: number;
+  overlap: number;
+  max_level: number;
+}
+
 // Get graph data including stats
 export const getGraphData = async (blockNumber: string) => {
   try {
+    // Skip the requests for blocks that were never exported
+    const availability = await getAvailability();
+    const missing = availability
+      ? !isBlockAvailable(availability, Number(blockNumber))
+      : (await getBlockIndexEntry(blockNumber)) === null;
+    if (missing) {
+      const nearest = availability ? getNearestBlock(availability, Number(blockNumber)) : null;
+      throw new Error(`Block ${blockNumber} is not available` + (nearest !== null ? ` (nearest: ${nearest})` : ''));
+    }
+    
     // Get graph metadata from JSON file
     const stats = await fetchWithCache(`/data/${blockNumber}.json`);
     
-    // Load the graph image
-    const imageResponse = await api.get(`/graphs/${blockNumber}.png`, {
-      responseType: 'arraybuffer'
-    });
-    
-    // Convert image to base64
-    const base64Image = Buffer.from(imageResponse.data, 'binary').toString('base64');
-    
     // Return combined data
     return {
       ...stats,
-      image: base64Image
+      image_url: graphImageUrl(blockNumber)
     };
   } catch (error) {
     console.error(`Error fetching graph data for block ${blockNumber}:`, error);
@@ -144,34 +282,32 @@ export const getGraphData = async (blockNumber: string) => {
   }
 };
 
-// Get gantt chart data
+// Get gantt chart data; a missing chart shows up as an image load error
 export const getGanttData = async (blockNumber: string) => {
-  try {
-    // Load the gantt image
-    const imageResponse = await api.get(`/gantt/${blockNumber}.png`, {
-      responseType: 'arraybuffer'
-    });
-    
-    // Convert image to base64
-    const base64Image = Buffer.from(imageResponse.data, 'binary').toString('base64');
-    
-    // Return image data
-    return {
-      block_number: blockNumber,
-      image: base64Image,
-      demo_mode: false
-    };
-  } catch (error) {
-    console.error(`Error fetching gantt data for block ${blockNumber}:`, error);
-    throw error;
-  }
+  return {
+    block_number: blockNumber,
+    image_url: ganttImageUrl(blockNumber),
+    demo_mode: false
+  };
 };
 
 // Get recent blocks
 export const getRecentBlocks = async () => {
   try {
     // Fetch recent blocks list
-    return await fetchWithCache('/data/recent_blocks.json');
+    const recentBlocks = await fetchWithCache('/data/recent_blocks.json');
+
+    // The index carries the stats; fill in any that are missing in parallel
+    return await Promise.all(recentBlocks.map(async (block: any) => {
+      if (block.node_count !== undefined && block.edge_count !== undefined) {
+        return block;
+      }
+      try {
+        return { ...block, ...(await fetchWithCache(`/data/${block.block_number}.json`)) };
+      } catch (error) {
+        return block;
+      }
+    }));
   } catch (error) {
     console.error('Error fetching recent blocks:', error);
     throw error;
@@ -0,0 +1,232 @@
+import React, { useCallback, useEffect, useRef, useState } from 'react';
+import styled from 'styled-components';
+import { TilePyramid } from '../api';
+
+// Viewer for deep-zoom tile pyramids (see backend/tiles.py). Only the tiles
+// of the level matching the current zoom that intersect the viewport are
+// requested, over a single-tile overview that fills in while they load.
+
+const Viewport = styled.div`
+  position: relative;
+  width: 100%;
+  height: 600px;
+  overflow: hidden;
+  background-color: #ffffff;
+  cursor: grab;
+  touch-action: none;
+  user-select: none;
+
+  &:active {
+    cursor: grabbing;
+  }
+
+  img {
+    position: absolute;
+    pointer-events: none;
+    max-width: none;
+    max-height: none;
+  }
+`;
+
+const Controls = styled.div`
+  position: absolute;
+  top: 0.5rem;
+  right: 0.5rem;
+  display: flex;
+  gap: 0.25rem;
+  z-index: 1;
+
+  button {
+    background-color: rgba(52, 152, 219, 0.9);
+    color: white;
+    border: none;
+    border-radius: 4px;
+    width: 2rem;
+    height: 2rem;
+    font-size: 1rem;
+    cursor: pointer;
+  }
+`;
+
+interface DeepZoomImageProps {
+  tilesUrl: string; // Folder holding <level>/<column>_<row>.png
+  pyramid: TilePyramid;
+  alt: string;
+  onFirstTile?: () => void;
+}
+
+interface View {
+  scale: number; // Screen pixels per full-resolution image pixel
+  x: number; // Screen position of the image's top left corner
+  y: number;
+}
+
+// Zooming in further than the full-resolution tiles only makes them blurry
+const MAX_SCALE = 2;
+
+const DeepZoomImage: React.FC<DeepZoomImageProps> = ({ tilesUrl, pyramid, alt, onFirstTile }) => {
+  const { width, height, tile_size: tileSize, overlap, max_level: maxLevel } = pyramid;
+  const viewportRef = useRef<HTMLDivElement>(null);
+  const dragRef = useRef<{ x: number; y: number } | null>(null);
+  const firstTileRef = useRef(false);
+  const [size, setSize] = useState({ width: 0, height: 0 });
+  const [view, setView] = useState<View | null>(null);
+
+  const fitView = useCallback((viewportWidth: number, viewportHeight: number): View => {
+    const scale = Math.min(viewportWidth / width, viewportHeight / height);
+    return { scale, x: (viewportWidth - width * scale) / 2, y: (viewportHeight - height * scale) / 2 };
+  }, [width, height]);
+
+  // Track the viewport size and start with the whole image in view
+  useEffect(() => {
+    const element = viewportRef.current;
+    if (!element) {
+      return;
+    }
+    const update = () => {
+      const next = { width: element.clientWidth, height: element.clientHeight };
+      setSize(next);
+      setView(current => current || fitView(next.width, next.height));
+    };
+    update();
+    window.addEventListener('resize', update);
+    return () => window.removeEventListener('resize', update);
+  }, [fitView]);
+
+  const minScale = size.width ? fitView(size.width, size.height).scale : 0;
+
+  const zoomAt = useCallback((factor: number, screenX: number, screenY: number) => {
+    setView(current => {
+      if (!current) {
+        return current;
+      }
+      const scale = Math.min(MAX_SCALE, Math.max(minScale, current.scale * factor));
+      const applied = scale / current.scale;
+      // Keep the image point under the cursor in place
+      return { scale, x: screenX - (screenX - current.x) * applied, y: screenY - (screenY - current.y) * applied };
+    });
+  }, [minScale]);
+
+  // React registers wheel listeners as passive, so preventDefault needs a native listener
+  useEffect(() => {
+    const element = viewportRef.current;
+    if (!element) {
+      return;
+    }
+    const onWheel = (event: WheelEvent) => {
+      event.preventDefault();
+      const rect = element.getBoundingClientRect();
+      zoomAt(Math.pow(1.0015, -event.deltaY), event.clientX - rect.left, event.clientY - rect.top);
+    };
+    element.addEventListener('wheel', onWheel, { passive: false });
+    return () => element.removeEventListener('wheel', onWheel);
+  }, [zoomAt]);
+
+  const onPointerDown = (event: React.PointerEvent<HTMLDivElement>) => {
+    dragRef.current = { x: event.clientX, y: event.clientY };
+    event.currentTarget.setPointerCapture(event.pointerId);
+  };
+
+  const onPointerMove = (event: React.PointerEvent<HTMLDivElement>) => {
+    const drag = dragRef.current;
+    if (!drag) {
+      return;
+    }
+    const dx = event.clientX - drag.x;
+    const dy = event.clientY - drag.y;
+    dragRef.current = { x: event.clientX, y: event.clientY };
+    setView(current => current && { ...current, x: current.x + dx, y: current.y + dy });
+  };
+
+  const onPointerUp = () => {
+    dragRef.current = null;
+  };
+
+  const onTileLoad = () => {
+    if (!firstTileRef.current) {
+      firstTileRef.current = true;
+      onFirstTile?.();
+    }
+  };
+
+  const renderLevel = (level: number, visibleOnly: boolean) => {
+    if (!view) {
+      return [];
+    }
+    const levelScale = Math.pow(2, level - maxLevel);
+    const levelWidth = Math.ceil(width * levelScale);
+    const levelHeight = Math.ceil(height * levelScale);
+    // Screen pixels per pixel of this level
+    const factor = view.scale / levelScale;
+
+    const columns = Math.ceil(levelWidth / tileSize);
+    const rows = Math.ceil(levelHeight / tileSize);
+    let firstColumn = 0;
+    let lastColumn = columns - 1;
+    let firstRow = 0;
+    let lastRow = rows - 1;
+    if (visibleOnly) {
+      firstColumn = Math.max(0, Math.floor(-view.x / factor / tileSize));
+      lastColumn = Math.min(columns - 1, Math.floor((size.width - view.x) / factor / tileSize));
+      firstRow = Math.max(0, Math.floor(-view.y / factor / tileSize));
+      lastRow = Math.min(rows - 1, Math.floor((size.height - view.y) / factor / tileSize));
+    }
+
+    const images = [];
+    for (let column = firstColumn; column <= lastColumn; column++) {
+      for (let row = firstRow; row <= lastRow; row++) {
+        // Tiles include the overlap into their neighbours, except at the image edges
+        const left = column * tileSize - (column > 0 ? overlap : 0);
+        const top = row * tileSize - (row > 0 ? overlap : 0);
+        const right = Math.min(levelWidth, (column + 1) * tileSize + overlap);
+        const bottom = Math.min(levelHeight, (row + 1) * tileSize + overlap);
+        images.push(
+          <img
+            key={`${level}/${column}_${row}`}
+            src={`${tilesUrl}/${level}/${column}_${row}.png`}
+            alt=""
+            onLoad={visibleOnly ? onTileLoad : undefined}
+            decoding="async"
+            style={{
+              left: view.x + left * factor,
+              top: view.y + top * factor,
+              width: (right - left) * factor,
+              height: (bottom - top) * factor
+            }}
+          />
+        );
+      }
+    }
+    return images;
+  };
+
+  // The finest level whose pixels are not smaller than screen pixels
+  const level = view
+    ? Math.max(0, Math.min(maxLevel, maxLevel + Math.ceil(Math.log2(view.scale * (window.devicePixelRatio || 1)))))
+    : maxLevel;
+  // The largest level that is still a single tile serves as the overview
+  const overviewLevel = Math.min(level, Math.floor(Math.log2(tileSize)));
+
+  return (
+    <Viewport
+      ref={viewportRef}
+      role="img"
+      aria-label={alt}
+      onPointerDown={onPointerDown}
+      onPointerMove={onPointerMove}
+      onPointerUp={onPointerUp}
+      onPointerCancel={onPointerUp}
+      onDoubleClick={() => setView(fitView(size.width, size.height))}
+    >
+      <Controls onPointerDown={event => event.stopPropagation()}>
+        <button onClick={() => zoomAt(1.5, size.width / 2, size.height / 2)} aria-label="Zoom in">+</button>
+        <button onClick={() => zoomAt(1 / 1.5, size.width / 2, size.height / 2)} aria-label="Zoom out">−</button>
+        <button onClick={() => setView(fitView(size.width, size.height))} aria-label="Fit to view">⤢</button>
+      </Controls>
+      {overviewLevel < level && renderLevel(overviewLevel, false)}
+      {renderLevel(level, true)}
+    </Viewport>
+  );
+};
+
+export default DeepZoomImage;
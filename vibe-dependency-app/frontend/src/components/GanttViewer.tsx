@@ -135,7 +135,7 @@ interface GanttViewerProps {
 
 interface GanttData {
   block_number: string;
-  image: string; // base64 encoded image
+  image_url: string;
   demo_mode: boolean;
 }
 
@@ -168,16 +168,18 @@ const GanttViewer: React.FC<GanttViewerProps> = ({ blockNumber, onBack }) => {
 
   // Render the gantt chart image
   const renderGanttImage = () => {
-    if (!ganttData?.image) {
+    if (!ganttData?.image_url) {
       return <ErrorMessage>No chart image available</ErrorMessage>;
     }
     
     try {
       return (
         <GanttImage 
-          src={`data:image/png;base64,${ganttData.image}`}
+          src={ganttData.image_url}
           alt={`Gantt chart for block ${blockNumber}`}
           onLoad={() => setImageLoaded(true)}
+          onError={() => setError('Failed to load gantt chart. The block number may not exist or there was a server error.')}
+          decoding="async"
         />
       );
     } catch (error) {
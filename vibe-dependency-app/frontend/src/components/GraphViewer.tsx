@@ -1,6 +1,8 @@
 import React, { useEffect, useState } from 'react';
 import styled from 'styled-components';
-import { getGraphData } from '../api';
+import { getGraphData, tilesUrl, TilePyramid } from '../api';
+import DeepZoomImage from './DeepZoomImage';
+import { markStart, measure } from '../perf';
 
 const GraphContainer = styled.div`
   background-color: white;
@@ -72,7 +74,7 @@ const GraphImage = styled.div`
   max-width: 100%;
   overflow: hidden;
   
-  img {
+  > img {
     max-width: 100%;
     max-height: 600px;
     object-fit: contain;
@@ -137,9 +139,6 @@ const ImagePlaceholder = styled.div`
   border-radius: 8px;
 `;
 
-// Client-side cache for graph images
-export const graphImageCache = new Map<string, string>();
-
 interface GraphViewerProps {
   blockNumber: string;
   onBack?: () => void;
@@ -147,10 +146,11 @@ interface GraphViewerProps {
 
 interface GraphData {
   block_number: string;
-  image: string; // base64 encoded image
+  image_url: string;
   node_count: number;
   edge_count: number;
   demo_mode: boolean;
+  tiles?: TilePyramid; // Only set for images large enough to be tiled
 }
 
 const GraphViewer: React.FC<GraphViewerProps> = ({ blockNumber, onBack }) => {
@@ -164,16 +164,12 @@ const GraphViewer: React.FC<GraphViewerProps> = ({ blockNumber, onBack }) => {
       setLoading(true);
       setError(null);
       setImageLoaded(false);
+      markStart('graph-viewer:image');
       
       try {
         // Use the getGraphData function from API
         const data = await getGraphData(blockNumber);
         setGraphData(data);
-        
-        // Cache the image data for reuse
-        if (data.image) {
-          graphImageCache.set(blockNumber, data.image);
-        }
       } catch (err) {
         setError('Failed to load graph. The block number may not exist or there was a server error.');
         console.error('Error fetching graph:', err);
@@ -248,17 +244,34 @@ const GraphViewer: React.FC<GraphViewerProps> = ({ blockNumber, onBack }) => {
       </GraphStats>
       
       <GraphImage>
-        {!imageLoaded && (
-          <ImagePlaceholder>
-            <LoadingSpinner />
-          </ImagePlaceholder>
+        {graphData.tiles ? (
+          // Large graphs are shown from their tile pyramid, so only the visible tiles are downloaded
+          <DeepZoomImage
+            tilesUrl={tilesUrl(graphData.block_number)}
+            pyramid={graphData.tiles}
+            alt={`Transaction Dependency Graph for Block ${graphData.block_number}`}
+            onFirstTile={() => measure('graph-viewer:image')}
+          />
+        ) : (
+          <>
+            {!imageLoaded && (
+              <ImagePlaceholder>
+                <LoadingSpinner />
+              </ImagePlaceholder>
+            )}
+            <img 
+              src={graphData.image_url}
+              alt={`Transaction Dependency Graph for Block ${graphData.block_number}`}
+              style={{ display: imageLoaded ? 'block' : 'none' }}
+              onLoad={() => {
+                setImageLoaded(true);
+                measure('graph-viewer:image');
+              }}
+              onError={() => setError('Failed to load the graph image.')}
+              decoding="async"
+            />
+          </>
         )}
-        <img 
-          src={`data:image/png;base64,${graphData.image}`}
-          alt={`Transaction Dependency Graph for Block ${graphData.block_number}`}
-          style={{ display: imageLoaded ? 'block' : 'none' }}
-          onLoad={() => setImageLoaded(true)}
-        />
       </GraphImage>
     </GraphContainer>
   );
@@ -1,7 +1,7 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import styled from 'styled-components';
-import { getRecentBlocks, getGraphData } from '../api';
-import { graphImageCache } from './GraphViewer';
+import { getRecentBlocks, graphImageUrl } from '../api';
+import { markStart, measure } from '../perf';
 
 const Container = styled.div`
   margin-bottom: 2rem;
@@ -46,9 +46,13 @@ const GraphImageContainer = styled.div`
   align-items: center;
   
   img {
+    position: absolute;
+    top: 0;
+    left: 0;
     width: 100%;
     height: 100%;
     object-fit: cover;
+    transition: opacity 0.2s;
   }
 `;
 
@@ -105,16 +109,15 @@ interface RecentGraphsProps {
 
 interface GraphData {
   block_number: string;
-  image: string; // base64 encoded image
   node_count: number;
   edge_count: number;
   demo_mode: boolean;
 }
 
 interface GraphCardState {
-  loading: boolean;
   imageLoaded: boolean;
-  data: GraphData | null;
+  imageFailed: boolean;
+  data: GraphData;
 }
 
 const RecentGraphs: React.FC<RecentGraphsProps> = ({ onGraphSelect }) => {
@@ -123,72 +126,35 @@ const RecentGraphs: React.FC<RecentGraphsProps> = ({ onGraphSelect }) => {
   const [blockNumbers, setBlockNumbers] = useState<string[]>([]);
   const [graphCards, setGraphCards] = useState<{[key: string]: GraphCardState}>({});
 
-  // First, fetch just the list of recent blocks
+  // Fetch the list of recent blocks; it already holds the stats, and the
+  // thumbnails are loaded by the browser as the cards scroll into view
   useEffect(() => {
     const fetchRecentBlocks = async () => {
       setLoading(true);
       setError(null);
+      markStart('recent-graphs:metadata');
       
       try {
         // Get recent blocks data
-        const recentBlocks = await getRecentBlocks();
+        const recentBlocks: GraphData[] = await getRecentBlocks();
         
         // Extract block numbers and set up initial card states
-        const blocks = recentBlocks.map((graph: GraphData) => graph.block_number);
-        setBlockNumbers(blocks);
-        
-        // Initialize graph cards state
         const initialGraphCards: {[key: string]: GraphCardState} = {};
-        
-        // For each block, initialize with the data we have
         for (const block of recentBlocks) {
-          // Pre-fetch image data for each block
-          try {
-            // Try to fetch the graph data for this block
-            const graphData = await getGraphData(block.block_number);
-            
-            // Add image to browser cache
-            if (graphData.image) {
-              graphImageCache.set(block.block_number, graphData.image);
-              
-              // Create an image object to trigger browser caching
-              const img = new Image();
-              img.src = `data:image/png;base64,${graphData.image}`;
-              
-              // Initialize this block's card state with the data
-              initialGraphCards[block.block_number] = {
-                loading: false,
-                imageLoaded: false,  // Will be set to true on image load
-                data: graphData
-              };
-              
-              // When image loads, mark it as loaded in our state
-              img.onload = () => {
-                setGraphCards(prev => ({
-                  ...prev,
-                  [block.block_number]: { 
-                    ...prev[block.block_number], 
-                    imageLoaded: true 
-                  }
-                }));
-              };
-            }
-          } catch (err) {
-            console.error(`Error pre-fetching graph for block ${block.block_number}:`, err);
-            // Initialize with basic data, will try to load image when card is rendered
-            initialGraphCards[block.block_number] = {
-              loading: false,
-              imageLoaded: false,
-              data: block
-            };
-          }
+          initialGraphCards[block.block_number] = {
+            imageLoaded: false,
+            imageFailed: false,
+            data: block
+          };
         }
         
+        setBlockNumbers(recentBlocks.map(block => block.block_number));
         setGraphCards(initialGraphCards);
-        setLoading(false);
+        measure('recent-graphs:metadata');
       } catch (err) {
         setError('Failed to load recent graphs.');
         console.error('Error fetching recent graphs:', err);
+      } finally {
         setLoading(false);
       }
     };
@@ -196,13 +162,27 @@ const RecentGraphs: React.FC<RecentGraphsProps> = ({ onGraphSelect }) => {
     fetchRecentBlocks();
   }, []);
 
+  const firstImageMeasured = useRef(false);
+
   const handleImageLoad = (blockNumber: string) => {
+    if (!firstImageMeasured.current) {
+      // Time from navigation to the first visible thumbnail
+      firstImageMeasured.current = true;
+      measure('recent-graphs:first-thumbnail');
+    }
     setGraphCards(prev => ({
       ...prev,
       [blockNumber]: { ...prev[blockNumber], imageLoaded: true }
     }));
   };
 
+  const handleImageError = (blockNumber: string) => {
+    setGraphCards(prev => ({
+      ...prev,
+      [blockNumber]: { ...prev[blockNumber], imageFailed: true }
+    }));
+  };
+
   // Loading state
   if (loading) {
     return (
@@ -244,26 +224,23 @@ const RecentGraphs: React.FC<RecentGraphsProps> = ({ onGraphSelect }) => {
         {blockNumbers.map((blockNumber) => (
           <GraphCard key={blockNumber} onClick={() => onGraphSelect(blockNumber)}>
             <GraphImageContainer>
-              {graphCards[blockNumber]?.loading && (
-                <LoadingSpinner />
-              )}
-              
-              {graphCards[blockNumber]?.data && (
+              {graphCards[blockNumber]?.imageFailed ? (
+                <div>Failed to load</div>
+              ) : (
                 <>
-                  {!graphCards[blockNumber].imageLoaded && <LoadingSpinner />}
+                  {!graphCards[blockNumber]?.imageLoaded && <LoadingSpinner />}
+                  {/* Kept in the layout (not display: none) so lazy loading can see it scroll into view */}
                   <img 
-                    src={`data:image/png;base64,${graphCards[blockNumber].data?.image}`} 
+                    src={graphImageUrl(blockNumber)}
                     alt={`Transaction Dependency Graph for Block ${blockNumber}`}
-                    style={{ display: graphCards[blockNumber].imageLoaded ? 'block' : 'none' }}
+                    style={{ opacity: graphCards[blockNumber]?.imageLoaded ? 1 : 0 }}
                     onLoad={() => handleImageLoad(blockNumber)}
+                    onError={() => handleImageError(blockNumber)}
                     loading="lazy"
+                    decoding="async"
                   />
                 </>
               )}
-              
-              {!graphCards[blockNumber]?.loading && !graphCards[blockNumber]?.data && (
-                <div>Failed to load</div>
-              )}
             </GraphImageContainer>
             
             <GraphInfo>
@@ -0,0 +1,33 @@
+// Small wrappers around the User Timing API. The measures show up in the
+// browser's performance panel (and in the console during development), so
+// load times can be compared between builds.
+
+const supported = typeof performance !== 'undefined' && typeof performance.mark === 'function';
+
+// Start timing a named phase
+export const markStart = (name: string) => {
+  if (supported) {
+    performance.mark(`${name}:start`);
+  }
+};
+
+// Record the time since markStart(name), or since page navigation if it was never started
+export const measure = (name: string) => {
+  if (!supported) {
+    return;
+  }
+  try {
+    const started = performance.getEntriesByName(`${name}:start`, 'mark').length > 0;
+    if (started) {
+      performance.measure(name, `${name}:start`);
+    } else {
+      performance.measure(name);
+    }
+    if (process.env.NODE_ENV !== 'production') {
+      const entries = performance.getEntriesByName(name, 'measure');
+      console.log(`[timing] ${name}: ${entries[entries.length - 1].duration.toFixed(0)}ms`);
+    }
+  } catch (error) {
+    // Timing must never break rendering
+  }
+};